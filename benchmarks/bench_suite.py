@@ -0,0 +1,182 @@
+"""
+Benchmark suite of the comparison pipeline on synthetic branches.
+
+Usage:
+    python -m benchmarks.bench_suite [--sizes 10000 100000 500000] [--overlap <share>]
+        [--churn <share>] [--no-memory] [--output <results.json>]
+        [--baseline <results.json> [--tolerance <share>]]
+
+For each branch size, every stage is timed on its own: parsing a streamed
+export into a PackageTable, compare_versions on the shared names,
+compare_packages, filter_package_data and get_dump_json. Throughput is
+reported in packages per second, and each stage is run a second time under
+tracemalloc to report its peak memory. With --baseline, the run fails if a
+stage's throughput dropped by more than --tolerance against a saved result.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from src.synthetic import export_payload, generate_branches, iter_chunks
+from src.comparison import compare_packages, compare_versions, filter_package_data
+from src.config import config
+from src.json_stream import iter_json_array
+from src.logging_config import log
+from src.package_table import PackageTable
+from src.utils import get_dump_json
+
+# A stage prepares its input (untimed) and returns the timed callable and the
+# number of packages it processes.
+Stage = Callable[[List[dict], List[dict]], Tuple[Callable[[], object], int]]
+
+
+def _parse(sisyphus: List[dict], p10: List[dict]) -> Tuple[Callable, int]:
+    payload: bytes = export_payload(sisyphus)
+    return (
+        lambda: PackageTable.from_packages(
+            iter_json_array(iter_chunks(payload, config.chunk_size), "packages")
+        ),
+        len(sisyphus),
+    )
+
+
+def _compare_versions(sisyphus: List[dict], p10: List[dict]) -> Tuple[Callable, int]:
+    p10_by_name: Dict[str, dict] = {pkg["name"]: pkg for pkg in p10}
+    pairs: List[Tuple[dict, dict]] = [
+        (pkg, p10_by_name[pkg["name"]])
+        for pkg in sisyphus
+        if pkg["name"] in p10_by_name
+    ]
+
+    def run() -> None:
+        for a, b in pairs:
+            compare_versions(a["version"], a["release"], b["version"], b["release"])
+
+    return run, len(pairs)
+
+
+def _compare_packages(sisyphus: List[dict], p10: List[dict]) -> Tuple[Callable, int]:
+    return lambda: compare_packages(sisyphus, p10), len(sisyphus) + len(p10)
+
+
+def _filter_package_data(sisyphus: List[dict], p10: List[dict]) -> Tuple[Callable, int]:
+    return lambda: filter_package_data(sisyphus), len(sisyphus)
+
+
+def _get_dump_json(sisyphus: List[dict], p10: List[dict]) -> Tuple[Callable, int]:
+    result: dict = compare_packages(sisyphus, p10)
+    data: dict = {"all_packages": {"x86_64": result}}
+    count: int = sum(len(result[category]) for category in result)
+    path: str = os.path.join(tempfile.mkdtemp(), "all_packages.json")
+    return lambda: get_dump_json(data, path), count
+
+
+STAGES: Dict[str, Stage] = {
+    "parse": _parse,
+    "compare_versions": _compare_versions,
+    "compare_packages": _compare_packages,
+    "filter_package_data": _filter_package_data,
+    "get_dump_json": _get_dump_json,
+}
+
+
+def run_stage(
+    stage: Stage, sisyphus: List[dict], p10: List[dict], memory: bool = True
+) -> dict:
+    """
+    Times a stage and, optionally, measures its peak memory in a second run.
+    Returns:
+        dict: 'packages', 'seconds', 'packages_per_second' and 'peak_memory_bytes'.
+    """
+    run, count = stage(sisyphus, p10)
+    gc.collect()
+    start: float = time.perf_counter()
+    run()
+    seconds: float = time.perf_counter() - start
+
+    peak: Optional[int] = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "packages": count,
+        "seconds": round(seconds, 4),
+        "packages_per_second": round(count / seconds) if seconds else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def _regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    messages: List[str] = []
+    for size, stages in results.items():
+        for name, result in stages.items():
+            previous: Optional[dict] = baseline.get(size, {}).get(name)
+            if not previous or not previous.get("packages_per_second"):
+                continue
+            ratio: float = (
+                result["packages_per_second"] / previous["packages_per_second"]
+            )
+            if ratio < 1 - tolerance:
+                messages.append(
+                    f"{name} at {size} packages: {ratio:.0%} of baseline throughput"
+                )
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000]
+    )
+    parser.add_argument("--overlap", type=float, default=0.9)
+    parser.add_argument("--churn", type=float, default=0.2)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    # Keep per-call log lines (e.g. from get_dump_json) out of the report.
+    log.disable("src")
+
+    results: Dict[str, dict] = {}
+    for size in args.sizes:
+        sisyphus, p10 = generate_branches(size, args.overlap, args.churn)
+        print(f"{size} packages per branch")
+        results[str(size)] = {}
+        for name in args.stages:
+            result: dict = run_stage(STAGES[name], sisyphus, p10, args.memory)
+            results[str(size)][name] = result
+            peak: str = (
+                f"{result['peak_memory_bytes'] / 2**20:>9.1f} MiB peak"
+                if result["peak_memory_bytes"] is not None
+                else ""
+            )
+            print(
+                f"  {name:<20} {result['packages_per_second']:>12,} packages/s "
+                f"({result['seconds']:.3f}s){peak}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions: List[str] = _regressions(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of version comparisons on the shared packages of two real branches.
+
+Usage:
+    python -m benchmarks.bench_versions [-a <arch>] [--offline]
+
+Branch exports are fetched through the export cache, so repeated runs only
+revalidate them (or use --offline to run from the cache alone).
+"""
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+from version_utils import rpm
+from src.altlinux_api import AltLinuxAPI
+from src.cache import ExportCache
+from src.comparison import compare_versions
+from src.progress import ProgressReporter
+from src.versions import package_key, parse_segments, version_key
+
+
+def _measure(name: str, pairs: List[Tuple[dict, dict]], compare: Callable) -> None:
+    start: float = time.perf_counter()
+    for pkg_a, pkg_b in pairs:
+        compare(pkg_a, pkg_b)
+    elapsed: float = time.perf_counter() - start
+    print(f"{name:<28} {len(pairs) / elapsed:>14,.0f} comparisons/s ({elapsed:.3f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-a", "--arch", default="x86_64")
+    parser.add_argument("--offline", action="store_true")
+    args = parser.parse_args()
+
+    api = AltLinuxAPI(
+        cache=ExportCache(), offline=args.offline, progress=ProgressReporter("off")
+    )
+    sisyphus = {pkg["name"]: pkg for pkg in api.iter_packages("sisyphus", args.arch)}
+    p10 = {pkg["name"]: pkg for pkg in api.iter_packages("p10", args.arch)}
+    pairs = [(sisyphus[name], p10[name]) for name in sisyphus.keys() & p10.keys()]
+    print(f"sisyphus: {len(sisyphus)}, p10: {len(p10)}, shared names: {len(pairs)}")
+
+    _measure(
+        "rpm, version-release string",
+        pairs,
+        lambda a, b: rpm.compare_versions(
+            f"{a['version']}-{a['release']}", f"{b['version']}-{b['release']}"
+        ),
+    )
+    _measure(
+        "compare_versions",
+        pairs,
+        lambda a, b: compare_versions(
+            a["version"], a["release"], b["version"], b["release"]
+        ),
+    )
+
+    version_key.cache_clear()
+    parse_segments.cache_clear()
+    _measure(
+        "VersionKey, parse + compare",
+        pairs,
+        lambda a, b: package_key(a) > package_key(b),
+    )
+
+    keys = [(package_key(a), package_key(b)) for a, b in pairs]
+    _measure("VersionKey, compare only", keys, lambda a, b: a > b)
+
+
+if __name__ == "__main__":
+    main()
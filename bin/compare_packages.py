@@ -1,11 +1,80 @@
 #!/usr/bin/env python3
-from src.cli import run_comparison, parse_args
-from src.logging_config import log
+from src.cli import (
+    build_package_filter,
+    run_comparison,
+    run_lookup,
+    run_server,
+    parse_args,
+)
+from src.logging_config import log, setup_logger
+from src.metrics import Metrics
 
 
 def main():
     args = parse_args()
-    success = run_comparison(args.arch, args.output_file)
+    if args.verbose:
+        setup_logger("DEBUG")
+    else:
+        setup_logger()
+    if args.command == "lookup":
+        if not run_lookup(args.names, args.arch, args.snapshot_dir, prefix=args.prefix):
+            log.error("Lookup failed.")
+            exit(1)
+        return
+    if args.command == "serve":
+        if not run_server(
+            args.arch,
+            host=args.host,
+            port=args.port,
+            refresh_interval=args.refresh_interval,
+            jobs=args.jobs,
+            use_cache=args.use_cache,
+            cache_dir=args.cache_dir,
+        ):
+            log.error("Server failed.")
+            exit(1)
+        return
+    try:
+        package_filter = build_package_filter(
+            args.name_prefixes, args.name_regex, args.names_file, args.fields
+        )
+    except Exception as e:
+        log.error(f"Invalid package filter: {e}")
+        exit(1)
+    metrics = Metrics()
+    success = run_comparison(
+        args.arch,
+        args.output_file,
+        all_arches=args.all_arches,
+        dedupe_noarch=args.dedupe_noarch,
+        package_filter=package_filter,
+        by_source=args.by_source,
+        expand_binaries=args.expand_binaries,
+        pipeline=args.pipeline,
+        merge_join=args.merge_join,
+        branches=args.branches,
+        jobs=args.jobs,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        retries=args.retries,
+        use_cache=args.use_cache,
+        offline=args.offline,
+        cache_dir=args.cache_dir,
+        progress=args.progress,
+        compare_workers=args.compare_workers,
+        incremental=args.incremental,
+        state_dir=args.state_dir,
+        output_format=args.output_format,
+        save_snapshots=args.save_snapshots,
+        from_snapshots=args.from_snapshots,
+        snapshot_dir=args.snapshot_dir,
+        metrics=metrics,
+    )
+    if args.metrics_file:
+        try:
+            metrics.write(args.metrics_file, args.metrics_format)
+        except Exception as e:
+            log.error(f"Error writing metrics: {e}")
     if success:
         log.success("Comparison completed successfully.")
     else:
@@ -1,56 +1,287 @@
-import requests
+import threading
 import time
-from typing import Optional, Dict, Any
-from tqdm import tqdm
+from typing import Optional, Dict, Any, Iterator, Union
+from src.cache import CacheWriter, ExportCache
 from src.config import config
+from src.json_stream import iter_json_array
 from src.logging_config import log
+from src.progress import DownloadProgress, ProgressReporter
+
+
+RETRY_STATUSES: tuple = (429, 500, 502, 503, 504)
+
+
+class FetchError(Exception):
+    """Raised when a branch export cannot be fetched."""
 
 
 class AltLinuxAPI:
-    """Class to interact with ALT Linux API."""
+    """Class to interact with ALT Linux API.
+
+    A single instance may be shared between threads: requests go through one
+    pooled session holding up to `pool_size` keep-alive connections per host.
+    With a `cache`, exports are revalidated with conditional requests and only
+    re-downloaded when they changed; `offline` serves them from the cache only.
+    Streamed downloads report bytes received and packages parsed to `progress`.
+
+    Requests time out after `timeout` (connect, read) seconds and are retried
+    with exponential backoff on connection errors and 429/5xx responses. A
+    request that still fails raises `FetchError`, and after `max_failures`
+    consecutive failures the client stops sending requests altogether (the
+    circuit opens), so a run fails fast instead of comparing partial data.
+    After `cooldown` seconds the circuit is half-open: one trial request is
+    sent, closing the circuit if it succeeds and reopening it otherwise.
+    `requests` is imported on first use, keeping it out of the import path of
+    modules that only need the API type.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = config.max_workers,
+        cache: Optional[ExportCache] = None,
+        offline: bool = False,
+        progress: Optional[ProgressReporter] = None,
+        timeout: tuple = (config.connect_timeout, config.read_timeout),
+        retries: int = config.retries,
+        max_failures: int = config.max_failures,
+        cooldown: float = config.circuit_cooldown,
+    ) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+        from urllib3.util.request import ACCEPT_ENCODING
 
-    def __init__(self) -> None:
         self.base_url: str = config.base_url
+        self.progress: ProgressReporter = progress or ProgressReporter()
+        self.cache: Optional[ExportCache] = cache
+        self.offline: bool = offline
+        self.timeout: tuple = timeout
+        self.max_failures: int = max_failures
+        self.cooldown: float = cooldown
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+        self._trial: bool = False
+        self._circuit: threading.Condition = threading.Condition()
+        self.session: requests.Session = requests.Session()
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=config.retry_backoff,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=("GET",),
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Every content coding urllib3 can decode: gzip and deflate, plus br and
+        # zstd when brotli/zstandard are installed.
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
 
-    def fetch_packages(self, branch: str, arch: Optional[str] = None) -> Dict[str, Any]:
+    def _export_url(self, branch: str) -> str:
+        """
+        Builds the branch_binary_packages export URL, logging an error for unknown branches.
+        Args:
+            branch (str): The branch for which packages are to be fetched.
+        Returns:
+            str: The export URL.
+        """
+        if branch not in config.known_branches:
+            log.error(
+                f"Invalid branch '{branch}'. Allowed branches: {config.known_branches}"
+            )
+
+        url: str = f"{self.base_url}/export/branch_binary_packages/{branch}"
+        log.debug(f"Fetching packages from URL: {url}")
+        return url
+
+    def _check_circuit(self, branch: str) -> None:
+        """
+        Fails fast once `max_failures` requests in a row have failed, until the
+        cool-down has passed; then lets a single trial request through. Other
+        requests wait for the trial's response and go ahead if it succeeded.
+        Raises:
+            FetchError: If the circuit is open.
+        """
+        with self._circuit:
+            self._circuit.wait_for(lambda: not self._trial)
+            if self._failures < self.max_failures:
+                return
+            if time.monotonic() - self._opened_at < self.cooldown:
+                raise FetchError(
+                    f"Not fetching branch {branch}: {self._failures} requests "
+                    "in a row failed"
+                )
+            self._trial = True
+
+    def _record_result(self, success: Optional[bool]) -> None:
+        """
+        Records the outcome of a request that passed `_check_circuit`; streamed
+        requests succeed once the response is accepted.
+        Args:
+            success (Optional[bool]): Whether it succeeded; None if it ended
+                without an outcome, e.g. a stream closed early by its consumer.
+        """
+        with self._circuit:
+            self._trial = False
+            self._circuit.notify_all()
+            if success:
+                self._failures = 0
+            elif success is not None:
+                self._failures += 1
+                if self._failures >= self.max_failures:
+                    self._opened_at = time.monotonic()
+
+    def fetch_packages(
+        self, branch: str, arch: Optional[str] = None, stream: bool = False
+    ) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
         """
         Fetches packages for a specific branch from the ALT Linux API.
         Args:
             branch (str): The branch for which packages are to be fetched.
             arch (Optional[str]): The architecture of the packages to fetch.
+            stream (bool): Whether to return a lazy iterator over the packages
+                instead of the fully loaded list (see `iter_packages`).
         Returns:
-            Dict[str, Any]: A dictionary containing the fetched packages.
+            Union[Dict[str, Any], Iterator[Dict[str, Any]]]: The fetched packages.
         Raises:
-            requests.exceptions.RequestException: If there is an issue with the request.
+            FetchError: If the request fails after retries, or the circuit is open.
         """
-        if branch not in config.branches:
-            log.error(f"Invalid branch '{branch}'. Allowed branches: {config.branches}")
+        if stream:
+            return self.iter_packages(branch, arch)
+        if self.cache is not None:
+            return list(self.iter_packages(branch, arch))
 
-        url: str = f"{self.base_url}/export/branch_binary_packages/{branch}"
+        import requests
+
+        url: str = self._export_url(branch)
         params: dict = {"arch": arch} if arch else {}
-        log.debug(f"Fetching packages from URL: {url}")
+        self._check_circuit(branch)
 
         try:
-            start_time: float = time.time()
-            response: requests.Response = requests.get(url, params=params)
+            response: requests.Response = self.session.get(
+                url, params=params, timeout=self.timeout
+            )
             response.raise_for_status()
-            end_time: float = time.time()
-            elapsed_time: float = end_time - start_time
-
-            with tqdm(
-                total=100, desc=f"Fetching data for {branch}", leave=True
-            ) as pbar:
-
-                for _ in range(100):
-                    time.sleep(elapsed_time / 100)
-                    pbar.update(1)
 
             log.success(f"Successfully fetched packages for branch {branch}")
 
             packages: Dict[str, Any] = response.json().get("packages")
 
-            return packages
+        except requests.exceptions.RequestException as e:
+            self._record_result(False)
+            log.error(f"Failed to fetch data for branch {branch}: {e}")
+            raise FetchError(f"Failed to fetch data for branch {branch}: {e}") from e
+        except BaseException:
+            self._record_result(None)
+            raise
+
+        self._record_result(True)
+        return packages
+
+    def iter_packages(
+        self, branch: str, arch: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams packages for a specific branch, parsing the response incrementally.
+        The export is read in `config.chunk_size` chunks, so only one package dict
+        is decoded at a time and the raw payload is never held in memory.
+        Args:
+            branch (str): The branch for which packages are to be fetched.
+            arch (Optional[str]): The architecture of the packages to fetch.
+        Returns:
+            Iterator[Dict[str, Any]]: The packages in export order.
+        Raises:
+            LookupError: In offline mode, if the export is not cached.
+            FetchError: If the request fails after retries, or the circuit is open.
+        """
+        import requests
+
+        url: str = self._export_url(branch)
+        params: dict = {"arch": arch} if arch else {}
+        key: str = ExportCache.key(branch, arch)
+
+        if self.offline:
+            if self.cache is None or self.cache.read_meta(key) is None:
+                log.error(f"No cached data for branch {branch} in offline mode")
+                raise LookupError(f"No cached export for {key}")
+            log.info(f"Using cached packages for branch {branch} (offline)")
+            progress: Optional[DownloadProgress] = self.progress.start(
+                f"Reading cached data for {branch}"
+            )
+            try:
+                yield from progress.track_items(
+                    iter_json_array(
+                        progress.track_bytes(self.cache.read(key)), "packages"
+                    )
+                )
+            finally:
+                progress.close()
+            return
+
+        self._check_circuit(branch)
+        headers: dict = self.cache.conditional_headers(key) if self.cache else {}
+        writer: Optional[CacheWriter] = None
+        progress = None
+        recorded: bool = False
+        try:
+            with self.session.get(
+                url, params=params, headers=headers, stream=True, timeout=self.timeout
+            ) as response:
+                if response.status_code == 304 and self.cache is not None:
+                    log.info(f"Packages for branch {branch} not modified, using cache")
+                    progress = self.progress.start(f"Reading cached data for {branch}")
+                    chunks: Iterator[bytes] = progress.track_bytes(self.cache.read(key))
+                else:
+                    response.raise_for_status()
+                    log.debug(
+                        f"Export of {branch} sent with Content-Encoding: "
+                        f"{response.headers.get('Content-Encoding', 'identity')}"
+                    )
+                    content_length: Optional[str] = response.headers.get(
+                        "Content-Length"
+                    )
+                    progress = self.progress.start(
+                        f"Fetching data for {branch}",
+                        total=int(content_length) if content_length else None,
+                    )
+                    # Content-Length counts encoded bytes, so follow the raw stream
+                    # position when the body is decoded on the fly.
+                    chunks = progress.track_bytes(
+                        response.iter_content(chunk_size=config.chunk_size),
+                        position=(
+                            response.raw.tell
+                            if response.headers.get("Content-Encoding")
+                            else None
+                        ),
+                    )
+                    if self.cache is not None:
+                        writer = self.cache.writer(key, response.headers)
+                        chunks = writer.tee(chunks)
+
+                # The server answered: end a trial before the body is consumed.
+                self._record_result(True)
+                recorded = True
+                yield from progress.track_items(iter_json_array(chunks, "packages"))
+
+                if writer is not None:
+                    writer.commit(chunks)
+
+            log.success(f"Successfully fetched packages for branch {branch}")
 
         except requests.exceptions.RequestException as e:
+            # Also counts streams that broke after the response was accepted.
+            self._record_result(False)
+            recorded = True
             log.error(f"Failed to fetch data for branch {branch}: {e}")
-            return {}
+            raise FetchError(f"Failed to fetch data for branch {branch}: {e}") from e
+
+        finally:
+            # Also closes bars of failed or abandoned downloads.
+            if progress is not None:
+                progress.close()
+            if not recorded:
+                self._record_result(None)
+            if writer is not None:
+                writer.close()
@@ -0,0 +1,204 @@
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+from src.config import config
+from src.logging_config import log
+
+
+class CacheWriter:
+    """Writes a downloaded export into the cache while it is being consumed."""
+
+    def __init__(self, cache: "ExportCache", key: str, headers: Dict[str, str]) -> None:
+        self.cache: ExportCache = cache
+        self.key: str = key
+        self.etag: Optional[str] = headers.get("ETag")
+        self.last_modified: Optional[str] = headers.get("Last-Modified")
+        self._tmp_path: str = f"{cache.data_path(key)}.{os.getpid()}.tmp"
+        self._file = None
+
+    def tee(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Passes chunks through unchanged, compressing a copy into a temporary cache file.
+        Args:
+            chunks (Iterable[bytes]): The raw response chunks.
+        Returns:
+            Iterator[bytes]: The same chunks.
+        """
+        os.makedirs(self.cache.directory, exist_ok=True)
+        self._file = gzip.open(self._tmp_path, "wb", compresslevel=1)
+        for chunk in chunks:
+            self._file.write(chunk)
+            yield chunk
+
+    def commit(self, remaining: Iterable[bytes]) -> None:
+        """
+        Drains any chunks not read by the consumer and publishes the cache entry atomically.
+        Args:
+            remaining (Iterable[bytes]): The partially consumed iterator returned by `tee`.
+        """
+        for _ in remaining:
+            pass
+        self._file.close()
+        os.replace(self._tmp_path, self.cache.data_path(self.key))
+        now: float = time.time()
+        self.cache.write_meta(
+            self.key,
+            {
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "stored_at": now,
+                "accessed_at": now,
+                "size": os.path.getsize(self.cache.data_path(self.key)),
+            },
+        )
+        log.debug(f"Cached export {self.key}")
+        self.cache.evict()
+
+    def close(self) -> None:
+        """Discards the temporary file of an uncommitted entry."""
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class ExportCache:
+    """
+    Persistent gzip-compressed cache of branch exports, keyed by branch and architecture.
+    Entries keep the ETag/Last-Modified validators of the response they came from,
+    so they can be revalidated with a conditional request instead of re-downloaded.
+    """
+
+    def __init__(
+        self,
+        directory: str = config.cache_dir,
+        max_age: float = config.cache_max_age,
+        max_size: int = config.cache_max_size,
+    ) -> None:
+        self.directory: str = directory
+        self.max_age: float = max_age
+        self.max_size: int = max_size
+
+    @staticmethod
+    def key(branch: str, arch: Optional[str]) -> str:
+        """
+        Builds the cache key of a branch export.
+        Args:
+            branch (str): The branch name.
+            arch (Optional[str]): The architecture, or None for all architectures.
+        Returns:
+            str: The cache key.
+        """
+        return f"{branch}_{arch or 'all'}".replace(os.sep, "_")
+
+    def data_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.meta.json")
+
+    def read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads the metadata of a cache entry.
+        Args:
+            key (str): The cache key.
+        Returns:
+            Optional[Dict[str, Any]]: The metadata, or None if the entry is missing or incomplete.
+        """
+        try:
+            with open(self.meta_path(key), encoding="utf-8") as f:
+                meta: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if os.path.exists(self.data_path(key)) else None
+
+    def write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        with open(self.meta_path(key), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """
+        Builds the revalidation headers for a cache entry.
+        Args:
+            key (str): The cache key.
+        Returns:
+            Dict[str, str]: If-None-Match/If-Modified-Since headers, empty if nothing is cached.
+        """
+        meta: Optional[Dict[str, Any]] = self.read_meta(key)
+        headers: Dict[str, str] = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read(self, key: str) -> Iterator[bytes]:
+        """
+        Streams a cached export and marks the entry as recently used.
+        Args:
+            key (str): The cache key.
+        Returns:
+            Iterator[bytes]: Decompressed chunks of the cached export.
+        Raises:
+            LookupError: If the entry is not cached.
+        """
+        meta: Optional[Dict[str, Any]] = self.read_meta(key)
+        if meta is None:
+            raise LookupError(f"No cached export for {key}")
+
+        meta["accessed_at"] = time.time()
+        self.write_meta(key, meta)
+        return self._read_chunks(self.data_path(key))
+
+    @staticmethod
+    def _read_chunks(path: str) -> Iterator[bytes]:
+        with gzip.open(path, "rb") as f:
+            while chunk := f.read(config.chunk_size):
+                yield chunk
+
+    def writer(self, key: str, headers: Dict[str, str]) -> CacheWriter:
+        """
+        Creates a writer storing a fresh response under `key`.
+        Args:
+            key (str): The cache key.
+            headers (Dict[str, str]): The response headers holding the validators.
+        Returns:
+            CacheWriter: The writer.
+        """
+        return CacheWriter(self, key, headers)
+
+    def remove(self, key: str) -> None:
+        for path in (self.data_path(key), self.meta_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self) -> None:
+        """
+        Removes entries unused for longer than `max_age` seconds, then the least
+        recently used entries until the cache fits into `max_size` bytes.
+        """
+        if not os.path.isdir(self.directory):
+            return
+
+        now: float = time.time()
+        entries: list = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".meta.json"):
+                continue
+            key: str = filename[: -len(".meta.json")]
+            meta: Optional[Dict[str, Any]] = self.read_meta(key)
+            if meta is None or now - meta.get("accessed_at", 0) > self.max_age:
+                log.debug(f"Evicting expired cache entry {key}")
+                self.remove(key)
+            else:
+                entries.append((meta.get("accessed_at", 0), meta.get("size", 0), key))
+
+        total_size: int = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            log.debug(f"Evicting cache entry {key} to fit the size limit")
+            self.remove(key)
+            total_size -= size
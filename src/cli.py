@@ -1,10 +1,46 @@
 import argparse
+import json
+import os
 from argparse import ArgumentParser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from src.altlinux_api import AltLinuxAPI
+from src.cache import ExportCache
 from src.config import config
-from src.utils import get_dump_json, log_packages
-from src.comparison import compare_packages, filter_package_data
+from src.fetcher import fetch_all, iter_fetch
+from src.filters import PackageFilter, read_names
+from src.incremental import RunState, compare_incremental
+from src.utils import get_dump_json
+from src.comparison import (
+    REPORT_EXCLUDED_FIELDS,
+    compare_matrix,
+    compare_packages,
+    compare_sources,
+    iter_merge_join_category,
+    split_noarch,
+)
 from src.logging_config import log
+from src.metrics import METRICS_FORMATS, Metrics
+from src.package_index import PackageIndex
+from src.package_table import COLUMNS
+from src.pipeline import PipelineError, Stage, run_pipeline
+from src.progress import PROGRESS_MODES, ProgressReporter
+from src.snapshot import index_path, load_branch_snapshots, save_branch_snapshots
+from src.writers import (
+    OUTPUT_FORMATS,
+    TABLE_FORMATS,
+    ItemStream,
+    iter_report_rows,
+    write_table,
+)
+
+
+# What failed, by pipeline stage, for the error logged by pipelined runs.
+_STAGE_ERRORS: Dict[str, str] = {
+    "fetch": "fetching packages",
+    "load_snapshots": "loading snapshots",
+    "save_snapshots": "saving snapshots",
+    "compare": "comparing packages",
+}
 
 
 def parse_args() -> argparse.Namespace:
@@ -16,7 +52,12 @@ def parse_args() -> argparse.Namespace:
     parser: ArgumentParser = ArgumentParser(
         prog="compare_packages",
         description="Compare binary packages between sisyphus and p10 branches.",
-        usage="compare_packages [-a <arch>] [-o <output_file>]",
+        usage="compare_packages [-a <arch> | --all-arches [--dedupe-noarch]] "
+        "[--by-source [--expand-binaries]] [-j <jobs>] [--pipeline] "
+        "[--no-cache | --offline] [-o <output_file>]\n"
+        "       compare_packages lookup [-a <arch>] [--prefix] <name> [<name> ...]\n"
+        "       compare_packages serve [-a <arch>] [--host <host>] [--port <port>] "
+        "[--refresh-interval <seconds>]",
     )
     parser.add_argument(
         "-a",
@@ -24,6 +65,201 @@ def parse_args() -> argparse.Namespace:
         dest="arch",
         help="Specify the architecture to compare (x86_64, ppc64le, i586, armh, aarch64).",
     )
+    parser.add_argument(
+        "-b",
+        "--branches",
+        dest="branches",
+        nargs="+",
+        choices=config.known_branches,
+        help="Compare every pair of these branches instead of sisyphus and p10.",
+    )
+    parser.add_argument(
+        "--all-arches",
+        dest="all_arches",
+        action="store_true",
+        help="Compare all architectures in one run.",
+    )
+    parser.add_argument(
+        "--dedupe-noarch",
+        dest="dedupe_noarch",
+        action="store_true",
+        help="Compare noarch packages shared by every architecture once and "
+        "report them under 'noarch' instead of under each architecture.",
+    )
+    parser.add_argument(
+        "--by-source",
+        dest="by_source",
+        action="store_true",
+        help="Compare source packages, grouping binaries by their source, instead "
+        "of binary packages.",
+    )
+    parser.add_argument(
+        "--expand-binaries",
+        dest="expand_binaries",
+        action="store_true",
+        help="With --by-source, list the binary packages of each reported source.",
+    )
+    parser.add_argument(
+        "--name-prefix",
+        dest="name_prefixes",
+        nargs="+",
+        metavar="PREFIX",
+        help="Only compare packages whose names start with one of these prefixes.",
+    )
+    parser.add_argument(
+        "--name-regex",
+        dest="name_regex",
+        metavar="REGEX",
+        help="Only compare packages whose names contain a match of this regular expression.",
+    )
+    parser.add_argument(
+        "--names-file",
+        dest="names_file",
+        help="Only compare the packages named in this file, one name per line.",
+    )
+    parser.add_argument(
+        "--fields",
+        dest="fields",
+        nargs="+",
+        choices=COLUMNS,
+        help="Only keep these package fields (name, epoch, version and release are always kept).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        help="Maximum number of concurrent downloads.",
+        default=config.max_workers,
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        dest="connect_timeout",
+        type=float,
+        help=f"Seconds to wait for a connection to the API (default: {config.connect_timeout:g}).",
+        default=config.connect_timeout,
+    )
+    parser.add_argument(
+        "--read-timeout",
+        dest="read_timeout",
+        type=float,
+        help=f"Seconds to wait for data from the API (default: {config.read_timeout:g}).",
+        default=config.read_timeout,
+    )
+    parser.add_argument(
+        "--retries",
+        dest="retries",
+        type=int,
+        help=f"Retries on connection errors and 5xx responses (default: {config.retries}).",
+        default=config.retries,
+    )
+    parser.add_argument(
+        "--compare-workers",
+        dest="compare_workers",
+        type=int,
+        help="Number of processes for version comparisons on large branches "
+        f"(default: {config.compare_workers}).",
+        default=config.compare_workers,
+    )
+    parser.add_argument(
+        "--pipeline",
+        dest="pipeline",
+        action="store_true",
+        help="Overlap fetching, comparing and writing: each architecture "
+        "is compared as soon as its branches are fetched and written once compared.",
+    )
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        help="Reuse the previous run's result and report what changed since then.",
+    )
+    parser.add_argument(
+        "--state-dir",
+        dest="state_dir",
+        help="Directory for the run state used by --incremental.",
+        default=config.state_dir,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        help="Directory for cached branch exports.",
+        default=config.cache_dir,
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Always download branch exports, bypassing the cache.",
+    )
+    cache_group.add_argument(
+        "--offline",
+        dest="offline",
+        action="store_true",
+        help="Serve branch exports from the cache only, without network access.",
+    )
+    snapshot_group = parser.add_mutually_exclusive_group()
+    snapshot_group.add_argument(
+        "--save-snapshots",
+        dest="save_snapshots",
+        action="store_true",
+        help="Save the fetched branches as compressed binary snapshots.",
+    )
+    snapshot_group.add_argument(
+        "--from-snapshots",
+        dest="from_snapshots",
+        action="store_true",
+        help="Load the branches from saved snapshots instead of fetching them.",
+    )
+    parser.add_argument(
+        "--merge-join",
+        dest="merge_join",
+        action="store_true",
+        help="With --from-snapshots, diff the name-sorted snapshot indexes in a "
+        "streaming pass instead of loading the branches into memory.",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        dest="snapshot_dir",
+        help="Directory for branch snapshots.",
+        default=config.snapshot_dir,
+    )
+    parser.add_argument(
+        "--progress",
+        dest="progress",
+        choices=PROGRESS_MODES,
+        help="Progress reporting: bars on a terminal, one log line per download for batch runs (default: auto).",
+        default="auto",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="output_format",
+        choices=OUTPUT_FORMATS,
+        help="Output format: indented json, compact json, ndjson, or one row per "
+        "package as csv, arrow or parquet (arrow and parquet need pyarrow; default: json).",
+        default="json",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        dest="verbose",
+        action="store_true",
+        help="Log every package at DEBUG level (default: package counts only).",
+    )
+    parser.add_argument(
+        "--metrics",
+        dest="metrics_file",
+        help="Write per-stage timings, memory, bytes and package counts to this file.",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        dest="metrics_format",
+        choices=METRICS_FORMATS,
+        help="Metrics file format: json or the prometheus text format (default: json).",
+        default="json",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -31,69 +267,578 @@ def parse_args() -> argparse.Namespace:
         help="Specify the output JSON file to save (only_in_p10, only_in_sisyphus, higher_in_sisyphus, all_packages).",
         default="all_packages",
     )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    lookup_parser: ArgumentParser = subparsers.add_parser(
+        "lookup",
+        help="Look up packages by name in the snapshots saved by --save-snapshots.",
+        description="Print the packages with the given names in each branch, "
+        "read from the snapshot index files without loading the branches.",
+    )
+    lookup_parser.add_argument("names", nargs="+", help="Package names to look up.")
+    lookup_parser.add_argument(
+        "--prefix",
+        dest="prefix",
+        action="store_true",
+        help="Match every package whose name starts with one of the names.",
+    )
+    lookup_parser.add_argument(
+        "-a",
+        "--arch",
+        dest="arch",
+        help="The architecture of the snapshots to search.",
+        default=argparse.SUPPRESS,
+    )
+    lookup_parser.add_argument(
+        "--snapshot-dir",
+        dest="snapshot_dir",
+        help="Directory for branch snapshots.",
+        default=argparse.SUPPRESS,
+    )
+    serve_parser: ArgumentParser = subparsers.add_parser(
+        "serve",
+        help="Serve comparisons and lookups over HTTP from branches kept in memory.",
+        description="Fetch the branches once, keep them in memory and answer "
+        "/compare, /lookup and /health queries over HTTP, refreshing the branches "
+        "in the background.",
+    )
+    serve_parser.add_argument(
+        "-a",
+        "--arch",
+        dest="arch",
+        help="The architecture to serve (default: all).",
+        default=argparse.SUPPRESS,
+    )
+    serve_parser.add_argument(
+        "--host",
+        dest="host",
+        help=f"The address to listen on (default: {config.server_host}).",
+        default=config.server_host,
+    )
+    serve_parser.add_argument(
+        "--port",
+        dest="port",
+        type=int,
+        help=f"The port to listen on (default: {config.server_port}).",
+        default=config.server_port,
+    )
+    serve_parser.add_argument(
+        "--refresh-interval",
+        dest="refresh_interval",
+        type=float,
+        help=f"Seconds between branch refreshes (default: {config.refresh_interval:g}).",
+        default=config.refresh_interval,
+    )
     return parser.parse_args()
 
 
-def run_comparison(arch: str, output_file: str) -> bool:
+def build_package_filter(
+    prefixes: Optional[List[str]] = None,
+    regex: Optional[str] = None,
+    names_file: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Optional[PackageFilter]:
     """
-    Runs the package comparison for the specified architecture and saves the result to a JSON file.
+    Builds the package filter of the --name-prefix, --name-regex, --names-file and --fields options.
     Args:
-        arch (str): The architecture to compare.
-        output_file (str): The name of the output JSON file.
+        prefixes (Optional[List[str]]): Name prefixes.
+        regex (Optional[str]): A regular expression names must contain.
+        names_file (Optional[str]): A file listing the names to compare.
+        fields (Optional[List[str]]): The fields to keep.
     Returns:
-        bool: True if the comparison and saving were successful, False otherwise.
+        Optional[PackageFilter]: The filter, or None if no option is set.
+    Raises:
+        OSError: If the names file cannot be read.
+        re.error: If the regular expression is invalid.
     """
-    api: AltLinuxAPI = AltLinuxAPI()
-
-    log.info(f"Fetching packages for architecture: {arch}")
+    if not (prefixes or regex is not None or names_file or fields):
+        return None
+    return PackageFilter(
+        prefixes=prefixes or (),
+        pattern=regex,
+        names=read_names(names_file) if names_file else None,
+        fields=fields,
+    )
 
-    packages: dict = {}
-    try:
-        for branch in config.branches:
-            packages[branch] = api.fetch_packages(branch, arch)
-    except Exception as e:
-        log.error(f"Error fetching packages: {e}")
-        return False
 
-    log_packages(packages)
+def run_server(
+    arch: Optional[str],
+    host: str = config.server_host,
+    port: int = config.server_port,
+    refresh_interval: float = config.refresh_interval,
+    jobs: int = config.max_workers,
+    use_cache: bool = True,
+    cache_dir: str = config.cache_dir,
+) -> bool:
+    """
+    Loads the branches and serves queries until interrupted.
+    Args:
+        arch (Optional[str]): The architecture to serve; all of `config.arches` if None.
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        refresh_interval (float): Seconds between background refreshes.
+        jobs (int): The maximum number of concurrent downloads.
+        use_cache (bool): Whether to cache branch exports and revalidate them on refreshes.
+        cache_dir (str): The directory holding cached branch exports.
+    Returns:
+        bool: True if the server shut down cleanly, False if it could not start.
+    """
+    from src.server import BranchStore, ComparisonServer
 
+    api: AltLinuxAPI = AltLinuxAPI(
+        pool_size=jobs,
+        cache=ExportCache(cache_dir) if use_cache else None,
+        progress=ProgressReporter("log"),
+    )
+    store: BranchStore = BranchStore(api, [arch] if arch else config.arches, jobs=jobs)
     try:
-        comparison_result: dict = compare_packages(
-            packages["sisyphus"], packages["p10"]
-        )
+        store.refresh()
+        server: ComparisonServer = ComparisonServer((host, port), store)
     except Exception as e:
-        log.error(f"Error comparing packages: {e}")
+        log.error(f"Error starting server: {e}")
         return False
 
+    store.start(refresh_interval)
+    log.info(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
     try:
-        comparison_result["only_in_p10"] = filter_package_data(
-            comparison_result["only_in_p10"]
-        )
-        comparison_result["only_in_sisyphus"] = filter_package_data(
-            comparison_result["only_in_sisyphus"]
-        )
-        comparison_result["higher_in_sisyphus"] = filter_package_data(
-            comparison_result["higher_in_sisyphus"]
-        )
-    except Exception as e:
-        log.error(f"Error processing packages: {e}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.stop()
+        server.server_close()
+    return True
+
+
+def run_lookup(
+    names: List[str],
+    arch: Optional[str],
+    snapshot_dir: str = config.snapshot_dir,
+    prefix: bool = False,
+) -> bool:
+    """
+    Looks up packages by name in the snapshot indexes of every branch and prints them as JSON.
+    Args:
+        names (List[str]): The package names (or name prefixes) to look up.
+        arch (Optional[str]): The architecture of the snapshots.
+        snapshot_dir (str): The directory holding branch snapshots.
+        prefix (bool): Whether to match names by prefix.
+    Returns:
+        bool: True if the lookup succeeded, False otherwise.
+    """
+    branches: List[str] = sorted(config.branches)
+    result: Dict[str, dict] = {}
+    for branch in branches:
+        try:
+            index: PackageIndex = PackageIndex(index_path(snapshot_dir, branch, arch))
+        except Exception as e:
+            log.error(f"Error opening package index: {e}")
+            return False
+        with index:
+            for name in names:
+                matches: Dict[str, Optional[dict]] = (
+                    {package["name"]: package for package in index.prefix(name)}
+                    if prefix
+                    else {name: index.get(name)}
+                )
+                for match, package in matches.items():
+                    result.setdefault(match, dict.fromkeys(branches))[branch] = package
+
+    if prefix:
+        result = dict(sorted(result.items()))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return True
+
+
+def _merge_join_packages(
+    snapshot_dir: str,
+    arch: Optional[str],
+    category: str,
+    package_filter: Optional[PackageFilter],
+) -> Iterator[dict]:
+    """
+    Streams one category of the comparison of the sisyphus and p10 snapshot
+    indexes of an architecture (see `iter_merge_join`). The indexes are read
+    in place, one record at a time, and closed once the category is written.
+    """
+    with PackageIndex(index_path(snapshot_dir, "sisyphus", arch)) as sisyphus:
+        with PackageIndex(index_path(snapshot_dir, "p10", arch)) as p10:
+            packages: Tuple[Iterable[dict], Iterable[dict]] = (sisyphus, p10)
+            if package_filter is not None:
+                packages = (package_filter.apply(sisyphus), package_filter.apply(p10))
+            yield from iter_merge_join_category(*packages, category)
+
+
+def _staged(metrics: Metrics, name: str, items: Iterable[Any]) -> Iterator[Any]:
+    """
+    Measures the production of each item of an iterable as part of a metrics stage.
+    """
+    iterator: Iterator[Any] = iter(items)
+    while True:
+        with metrics.stage(name):
+            # The items are (arch, tables) pairs, never None.
+            item: Any = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+
+# Options of `run_comparison` that cannot be used together: each option, then
+# the options it conflicts with.
+_CONFLICTS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("--branches", ("--incremental",)),
+    (
+        "--by-source",
+        # Source grouping needs the "source" field and every binary of a source.
+        ("--branches", "--incremental", "--dedupe-noarch", "--fields"),
+    ),
+    ("Package filters", ("--incremental", "--save-snapshots")),
+    ("--pipeline", ("--dedupe-noarch",)),
+    (
+        "--merge-join",
+        ("--branches", "--incremental", "--by-source", "--dedupe-noarch", "--pipeline"),
+    ),
+)
+
+
+def _validate_options(
+    branches: Optional[List[str]] = None,
+    incremental: bool = False,
+    by_source: bool = False,
+    dedupe_noarch: bool = False,
+    package_filter: Optional[PackageFilter] = None,
+    save_snapshots: bool = False,
+    from_snapshots: bool = False,
+    pipeline: bool = False,
+    merge_join: bool = False,
+) -> Optional[str]:
+    """
+    Checks that the options of a `run_comparison` call can be used together.
+    Every unsupported combination is listed in `_CONFLICTS`, so each option is
+    checked against all the others at once.
+    Args:
+        branches (Optional[List[str]]): The branches of a branch matrix.
+        incremental (bool): Whether the run is incremental.
+        by_source (bool): Whether source packages are compared.
+        dedupe_noarch (bool): Whether shared noarch packages are compared once.
+        package_filter (Optional[PackageFilter]): The package filter.
+        save_snapshots (bool): Whether the fetched branches are saved as snapshots.
+        from_snapshots (bool): Whether the branches are loaded from snapshots.
+        pipeline (bool): Whether the stages run as a pipeline.
+        merge_join (bool): Whether the snapshot indexes are merge-joined.
+    Returns:
+        Optional[str]: The error to report, or None if the options are compatible.
+    """
+    if branches and len(dict.fromkeys(branches)) < 2:
+        return "Branch matrices need two or more distinct branches"
+    if merge_join and not from_snapshots:
+        return "--merge-join needs --from-snapshots"
+    options: Dict[str, bool] = {
+        "--branches": bool(branches),
+        "--incremental": incremental,
+        "--by-source": by_source,
+        "--dedupe-noarch": dedupe_noarch,
+        "--fields": package_filter is not None and package_filter.fields is not None,
+        "Package filters": package_filter is not None,
+        "--save-snapshots": save_snapshots,
+        "--pipeline": pipeline,
+        "--merge-join": merge_join,
+    }
+    for option, others in _CONFLICTS:
+        if options[option]:
+            conflicting: List[str] = [other for other in others if options[other]]
+            if conflicting:
+                return f"{option} cannot be combined with {', '.join(conflicting)}"
+    return None
+
+
+def run_comparison(
+    arch: Optional[str],
+    output_file: str,
+    all_arches: bool = False,
+    jobs: int = config.max_workers,
+    connect_timeout: float = config.connect_timeout,
+    read_timeout: float = config.read_timeout,
+    retries: int = config.retries,
+    use_cache: bool = True,
+    offline: bool = False,
+    cache_dir: str = config.cache_dir,
+    progress: str = "auto",
+    compare_workers: int = config.compare_workers,
+    incremental: bool = False,
+    state_dir: str = config.state_dir,
+    output_format: str = "json",
+    save_snapshots: bool = False,
+    from_snapshots: bool = False,
+    snapshot_dir: str = config.snapshot_dir,
+    branches: Optional[List[str]] = None,
+    metrics: Optional[Metrics] = None,
+    dedupe_noarch: bool = False,
+    package_filter: Optional[PackageFilter] = None,
+    by_source: bool = False,
+    expand_binaries: bool = False,
+    pipeline: bool = False,
+    merge_join: bool = False,
+) -> bool:
+    """
+    Runs the package comparison for the specified architecture and saves the result to a JSON file.
+    Args:
+        arch (Optional[str]): The architecture to compare.
+        output_file (str): The name of the output JSON file.
+        all_arches (bool): Whether to compare every architecture in `config.arches` instead of `arch`.
+        jobs (int): The maximum number of concurrent downloads.
+        connect_timeout (float): The connect timeout of API requests, in seconds.
+        read_timeout (float): The read timeout of API requests, in seconds.
+        retries (int): The number of retries of failed API requests.
+        use_cache (bool): Whether to cache branch exports and revalidate them on re-runs.
+        offline (bool): Whether to serve branch exports from the cache only.
+        cache_dir (str): The directory holding cached branch exports.
+        progress (str): The download progress mode (auto, bar, log, off).
+        compare_workers (int): The number of processes for version comparisons.
+        incremental (bool): Whether to patch the previous run's result instead of recomputing it.
+        state_dir (str): The directory holding the run state for incremental runs.
+        output_format (str): The output format (json, compact, ndjson, csv, arrow, parquet).
+        save_snapshots (bool): Whether to save the fetched branches as snapshots.
+        from_snapshots (bool): Whether to load the branches from snapshots instead of fetching them.
+        snapshot_dir (str): The directory holding branch snapshots.
+        branches (Optional[List[str]]): Branches to compare pairwise (see `compare_matrix`)
+            instead of sisyphus and p10. Each branch is fetched once.
+        metrics (Optional[Metrics]): Collects the time, memory and counts of each
+            stage (fetch or load_snapshots, save_snapshots, compare, write).
+        dedupe_noarch (bool): Whether to compare the noarch packages shared by every
+            architecture once (see `split_noarch`) and report them under "noarch".
+        package_filter (Optional[PackageFilter]): Compares only the matching packages,
+            dropping the others (and unprojected fields) as the branches are parsed.
+        by_source (bool): Whether to compare source packages (see `compare_sources`)
+            instead of binary packages.
+        expand_binaries (bool): Whether to list the binaries of each reported source.
+        pipeline (bool): Whether to run the stages as a pipeline (see `run_pipeline`):
+            each architecture is compared as soon as its branches are fetched, and
+            written while the next ones are fetched and compared.
+        merge_join (bool): Whether to compare the snapshot indexes of sisyphus and
+            p10 with a streaming merge-join (see `iter_merge_join`) instead of
+            loading the snapshots; requires `from_snapshots`.
+    Returns:
+        bool: True if the comparison and saving were successful, False otherwise,
+            including for options that cannot be combined (see `_validate_options`).
+    """
+    error: Optional[str] = _validate_options(
+        branches=branches,
+        incremental=incremental,
+        by_source=by_source,
+        dedupe_noarch=dedupe_noarch,
+        package_filter=package_filter,
+        save_snapshots=save_snapshots,
+        from_snapshots=from_snapshots,
+        pipeline=pipeline,
+        merge_join=merge_join,
+    )
+    if error is not None:
+        log.error(error)
         return False
 
-    try:
-        if output_file == "only_in_p10":
-            data_to_save = {output_file: {arch: comparison_result["only_in_p10"]}}
-        elif output_file == "only_in_sisyphus":
-            data_to_save = {output_file: {arch: comparison_result["only_in_sisyphus"]}}
-        elif output_file == "higher_in_sisyphus":
-            data_to_save = {
-                output_file: {arch: comparison_result["higher_in_sisyphus"]}
+    metrics = metrics or Metrics()
+    cache: Optional[ExportCache] = (
+        ExportCache(cache_dir) if use_cache or offline else None
+    )
+    api: AltLinuxAPI = AltLinuxAPI(
+        pool_size=jobs,
+        cache=cache,
+        offline=offline,
+        progress=ProgressReporter(progress, on_close=metrics.record_download),
+        timeout=(connect_timeout, read_timeout),
+        retries=retries,
+    )
+    arches: List[Optional[str]] = list(config.arches) if all_arches else [arch]
+    branch_list: List[str] = (
+        list(dict.fromkeys(branches)) if branches else sorted(config.branches)
+    )
+
+    def load_snapshots(snapshot_arches: List[Optional[str]]) -> dict:
+        with metrics.stage("load_snapshots"):
+            tables: dict = load_branch_snapshots(
+                snapshot_dir, branch_list, snapshot_arches
+            )
+            if package_filter is not None:
+                tables = {
+                    key: package_filter.filter_table(table)
+                    for key, table in tables.items()
+                }
+        return tables
+
+    def save(fetched: dict) -> None:
+        with metrics.stage("save_snapshots"):
+            save_branch_snapshots(fetched, snapshot_dir)
+
+    states: dict = {}
+
+    def compare(arch: Optional[str], packages: dict) -> dict:
+        with metrics.stage("compare"):
+            metrics.count(
+                "compare",
+                "packages",
+                sum(len(packages[(branch, arch)]) for branch in branch_list),
+            )
+            if branches:
+                return compare_matrix(
+                    {branch: packages[(branch, arch)] for branch in branch_list},
+                    exclude=REPORT_EXCLUDED_FIELDS,
+                )
+            if incremental:
+                state_path: str = RunState.path(state_dir, arch)
+                comparison_result, states[state_path] = compare_incremental(
+                    packages[("sisyphus", arch)],
+                    packages[("p10", arch)],
+                    RunState.load(state_path),
+                    workers=compare_workers,
+                    exclude=REPORT_EXCLUDED_FIELDS,
+                )
+                return comparison_result
+            if by_source:
+                return compare_sources(
+                    packages[("sisyphus", arch)],
+                    packages[("p10", arch)],
+                    expand=expand_binaries,
+                    exclude=REPORT_EXCLUDED_FIELDS,
+                )
+            return compare_packages(
+                packages[("sisyphus", arch)],
+                packages[("p10", arch)],
+                workers=compare_workers,
+                exclude=REPORT_EXCLUDED_FIELDS,
+            )
+
+    results: Any
+    if merge_join:
+        missing: List[str] = [
+            path
+            for arch in arches
+            for path in (
+                index_path(snapshot_dir, "sisyphus", arch),
+                index_path(snapshot_dir, "p10", arch),
+            )
+            if not os.path.exists(path)
+        ]
+        if missing:
+            log.error(f"Error loading snapshots: missing index files {missing}")
+            return False
+        # Each category is a separate pass over the indexes, written as it is read.
+        results = {
+            arch: {
+                category: _merge_join_packages(
+                    snapshot_dir, arch, category, package_filter
+                )
+                for category in (
+                    "only_in_p10",
+                    "only_in_sisyphus",
+                    "higher_in_sisyphus",
+                )
             }
+            for arch in arches
+        }
+    elif pipeline:
+        source: str = "load_snapshots" if from_snapshots else "fetch"
+        fetched: Iterable[Tuple[Optional[str], dict]] = (
+            ((arch, load_snapshots([arch])) for arch in arches)
+            if from_snapshots
+            else _staged(
+                metrics,
+                "fetch",
+                iter_fetch(
+                    api,
+                    branch_list,
+                    arches,
+                    max_workers=jobs,
+                    package_filter=package_filter,
+                ),
+            )
+        )
+        stages: List[Stage] = []
+        if save_snapshots and not from_snapshots:
+            stages.append(("save_snapshots", lambda item: save(item[1]) or item))
+        stages.append(("compare", lambda item: (item[0], compare(*item))))
+        results = ItemStream(run_pipeline(fetched, stages, source=source))
+    else:
+        if from_snapshots:
+            try:
+                packages: dict = load_snapshots(arches)
+            except Exception as e:
+                log.error(f"Error loading snapshots: {e}")
+                return False
         else:
-            data_to_save: dict = {output_file: {arch: comparison_result}}
+            log.info(f"Fetching packages for architectures: {arches}")
 
-        get_dump_json(data_to_save, f"{output_file}.json")
+            try:
+                with metrics.stage("fetch"):
+                    packages = fetch_all(
+                        api,
+                        branch_list,
+                        arches,
+                        max_workers=jobs,
+                        package_filter=package_filter,
+                    )
+            except Exception as e:
+                log.error(f"Error fetching packages: {e}")
+                return False
+
+            if save_snapshots:
+                try:
+                    save(packages)
+                except Exception as e:
+                    log.error(f"Error saving snapshots: {e}")
+                    return False
+
+        if dedupe_noarch:
+            try:
+                with metrics.stage("split_noarch"):
+                    packages = split_noarch(packages, branch_list, arches)
+            except Exception as e:
+                log.error(f"Error splitting noarch packages: {e}")
+                return False
+            arches = ["noarch"] + arches
+
+        results = {}
+        for arch in arches:
+            try:
+                results[arch] = compare(arch, packages)
+            except Exception as e:
+                log.error(f"Error comparing packages: {e}")
+                return False
+
+    try:
+        category_file: bool = not branches and output_file in (
+            "only_in_p10",
+            "only_in_sisyphus",
+            "higher_in_sisyphus",
+        )
+        if output_format in TABLE_FORMATS:
+            path: str = f"{output_file}.{output_format}"
+            with metrics.stage("write"):
+                write_table(
+                    iter_report_rows(results, [output_file] if category_file else None),
+                    path,
+                    output_format,
+                )
+            log.success(f"Data saved to {path}")
+        else:
+            if category_file:
+                categories: Iterator[Tuple[Optional[str], list]] = (
+                    (arch, result[output_file]) for arch, result in results.items()
+                )
+                results = ItemStream(categories) if pipeline else dict(categories)
+            data_to_save: dict = {output_file: results}
+            extension: str = "ndjson" if output_format == "ndjson" else "json"
+            path = f"{output_file}.{extension}"
+            with metrics.stage("write"):
+                get_dump_json(data_to_save, path, fmt=output_format)
+        if os.path.exists(path):
+            metrics.count("write", "bytes", os.path.getsize(path))
+        for state_path, state in states.items():
+            state.save(state_path)
         return True
 
+    except PipelineError as e:
+        log.error(f"Error {_STAGE_ERRORS[e.stage]}: {e.error}")
+        return False
     except Exception as e:
-        log.error(f"Error saving {output_file}.json: {e}")
+        log.error(f"Error saving {output_file}: {e}")
         return False
@@ -1,10 +1,22 @@
-from typing import List, Dict
+import itertools
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple
 from version_utils import rpm
+from src import evr_arrays
+from src.config import config
+from src.logging_config import log
+from src.package_table import _MISSING, COLUMNS, PackageTable
+from src.versions import VersionKey, package_key, version_key
 
 
 def compare_versions(version1: str, release1: str, version2: str, release2: str) -> int:
     """
     Compare two RPM version-release pairs.
+    The versions are compared first and the releases only if the versions are equal,
+    as `rpm.labelCompare` does. This is the reference implementation of the ordering
+    of `src.versions.VersionKey`, which `compare_packages` uses.
     Args:
         version1 (str): The first version.
         release1 (str): The first release.
@@ -16,47 +28,322 @@ def compare_versions(version1: str, release1: str, version2: str, release2: str)
             -1 if version1-release1 is less than version2-release2,
             0 if they are equal.
     """
-    return rpm.compare_versions(f"{version1}-{release1}", f"{version2}-{release2}")
+    return rpm.compare_versions(version1, version2) or rpm.compare_versions(
+        release1, release2
+    )
 
 
-def compare_packages(packages_sisyphus: list[dict], packages_p10: list[dict]) -> dict:
+# Key columns of both tables and the aligned rows of their shared names, set
+# in each worker process by `_init_shard_worker`.
+_shard_state: Optional[tuple] = None
+
+
+def _key_columns(table: PackageTable) -> tuple:
+    """
+    Returns the columns a version key is built from: epochs, versions, releases,
+    and the epochs kept in `extras` for rows without an int epoch.
+    """
+    return (
+        table.columns["epoch"],
+        table.columns["version"],
+        table.columns["release"],
+        {
+            row: extra["epoch"]
+            for row, extra in table.extras.items()
+            if "epoch" in extra
+        },
+    )
+
+
+def _init_shard_worker(
+    key_columns_sisyphus: tuple,
+    key_columns_p10: tuple,
+    rows_sisyphus: array,
+    rows_p10: array,
+) -> None:
+    """
+    Keeps the key columns and shared rows in a worker process. They are sent
+    once per worker, not once per task.
+    """
+    global _shard_state
+    _shard_state = (key_columns_sisyphus, key_columns_p10, rows_sisyphus, rows_p10)
+
+
+def _column_key(key_columns: tuple, row: int) -> VersionKey:
+    epochs, versions, releases, extra_epochs = key_columns
+    epoch: Any = epochs[row]
+    if epoch == _MISSING:
+        epoch = extra_epochs.get(row, 0)
+    return version_key(epoch, versions[row], releases[row])
+
+
+def _compare_shard(bounds: Tuple[int, int]) -> List[int]:
+    """
+    Compares the shared names in a range of the aligned rows, in a worker process.
+    Args:
+        bounds (Tuple[int, int]): The start and end of the range.
+    Returns:
+        List[int]: The p10 rows whose sisyphus EVR is higher.
+    """
+    key_columns_sisyphus, key_columns_p10, rows_sisyphus, rows_p10 = _shard_state
+    return [
+        rows_p10[i]
+        for i in range(*bounds)
+        if _column_key(key_columns_sisyphus, rows_sisyphus[i])
+        > _column_key(key_columns_p10, rows_p10[i])
+    ]
+
+
+def _higher_rows_parallel(
+    sisyphus: PackageTable, p10: PackageTable, workers: int
+) -> set:
+    """
+    Finds the shared names with a higher EVR in sisyphus on a process pool.
+    Workers get the key columns of both tables and the aligned rows of the
+    shared names once, then compare contiguous ranges of those rows, so only
+    (start, end) pairs and the resulting rows cross process boundaries.
+    Workers are started with the spawn method: forking a process that runs
+    other threads (pipeline stages, downloads, the server's refresh) could copy
+    a lock one of them holds and deadlock the child.
+    Args:
+        sisyphus (PackageTable): The sisyphus packages.
+        p10 (PackageTable): The p10 packages.
+        workers (int): The number of worker processes.
+    Returns:
+        set: The p10 rows whose sisyphus counterpart has a higher EVR.
+    """
+    rows_sisyphus: array = array("q")
+    rows_p10: array = array("q")
+    get = sisyphus.index.get
+    for row_p10, name in enumerate(p10.names):
+        row_sisyphus: Optional[int] = get(name)
+        if row_sisyphus is not None:
+            rows_sisyphus.append(row_sisyphus)
+            rows_p10.append(row_p10)
+
+    # A few ranges per worker even out shards with slower keys.
+    size: int = -(-len(rows_p10) // (workers * 4)) or 1
+    ranges: List[Tuple[int, int]] = [
+        (start, min(start + size, len(rows_p10)))
+        for start in range(0, len(rows_p10), size)
+    ]
+    log.debug(f"Comparing versions of {len(rows_p10)} names in {len(ranges)} ranges")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_shard_worker,
+        initargs=(_key_columns(sisyphus), _key_columns(p10), rows_sisyphus, rows_p10),
+    ) as executor:
+        return {row for rows in executor.map(_compare_shard, ranges) for row in rows}
+
+
+def _higher_rows_vectorized(sisyphus: PackageTable, p10: PackageTable) -> set:
+    """
+    Finds the shared names with a higher EVR in sisyphus with one bulk comparison.
+    Args:
+        sisyphus (PackageTable): The sisyphus packages.
+        p10 (PackageTable): The p10 packages.
+    Returns:
+        set: The p10 rows whose sisyphus counterpart has a higher EVR.
+    """
+    import numpy as np
+
+    rows_sisyphus = np.fromiter(
+        map(sisyphus.index.get, p10.names, itertools.repeat(-1)),
+        dtype=np.intp,
+        count=len(p10.names),
+    )
+    rows_p10 = np.flatnonzero(rows_sisyphus >= 0)
+    higher = evr_arrays.higher_rows(sisyphus, rows_sisyphus[rows_p10], p10, rows_p10)
+    return set(rows_p10[higher].tolist())
+
+
+def compare_packages(
+    packages_sisyphus: Iterable[dict],
+    packages_p10: Iterable[dict],
+    workers: int = 1,
+    exclude: Iterable[str] = (),
+) -> dict:
     """
     Compares packages between sisyphus and p10 branches.
+    Inputs that are not already a `PackageTable` are loaded into one, consuming
+    each package once, so lazy iterators (e.g. from `AltLinuxAPI.iter_packages`)
+    are indexed without building a package list first. Only the packages that
+    end up in the result are materialized as dictionaries.
+    With `workers` > 1 and both branches holding at least `config.parallel_threshold`
+    packages, version comparisons run on a process pool; the result is identical
+    to the serial one, in the same order. Otherwise, if NumPy is installed and
+    both branches hold at least `config.vectorize_threshold` packages, versions
+    are compared in bulk by `evr_arrays.higher_mask`.
     Args:
-        packages_sisyphus (list[dict]): List of packages from the sisyphus branch.
-        packages_p10 (list[dict]): List of packages from the p10 branch.
+        packages_sisyphus (Iterable[dict]): Packages from the sisyphus branch.
+        packages_p10 (Iterable[dict]): Packages from the p10 branch.
+        workers (int): The number of processes for version comparisons.
+        exclude (Iterable[str]): Fields left out of the returned packages, e.g.
+            `REPORT_EXCLUDED_FIELDS`.
     Returns:
         dict: Dictionary containing comparison results:
             - 'only_in_p10': List of packages only in p10.
             - 'only_in_sisyphus': List of packages only in sisyphus.
-            - 'higher_in_sisyphus': List of packages with higher version-release in sisyphus.
+            - 'higher_in_sisyphus': List of packages with higher epoch:version-release in sisyphus.
     """
-    packages_sisyphus_dict: dict = {pkg["name"]: pkg for pkg in packages_sisyphus}
-    packages_p10_dict: dict = {pkg["name"]: pkg for pkg in packages_p10}
+    sisyphus: PackageTable = PackageTable.from_packages(packages_sisyphus)
+    p10: PackageTable = PackageTable.from_packages(packages_p10)
 
     only_in_p10: list = []
     only_in_sisyphus: list = []
     higher_in_sisyphus: list = []
 
-    for name, pkg_p10 in packages_p10_dict.items():
-        if name not in packages_sisyphus_dict:
-            only_in_p10.append(pkg_p10)
+    higher_rows: Optional[set] = None
+    if workers > 1 and min(len(sisyphus), len(p10)) >= config.parallel_threshold:
+        higher_rows = _higher_rows_parallel(sisyphus, p10, workers)
+    elif (
+        evr_arrays.available()
+        and min(len(sisyphus), len(p10)) >= config.vectorize_threshold
+    ):
+        higher_rows = _higher_rows_vectorized(sisyphus, p10)
+
+    for row_p10, name in enumerate(p10.names):
+        row_sisyphus = sisyphus.index.get(name)
+        if row_sisyphus is None:
+            only_in_p10.append(p10.record(row_p10, exclude))
+        elif (
+            row_p10 in higher_rows
+            if higher_rows is not None
+            else sisyphus.key(row_sisyphus) > p10.key(row_p10)
+        ):
+            higher_in_sisyphus.append(sisyphus.record(row_sisyphus, exclude))
+
+    for row_sisyphus, name in enumerate(sisyphus.names):
+        if name not in p10.index:
+            only_in_sisyphus.append(sisyphus.record(row_sisyphus, exclude))
+
+    return {
+        "only_in_p10": only_in_p10,
+        "only_in_sisyphus": only_in_sisyphus,
+        "higher_in_sisyphus": higher_in_sisyphus,
+    }
+
+
+def _group_sources(table: PackageTable) -> Dict[str, List[int]]:
+    """
+    Groups the rows of a table by source package, in row order.
+    Packages without a source are their own source.
+    """
+    groups: Dict[str, List[int]] = {}
+    for row, (name, source) in enumerate(zip(table.names, table.columns["source"])):
+        rows: Optional[List[int]] = groups.get(source or name)
+        if rows is None:
+            groups[source or name] = [row]
         else:
-            pkg_sisyphus = packages_sisyphus_dict[name]
-            if (
-                compare_versions(
-                    pkg_sisyphus["version"],
-                    pkg_sisyphus["release"],
-                    pkg_p10["version"],
-                    pkg_p10["release"],
+            rows.append(row)
+    return groups
+
+
+def _source_row(table: PackageTable, rows: List[int]) -> int:
+    """
+    Returns the row with the highest EVR among the binaries of a source.
+    Binaries built from one source normally share its EVR, so keys are only
+    compared when the epoch, version or release columns differ.
+    """
+    best: int = rows[0]
+    if len(rows) == 1:
+        return best
+    epochs, versions, releases = (
+        table.columns["epoch"],
+        table.columns["version"],
+        table.columns["release"],
+    )
+    for row in rows[1:]:
+        if (
+            versions[row] != versions[best]
+            or releases[row] != releases[best]
+            or epochs[row] != epochs[best]
+            or row in table.extras
+        ) and table.key(row) > table.key(best):
+            best = row
+    return best
+
+
+def _source_record(
+    table: PackageTable,
+    source: str,
+    rows: List[int],
+    row: int,
+    expand: bool,
+    exclude: Iterable[str],
+) -> dict:
+    record: dict = {"source": source}
+    for field, value in zip(("epoch", "version", "release"), table.evr(row)):
+        if field not in exclude:
+            record[field] = value
+    if expand:
+        record["binaries"] = [table.record(binary, exclude) for binary in rows]
+    return record
+
+
+def compare_sources(
+    packages_sisyphus: Iterable[dict],
+    packages_p10: Iterable[dict],
+    expand: bool = False,
+    exclude: Iterable[str] = (),
+) -> dict:
+    """
+    Compares source packages between sisyphus and p10 branches.
+    Binary packages are grouped by their 'source' field and each source is
+    compared once, by the highest epoch:version-release of its binaries, so a
+    rebuild shows up as one entry however many subpackages it produces.
+    Args:
+        packages_sisyphus (Iterable[dict]): Binary packages from the sisyphus branch.
+        packages_p10 (Iterable[dict]): Binary packages from the p10 branch.
+        expand (bool): Whether to list the binaries of each source under 'binaries'.
+        exclude (Iterable[str]): Fields left out of the returned sources and
+            binaries, e.g. `REPORT_EXCLUDED_FIELDS`.
+    Returns:
+        dict: Dictionary containing comparison results, with one
+            {'source', 'epoch', 'version', 'release'} entry per source package:
+            - 'only_in_p10': Sources only in p10.
+            - 'only_in_sisyphus': Sources only in sisyphus.
+            - 'higher_in_sisyphus': Sources with a higher epoch:version-release
+              in sisyphus, as built in sisyphus.
+    """
+    sisyphus: PackageTable = PackageTable.from_packages(packages_sisyphus)
+    p10: PackageTable = PackageTable.from_packages(packages_p10)
+    sources_sisyphus: Dict[str, List[int]] = _group_sources(sisyphus)
+    sources_p10: Dict[str, List[int]] = _group_sources(p10)
+
+    only_in_p10: list = []
+    only_in_sisyphus: list = []
+    higher_in_sisyphus: list = []
+
+    for source, rows_p10 in sources_p10.items():
+        row_p10: int = _source_row(p10, rows_p10)
+        rows_sisyphus: Optional[List[int]] = sources_sisyphus.get(source)
+        if rows_sisyphus is None:
+            only_in_p10.append(
+                _source_record(p10, source, rows_p10, row_p10, expand, exclude)
+            )
+            continue
+        row_sisyphus: int = _source_row(sisyphus, rows_sisyphus)
+        if sisyphus.key(row_sisyphus) > p10.key(row_p10):
+            higher_in_sisyphus.append(
+                _source_record(
+                    sisyphus, source, rows_sisyphus, row_sisyphus, expand, exclude
                 )
-                > 0
-            ):
-                higher_in_sisyphus.append(pkg_sisyphus)
+            )
 
-    for name, pkg_sisyphus in packages_sisyphus_dict.items():
-        if name not in packages_p10_dict:
-            only_in_sisyphus.append(pkg_sisyphus)
+    for source, rows_sisyphus in sources_sisyphus.items():
+        if source not in sources_p10:
+            only_in_sisyphus.append(
+                _source_record(
+                    sisyphus,
+                    source,
+                    rows_sisyphus,
+                    _source_row(sisyphus, rows_sisyphus),
+                    expand,
+                    exclude,
+                )
+            )
 
     return {
         "only_in_p10": only_in_p10,
@@ -65,6 +352,285 @@ def compare_packages(packages_sisyphus: list[dict], packages_p10: list[dict]) ->
     }
 
 
+def _unique_sorted(packages: Iterable[dict], branch: str) -> Iterator[dict]:
+    """
+    Checks that a package stream is sorted by name and drops duplicate names.
+    As in a name-keyed dict, the last package of a run of equal names wins.
+    Args:
+        packages (Iterable[dict]): The name-sorted packages.
+        branch (str): The branch name used in error messages.
+    Returns:
+        Iterator[dict]: The packages with unique names.
+    Raises:
+        ValueError: If the stream is not sorted by name.
+    """
+    previous: Optional[dict] = None
+    for package in packages:
+        if previous is not None:
+            if package["name"] < previous["name"]:
+                raise ValueError(
+                    f"Packages of {branch} are not sorted by name: "
+                    f"'{package['name']}' after '{previous['name']}'"
+                )
+            if package["name"] != previous["name"]:
+                yield previous
+        previous = package
+    if previous is not None:
+        yield previous
+
+
+def iter_merge_join(
+    packages_sisyphus: Iterable[dict], packages_p10: Iterable[dict]
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Compares two name-sorted package streams in a single pass.
+    Results are yielded as soon as both streams have moved past a name, so only
+    the current package of each stream is held in memory and output can be
+    written before the inputs are fully read.
+    Args:
+        packages_sisyphus (Iterable[dict]): Packages from the sisyphus branch, sorted by name.
+        packages_p10 (Iterable[dict]): Packages from the p10 branch, sorted by name.
+    Returns:
+        Iterator[Tuple[str, dict]]: (category, package) pairs in name order, where
+            category is 'only_in_p10', 'only_in_sisyphus' or 'higher_in_sisyphus'.
+    Raises:
+        ValueError: If either stream is not sorted by name.
+    """
+    sisyphus: Iterator[dict] = _unique_sorted(packages_sisyphus, "sisyphus")
+    p10: Iterator[dict] = _unique_sorted(packages_p10, "p10")
+    pkg_sisyphus: Optional[dict] = next(sisyphus, None)
+    pkg_p10: Optional[dict] = next(p10, None)
+
+    while pkg_sisyphus is not None and pkg_p10 is not None:
+        if pkg_sisyphus["name"] < pkg_p10["name"]:
+            yield "only_in_sisyphus", pkg_sisyphus
+            pkg_sisyphus = next(sisyphus, None)
+        elif pkg_p10["name"] < pkg_sisyphus["name"]:
+            yield "only_in_p10", pkg_p10
+            pkg_p10 = next(p10, None)
+        else:
+            if package_key(pkg_sisyphus) > package_key(pkg_p10):
+                yield "higher_in_sisyphus", pkg_sisyphus
+            pkg_sisyphus = next(sisyphus, None)
+            pkg_p10 = next(p10, None)
+
+    while pkg_sisyphus is not None:
+        yield "only_in_sisyphus", pkg_sisyphus
+        pkg_sisyphus = next(sisyphus, None)
+    while pkg_p10 is not None:
+        yield "only_in_p10", pkg_p10
+        pkg_p10 = next(p10, None)
+
+
+def iter_merge_join_category(
+    packages_sisyphus: Iterable[dict], packages_p10: Iterable[dict], category: str
+) -> Iterator[dict]:
+    """
+    Streams one result category of `iter_merge_join`, as reported packages
+    (see `filter_package`).
+    Args:
+        packages_sisyphus (Iterable[dict]): Packages from the sisyphus branch, sorted by name.
+        packages_p10 (Iterable[dict]): Packages from the p10 branch, sorted by name.
+        category (str): 'only_in_p10', 'only_in_sisyphus' or 'higher_in_sisyphus'.
+    Returns:
+        Iterator[dict]: The packages of the category, in name order.
+    Raises:
+        ValueError: If either stream is not sorted by name.
+    """
+    for found, package in iter_merge_join(packages_sisyphus, packages_p10):
+        if found == category:
+            yield filter_package(package)
+
+
+def pair_key(first: str, second: str) -> str:
+    return f"{first}_vs_{second}"
+
+
+def _matrix_record(
+    tables: Dict[str, PackageTable],
+    rows: Dict[str, int],
+    records: Dict[str, dict],
+    branch: str,
+    exclude: Iterable[str],
+) -> dict:
+    """Materializes a branch's package once, however many pairs list it."""
+    if branch not in records:
+        records[branch] = tables[branch].record(rows[branch], exclude)
+    return records[branch]
+
+
+def compare_matrix(
+    branches: Dict[str, Iterable[dict]], exclude: Iterable[str] = ()
+) -> Dict[str, dict]:
+    """
+    Compares every pair of branches in a single pass over their joined names.
+    Each branch is loaded into a `PackageTable` once, and each package's
+    version key is computed once however many pairs it takes part in.
+    Args:
+        branches (Dict[str, Iterable[dict]]): Packages keyed by branch, in the
+            order the pairs are formed in.
+        exclude (Iterable[str]): Fields left out of the returned packages, e.g.
+            `REPORT_EXCLUDED_FIELDS`.
+    Returns:
+        Dict[str, dict]: For each pair of branches (a, b), keyed by `pair_key(a, b)`:
+            - 'only_in_<a>' and 'only_in_<b>': Packages in only one of the branches.
+            - 'higher_in_<a>' and 'higher_in_<b>': Packages with a higher
+              epoch:version-release in that branch, as packaged in that branch.
+            Packages are listed in name order.
+    """
+    tables: Dict[str, PackageTable] = {
+        branch: PackageTable.from_packages(packages)
+        for branch, packages in branches.items()
+    }
+    pairs: List[Tuple[str, str]] = list(itertools.combinations(tables, 2))
+    result: Dict[str, dict] = {
+        pair_key(a, b): {
+            f"only_in_{a}": [],
+            f"only_in_{b}": [],
+            f"higher_in_{a}": [],
+            f"higher_in_{b}": [],
+        }
+        for a, b in pairs
+    }
+    categories: List[Tuple[str, str, dict]] = [
+        (a, b, result[pair_key(a, b)]) for a, b in pairs
+    ]
+
+    names: set = set()
+    for table in tables.values():
+        names.update(table.index)
+
+    for name in sorted(names):
+        rows: Dict[str, int] = {
+            branch: table.index[name]
+            for branch, table in tables.items()
+            if name in table.index
+        }
+        keys: Dict[str, Any] = (
+            {branch: tables[branch].key(row) for branch, row in rows.items()}
+            if len(rows) > 1
+            else {}
+        )
+        records: Dict[str, dict] = {}
+
+        for a, b, pair in categories:
+            if a not in rows:
+                if b in rows:
+                    pair[f"only_in_{b}"].append(
+                        _matrix_record(tables, rows, records, b, exclude)
+                    )
+            elif b not in rows:
+                pair[f"only_in_{a}"].append(
+                    _matrix_record(tables, rows, records, a, exclude)
+                )
+            else:
+                order: int = keys[a].compare(keys[b])
+                if order:
+                    newer: str = a if order > 0 else b
+                    pair[f"higher_in_{newer}"].append(
+                        _matrix_record(tables, rows, records, newer, exclude)
+                    )
+
+    return result
+
+
+def _noarch_signatures(tables: List[PackageTable]) -> Dict[str, tuple]:
+    """
+    Finds the noarch packages that are identical in every table of one branch.
+    Args:
+        tables (List[PackageTable]): The per-architecture tables of the branch.
+    Returns:
+        Dict[str, tuple]: The column values of each such package, keyed by name.
+    """
+    first: PackageTable = tables[0]
+    arch_column: List[str] = first.columns["arch"]
+    signatures: Dict[str, tuple] = {
+        name: _row_signature(first, row)
+        for name, row in first.index.items()
+        if arch_column[row] == "noarch"
+    }
+    for table in tables[1:]:
+        for name in list(signatures):
+            row: Optional[int] = table.index.get(name)
+            if row is None or _row_signature(table, row) != signatures[name]:
+                del signatures[name]
+    return signatures
+
+
+def _row_signature(table: PackageTable, row: int) -> tuple:
+    return tuple(table.columns[column][row] for column in COLUMNS) + (
+        table.extras.get(row),
+    )
+
+
+def split_noarch(
+    packages: Dict[Tuple[str, Optional[str]], PackageTable],
+    branches: List[str],
+    arches: List[Optional[str]],
+) -> Dict[Tuple[str, Optional[str]], PackageTable]:
+    """
+    Moves the noarch packages shared by every architecture into one "noarch" table per branch.
+    A name is moved if, in each branch, it is either the same noarch package on
+    every architecture or missing on every architecture; comparing the "noarch"
+    tables once then gives the result of every architecture for those names.
+    Names that are noarch on some architectures only, or differ between them,
+    stay in the per-architecture tables.
+    Args:
+        packages (Dict[Tuple[str, Optional[str]], PackageTable]): Tables keyed by (branch, arch).
+        branches (List[str]): The branches.
+        arches (List[Optional[str]]): The architectures.
+    Returns:
+        Dict[Tuple[str, Optional[str]], PackageTable]: Tables keyed by (branch, arch),
+            with the shared packages removed, and by (branch, "noarch") for them.
+    """
+    signatures: Dict[str, Dict[str, tuple]] = {
+        branch: _noarch_signatures([packages[(branch, arch)] for arch in arches])
+        for branch in branches
+    }
+    shared: set = set()
+    for branch in branches:
+        for name in signatures[branch]:
+            if name not in shared and all(
+                name in signatures[other]
+                or all(name not in packages[(other, arch)] for arch in arches)
+                for other in branches
+            ):
+                shared.add(name)
+
+    result: Dict[Tuple[str, Optional[str]], PackageTable] = {}
+    for branch in branches:
+        first: PackageTable = packages[(branch, arches[0])]
+        result[(branch, "noarch")] = first.take(
+            row for name, row in first.index.items() if name in shared
+        )
+        for arch in arches:
+            table: PackageTable = packages[(branch, arch)]
+            result[(branch, arch)] = table.take(
+                row for name, row in table.index.items() if name not in shared
+            )
+    log.debug(f"Comparing {len(shared)} noarch packages once for {len(arches)} arches")
+    return result
+
+
+# Fields left out of the reported packages.
+REPORT_EXCLUDED_FIELDS: frozenset = frozenset({"epoch", "disttag", "arch", "buildtime"})
+
+
+def filter_package(package: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns a package without the keys in `REPORT_EXCLUDED_FIELDS`.
+    Args:
+        package (Dict[str, Any]): The package.
+    Returns:
+        Dict[str, Any]: A new dictionary with the reported fields.
+    """
+    return {
+        key: value
+        for key, value in package.items()
+        if key not in REPORT_EXCLUDED_FIELDS
+    }
+
+
 def filter_package_data(packages: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """
     Filters out specific keys from a list of package dictionaries.
@@ -73,11 +639,4 @@ def filter_package_data(packages: List[Dict[str, str]]) -> List[Dict[str, str]]:
     Returns:
         List[Dict[str, str]]: Filtered list of package dictionaries without keys 'epoch', 'disttag', 'arch', 'buildtime'.
     """
-    return [
-        {
-            key: value
-            for key, value in pkg.items()
-            if key not in {"epoch", "disttag", "arch", "buildtime"}
-        }
-        for pkg in packages
-    ]
+    return [filter_package(pkg) for pkg in packages]
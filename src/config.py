@@ -1,7 +1,37 @@
+import os
+
+
 class Config:
     def __init__(self):
         self.base_url: str = "https://rdb.altlinux.org/api"
         self.branches: set = {"p10", "sisyphus"}
+        self.known_branches: tuple = ("p9", "p10", "p11", "sisyphus")
+        self.arches: tuple = ("x86_64", "ppc64le", "i586", "armh", "aarch64")
+        self.chunk_size: int = 64 * 1024
+        self.max_workers: int = 4
+        self.connect_timeout: float = 10.0
+        self.read_timeout: float = 60.0
+        self.retries: int = 3
+        self.retry_backoff: float = 0.5
+        self.max_failures: int = 3
+        self.circuit_cooldown: float = 30.0
+        self.compare_workers: int = 1
+        self.parallel_threshold: int = 50000
+        self.vectorize_threshold: int = 10000
+        self.cache_dir: str = os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+            "package-comparison-module",
+        )
+        self.state_dir: str = os.path.join(
+            os.environ.get("XDG_STATE_HOME", os.path.expanduser("~/.local/state")),
+            "package-comparison-module",
+        )
+        self.snapshot_dir: str = os.path.join(self.cache_dir, "snapshots")
+        self.server_host: str = "127.0.0.1"
+        self.server_port: int = 8080
+        self.refresh_interval: float = 60 * 60
+        self.cache_max_age: float = 7 * 24 * 60 * 60
+        self.cache_max_size: int = 2 * 1024**3
 
 
 config: Config = Config()
@@ -0,0 +1,182 @@
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from src.package_table import _MISSING, PackageTable
+from src.versions import _ALPHA, _DIGIT, parse_segments
+
+# NumPy is imported by the functions that use it, so importing this module
+# (and the CLI through `src.comparison`) does not load it.
+if TYPE_CHECKING:
+    import numpy as np
+
+# Segment codes (int64): the segment tag of `parse_segments` in the top bits and
+# an order-preserving value below it, so comparing codes compares segments.
+_VALUE_BITS: int = 60
+_TILDE_CODE: int = 0 << _VALUE_BITS
+_END_CODE: int = 1 << _VALUE_BITS
+# Letters in ASCII order, each a base-53 digit (0 pads shorter strings, which
+# sort before their extensions); 10 letters fit in the value bits.
+_LETTERS: str = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_LETTER_DIGITS: Dict[str, int] = {letter: i + 1 for i, letter in enumerate(_LETTERS)}
+_MAX_LETTERS: int = 10
+# Longer versions or releases are compared exactly.
+_MAX_SEGMENTS: int = 32
+
+
+@lru_cache(maxsize=None)
+def available() -> bool:
+    """
+    Returns whether the vectorized comparison can be used, without importing NumPy.
+    Returns:
+        bool: True if NumPy is installed.
+    """
+    return find_spec("numpy") is not None
+
+
+@lru_cache(maxsize=65536)
+def encode_segments(value: str) -> Optional[Tuple[int, ...]]:
+    """
+    Encodes an RPM version or release string as fixed-width segment codes.
+    Codes compare like the segments of `parse_segments`, including the final
+    end-of-string segment.
+    Args:
+        value (str): The version or release string.
+    Returns:
+        Optional[Tuple[int, ...]]: The codes, or None if a segment does not fit
+            (long numbers or words) or the string needs rpm.compare_versions.
+    """
+    segments: Optional[tuple] = parse_segments(value)
+    if segments is None or len(segments) > _MAX_SEGMENTS:
+        return None
+    codes: List[int] = []
+    for segment in segments:
+        if segment[0] == _DIGIT:
+            if segment[1] > 18:
+                return None
+            codes.append(_DIGIT << _VALUE_BITS | int(segment[2] or 0))
+        elif segment[0] == _ALPHA:
+            word: str = segment[1]
+            if len(word) > _MAX_LETTERS:
+                return None
+            number: int = 0
+            for letter in word.ljust(_MAX_LETTERS, "\0"):
+                number = number * 53 + _LETTER_DIGITS.get(letter, 0)
+            codes.append(_ALPHA << _VALUE_BITS | number)
+        else:
+            codes.append(segment[0] << _VALUE_BITS)
+    return tuple(codes)
+
+
+def _code_table(values: Dict[Any, int]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Encodes distinct strings into a table with one padded row of codes per string.
+    Args:
+        values (Dict[Any, int]): The strings and their row in the table.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (strings, width) codes and a mask of
+            the strings that must be compared exactly.
+    """
+    import numpy as np
+
+    encoded: List[Optional[Tuple[int, ...]]] = [
+        encode_segments(value) if type(value) is str else None for value in values
+    ]
+    width: int = max((len(codes) for codes in encoded if codes), default=1)
+    # Every encoding ends with the end segment, so padding with it keeps the order.
+    table = np.full((len(encoded), width), _END_CODE, dtype=np.int64)
+    exact = np.zeros(len(encoded), dtype=bool)
+    for row, codes in enumerate(encoded):
+        if codes is None:
+            exact[row] = True
+        else:
+            table[row, : len(codes)] = codes
+    return table, exact
+
+
+def _column_codes(
+    column: List[Any], rows: "np.ndarray"
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Encodes the version or release column of a table, for the given rows.
+    Each distinct string is encoded once.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The codes of each row and a mask of the
+            rows that must be compared exactly.
+    """
+    import numpy as np
+
+    ids: Dict[Any, int] = {value: i for i, value in enumerate(dict.fromkeys(column))}
+    row_ids = np.fromiter(
+        map(ids.__getitem__, column), dtype=np.intp, count=len(column)
+    )[rows]
+    table, exact = _code_table(ids)
+    return table[row_ids], exact[row_ids]
+
+
+def _pad(codes: "np.ndarray", width: int) -> "np.ndarray":
+    import numpy as np
+
+    if codes.shape[1] == width:
+        return codes
+    padding = np.full((len(codes), width - codes.shape[1]), _END_CODE, dtype=np.int64)
+    return np.concatenate((codes, padding), axis=1)
+
+
+def higher_rows(
+    table_a: PackageTable,
+    rows_a: "np.ndarray",
+    table_b: PackageTable,
+    rows_b: "np.ndarray",
+) -> "np.ndarray":
+    """
+    Compares row pairs of two tables in bulk: which EVRs of `table_a` are newer.
+    Each EVR becomes one row of int64 codes (epoch, version segments, release
+    segments), and whole columns are compared at once; the first differing
+    column decides, as in a tuple comparison. Pairs with an epoch kept outside
+    the epoch column or a string that has no fixed-width encoding are compared
+    with `PackageTable.key`, so the result always matches `VersionKey` and
+    `rpm.compare_versions`.
+    Args:
+        table_a (PackageTable): The first table.
+        rows_a (np.ndarray): The rows of `table_a` to compare.
+        table_b (PackageTable): The second table.
+        rows_b (np.ndarray): The rows of `table_b` to compare, in the same order.
+    Returns:
+        np.ndarray: A boolean mask, True where the EVR of `table_a` is newer.
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("The vectorized comparison requires numpy") from e
+
+    sides: list = []
+    for table, rows in ((table_a, rows_a), (table_b, rows_b)):
+        epochs = np.array(table.columns["epoch"], dtype=np.int64)[rows]
+        versions, versions_exact = _column_codes(table.columns["version"], rows)
+        releases, releases_exact = _column_codes(table.columns["release"], rows)
+        exact = (epochs == _MISSING) | versions_exact | releases_exact
+        sides.append((epochs, versions, releases, exact))
+
+    version_width: int = max(side[1].shape[1] for side in sides)
+    release_width: int = max(side[2].shape[1] for side in sides)
+    codes_a, codes_b = (
+        np.concatenate(
+            (
+                epochs[:, None],
+                _pad(versions, version_width),
+                _pad(releases, release_width),
+            ),
+            axis=1,
+        )
+        for epochs, versions, releases, _ in sides
+    )
+    differs = codes_a != codes_b
+    first = differs.argmax(axis=1)
+    pairs = np.arange(len(codes_a))
+    higher = differs[pairs, first] & (codes_a[pairs, first] > codes_b[pairs, first])
+
+    for pair in np.flatnonzero(sides[0][3] | sides[1][3]):
+        higher[pair] = table_a.key(rows_a[pair]) > table_b.key(rows_b[pair])
+    return higher
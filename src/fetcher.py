@@ -0,0 +1,131 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.altlinux_api import AltLinuxAPI
+from src.config import config
+from src.filters import PackageFilter
+from src.logging_config import log
+from src.package_table import PackageTable
+from src.utils import iter_logged_packages
+
+FetchKey = Tuple[str, Optional[str]]
+
+
+def _fetch_branch(
+    api: AltLinuxAPI,
+    branch: str,
+    arch: Optional[str],
+    package_filter: Optional[PackageFilter] = None,
+) -> PackageTable:
+    """
+    Streams the packages of a single branch/architecture pair into a table.
+    Args:
+        api (AltLinuxAPI): The API client to fetch with.
+        branch (str): The branch to fetch.
+        arch (Optional[str]): The architecture to fetch.
+        package_filter (Optional[PackageFilter]): Applied to each package as it is parsed.
+    Returns:
+        PackageTable: The fetched packages.
+    """
+    log.info(f"Fetching packages for branch {branch}, architecture: {arch}")
+    packages: Iterable[dict] = api.fetch_packages(branch, arch, stream=True)
+    if package_filter is not None:
+        packages = package_filter.apply(packages)
+    return PackageTable.from_packages(iter_logged_packages((branch, arch), packages))
+
+
+def fetch_all(
+    api: AltLinuxAPI,
+    branches: Iterable[str],
+    arches: Iterable[Optional[str]],
+    max_workers: int = config.max_workers,
+    package_filter: Optional[PackageFilter] = None,
+) -> Dict[FetchKey, PackageTable]:
+    """
+    Fetches every (branch, arch) pair concurrently.
+    At most `max_workers` downloads run at once; all of them share the
+    connection pool of `api`.
+    Args:
+        api (AltLinuxAPI): The API client to fetch with.
+        branches (Iterable[str]): The branches to fetch.
+        arches (Iterable[Optional[str]]): The architectures to fetch.
+        max_workers (int): The maximum number of concurrent downloads.
+        package_filter (Optional[PackageFilter]): Keeps only matching packages, and
+            only their projected fields, in the tables.
+    Returns:
+        Dict[FetchKey, PackageTable]: Packages keyed by (branch, arch), in request order.
+    Raises:
+        Exception: The first error raised by any fetch.
+    """
+    keys: List[FetchKey] = [(branch, arch) for arch in arches for branch in branches]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(_fetch_branch, api, branch, arch, package_filter)
+            for branch, arch in keys
+        ]
+        try:
+            return {key: future.result() for key, future in zip(keys, futures)}
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def iter_fetch(
+    api: AltLinuxAPI,
+    branches: Iterable[str],
+    arches: Iterable[Optional[str]],
+    max_workers: int = config.max_workers,
+    package_filter: Optional[PackageFilter] = None,
+) -> Iterator[Tuple[Optional[str], Dict[FetchKey, PackageTable]]]:
+    """
+    Fetches the branches of each architecture, yielding every architecture as
+    soon as all its branches are fetched, in request order.
+    Like `fetch_all`, up to `max_workers` downloads run at once, but later
+    downloads are only started as earlier architectures are taken, so at most
+    `max_workers` tables are fetched ahead of the consumer.
+    Args:
+        api (AltLinuxAPI): The API client to fetch with.
+        branches (Iterable[str]): The branches to fetch.
+        arches (Iterable[Optional[str]]): The architectures to fetch.
+        max_workers (int): The maximum number of concurrent downloads.
+        package_filter (Optional[PackageFilter]): Keeps only matching packages, and
+            only their projected fields, in the tables.
+    Returns:
+        Iterator[Tuple[Optional[str], Dict[FetchKey, PackageTable]]]: Each
+            architecture with its packages keyed by (branch, arch).
+    Raises:
+        Exception: The first error raised by a fetch of the yielded architecture.
+    """
+    branches = list(branches)
+    keys: Iterator[FetchKey] = (
+        (branch, arch) for arch in arches for branch in branches
+    )
+    window: int = max(1, max_workers, len(branches))
+    pending: Deque[Tuple[FetchKey, Future]] = deque()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        try:
+            while True:
+                for branch, arch in keys:
+                    pending.append(
+                        (
+                            (branch, arch),
+                            executor.submit(
+                                _fetch_branch, api, branch, arch, package_filter
+                            ),
+                        )
+                    )
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+                fetched: Dict[FetchKey, PackageTable] = {}
+                for _ in branches:
+                    key, future = pending.popleft()
+                    fetched[key] = future.result()
+                yield key[1], fetched
+        finally:
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,115 @@
+import re
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Pattern
+from src.package_table import PackageTable
+
+# Fields the comparison needs, kept whatever the projection.
+REQUIRED_FIELDS: tuple = ("name", "epoch", "version", "release")
+
+
+def read_names(path: str) -> List[str]:
+    """
+    Reads package names from a file, one per line.
+    Blank lines and lines starting with '#' are ignored.
+    Args:
+        path (str): The file.
+    Returns:
+        List[str]: The names.
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+class PackageFilter:
+    """
+    Selects packages by name and projects them onto a subset of their fields.
+    A package is kept if its name matches every criterion given: one of the
+    prefixes, the regular expression (searched anywhere in the name), and the
+    set of names. The filter is applied to packages as they are parsed, so the
+    others are never indexed, compared or written.
+    """
+
+    def __init__(
+        self,
+        prefixes: Iterable[str] = (),
+        pattern: Optional[str] = None,
+        names: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Args:
+            prefixes (Iterable[str]): Name prefixes, any of which may match.
+            pattern (Optional[str]): A regular expression the name must contain.
+            names (Optional[Iterable[str]]): The names to keep.
+            fields (Optional[Iterable[str]]): The fields to keep, in addition to
+                `REQUIRED_FIELDS`; all fields if None.
+        Raises:
+            re.error: If the pattern is invalid.
+        """
+        self.prefixes: tuple = tuple(prefixes)
+        self.pattern: Optional[Pattern[str]] = (
+            re.compile(pattern) if pattern is not None else None
+        )
+        self.names: Optional[FrozenSet[str]] = (
+            frozenset(names) if names is not None else None
+        )
+        self.fields: Optional[tuple] = (
+            tuple(dict.fromkeys((*REQUIRED_FIELDS, *fields)))
+            if fields is not None
+            else None
+        )
+
+    def matches(self, name: str) -> bool:
+        """
+        Checks a package name against the criteria.
+        Args:
+            name (str): The package name.
+        Returns:
+            bool: True if the package is kept.
+        """
+        return (
+            (not self.prefixes or name.startswith(self.prefixes))
+            and (self.pattern is None or self.pattern.search(name) is not None)
+            and (self.names is None or name in self.names)
+        )
+
+    def project(self, package: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns the projected fields of a package.
+        Args:
+            package (Dict[str, Any]): The package.
+        Returns:
+            Dict[str, Any]: The package itself if no projection is set, a new
+                dictionary with the kept fields otherwise.
+        """
+        if self.fields is None:
+            return package
+        return {field: package[field] for field in self.fields if field in package}
+
+    def apply(self, packages: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Filters and projects a stream of packages.
+        Args:
+            packages (Iterable[Dict[str, Any]]): The packages.
+        Returns:
+            Iterator[Dict[str, Any]]: The kept packages, projected.
+        """
+        matches = self.matches
+        project = self.project
+        return (project(package) for package in packages if matches(package["name"]))
+
+    def filter_table(self, table: PackageTable) -> PackageTable:
+        """
+        Filters and projects a table that is already loaded, e.g. from a snapshot.
+        Args:
+            table (PackageTable): The table.
+        Returns:
+            PackageTable: A new table with the kept packages.
+        """
+        kept: PackageTable = table.take(
+            row for name, row in table.index.items() if self.matches(name)
+        )
+        if self.fields is None:
+            return kept
+        return PackageTable.from_packages(self.apply(kept))
@@ -0,0 +1,207 @@
+import gzip
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+from src.comparison import compare_packages
+from src.config import config
+from src.logging_config import log
+from src.package_table import PackageTable
+from src.versions import version_key
+
+CATEGORIES: tuple = ("only_in_p10", "only_in_sisyphus", "higher_in_sisyphus")
+
+
+class RunState:
+    """
+    Compact snapshot of a comparison run: each branch's name -> (epoch, version,
+    release) map and the result category of every name that has one.
+    """
+
+    format_version: int = 1
+
+    def __init__(
+        self, evrs: Dict[str, Dict[str, tuple]], categories: Dict[str, str]
+    ) -> None:
+        self.evrs: Dict[str, Dict[str, tuple]] = evrs
+        self.categories: Dict[str, str] = categories
+
+    @staticmethod
+    def path(state_dir: str, arch: Optional[str]) -> str:
+        return os.path.join(state_dir, f"{arch or 'all'}.state.json.gz")
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RunState"]:
+        """
+        Loads a saved run state.
+        Args:
+            path (str): The state file.
+        Returns:
+            Optional[RunState]: The state, or None if it is missing or unreadable.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data: dict = json.load(f)
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                log.warning(f"Ignoring unreadable run state {path}: {e}")
+            return None
+        if data.get("format_version") != cls.format_version:
+            return None
+        evrs: Dict[str, Dict[str, tuple]] = {
+            branch: {name: tuple(evr) for name, evr in names.items()}
+            for branch, names in data["evrs"].items()
+        }
+        return cls(evrs, data["categories"])
+
+    def save(self, path: str) -> None:
+        """
+        Saves the run state atomically.
+        Args:
+            path (str): The state file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+            json.dump(
+                {
+                    "format_version": self.format_version,
+                    "evrs": self.evrs,
+                    "categories": self.categories,
+                },
+                f,
+                separators=(",", ":"),
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+
+
+def _evr_map(table: PackageTable) -> Dict[str, tuple]:
+    return {name: table.evr(row) for name, row in table.index.items()}
+
+
+def _category(
+    name: str, sisyphus: Dict[str, tuple], p10: Dict[str, tuple]
+) -> Optional[str]:
+    """
+    Classifies a single name the way `compare_packages` does.
+    Returns:
+        Optional[str]: The result category, or None for shared names that are not higher in sisyphus.
+    """
+    if name not in sisyphus:
+        return "only_in_p10" if name in p10 else None
+    if name not in p10:
+        return "only_in_sisyphus"
+    if version_key(*sisyphus[name]) > version_key(*p10[name]):
+        return "higher_in_sisyphus"
+    return None
+
+
+def _branch_delta(current: Dict[str, tuple], previous: Dict[str, tuple]) -> dict:
+    new_items: set = current.items() - previous.items()
+    old_items: set = previous.items() - current.items()
+    updated: set = {name for name, _ in new_items} & {name for name, _ in old_items}
+    return {
+        "added": sorted(name for name, _ in new_items if name not in updated),
+        "removed": sorted(name for name, _ in old_items if name not in updated),
+        "updated": sorted(updated),
+    }
+
+
+def _build_result(
+    sisyphus: PackageTable,
+    p10: PackageTable,
+    categories: Dict[str, str],
+    exclude: Iterable[str],
+) -> dict:
+    """
+    Materializes the comparison result from per-name categories, in the order
+    `compare_packages` produces it.
+    """
+    result: dict = {category: [] for category in CATEGORIES}
+    for row, name in enumerate(p10.names):
+        category: Optional[str] = categories.get(name)
+        if category == "only_in_p10":
+            result[category].append(p10.record(row, exclude))
+        elif category == "higher_in_sisyphus":
+            result[category].append(sisyphus.record(sisyphus.index[name], exclude))
+    for row, name in enumerate(sisyphus.names):
+        if categories.get(name) == "only_in_sisyphus":
+            result["only_in_sisyphus"].append(sisyphus.record(row, exclude))
+    return result
+
+
+def compare_incremental(
+    packages_sisyphus: Iterable[dict],
+    packages_p10: Iterable[dict],
+    previous: Optional[RunState],
+    workers: int = 1,
+    exclude: Iterable[str] = (),
+) -> Tuple[dict, RunState]:
+    """
+    Compares sisyphus and p10, reusing the result of the previous run.
+    Only names whose EVR was added, removed or changed in either branch since
+    `previous` are reclassified, so version comparisons scale with the churn
+    rather than the branch size. Without a previous state the branches are
+    compared in full with `compare_packages`.
+    Args:
+        packages_sisyphus (Iterable[dict]): Packages from the sisyphus branch.
+        packages_p10 (Iterable[dict]): Packages from the p10 branch.
+        previous (Optional[RunState]): The state saved by the previous run.
+        workers (int): The number of processes for a full comparison.
+        exclude (Iterable[str]): Fields left out of the returned packages.
+    Returns:
+        Tuple[dict, RunState]: The comparison result, in the format of
+            `compare_packages` plus a 'changes_since_last_run' entry, and the
+            state to save for the next run.
+    """
+    sisyphus: PackageTable = PackageTable.from_packages(packages_sisyphus)
+    p10: PackageTable = PackageTable.from_packages(packages_p10)
+    evrs: Dict[str, Dict[str, tuple]] = {
+        "sisyphus": _evr_map(sisyphus),
+        "p10": _evr_map(p10),
+    }
+
+    if previous is None:
+        log.info("No previous run state, comparing branches in full")
+        result: dict = compare_packages(sisyphus, p10, workers=workers, exclude=exclude)
+        categories: Dict[str, str] = {
+            package["name"]: category
+            for category in CATEGORIES
+            for package in result[category]
+        }
+        result["changes_since_last_run"] = None
+        return result, RunState(evrs, categories)
+
+    branch_changes: dict = {
+        branch: _branch_delta(evrs[branch], previous.evrs.get(branch, {}))
+        for branch in evrs
+    }
+    affected: set = {
+        name
+        for changes in branch_changes.values()
+        for names in changes.values()
+        for name in names
+    }
+    log.info(f"Reclassifying {len(affected)} names changed since the previous run")
+
+    categories = dict(previous.categories)
+    category_changes: dict = {
+        category: {"added": [], "removed": []} for category in CATEGORIES
+    }
+    for name in sorted(affected):
+        old: Optional[str] = categories.pop(name, None)
+        new: Optional[str] = _category(name, evrs["sisyphus"], evrs["p10"])
+        if new is not None:
+            categories[name] = new
+        if old != new:
+            if old is not None:
+                category_changes[old]["removed"].append(name)
+            if new is not None:
+                category_changes[new]["added"].append(name)
+
+    result = _build_result(sisyphus, p10, categories, exclude)
+    result["changes_since_last_run"] = {
+        "branches": branch_changes,
+        "categories": category_changes,
+    }
+    return result, RunState(evrs, categories)
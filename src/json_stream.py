@@ -0,0 +1,115 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_decoder: json.JSONDecoder = json.JSONDecoder()
+_whitespace: str = " \t\n\r"
+
+
+class _ChunkReader:
+    """Character reader over a stream of UTF-8 encoded byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._eof: bool = False
+
+    def _fill(self) -> None:
+        """
+        Appends the next decoded chunk to the buffer, dropping the consumed prefix.
+        Marks the reader as exhausted when there are no chunks left.
+        """
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            text: str = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+        Returns:
+            str: The next character, or an empty string at the end of input.
+        """
+        while True:
+            while self._pos < len(self._buffer):
+                char: str = self._buffer[self._pos]
+                if char not in _whitespace:
+                    return char
+                self._pos += 1
+            if self._eof:
+                return ""
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        """
+        Consumes the next non-whitespace character, which must be `char`.
+        Raises:
+            ValueError: If another character (or the end of input) is found.
+        """
+        found: str = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, got {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """
+        Decodes the next complete JSON value.
+        Returns:
+            Any: The decoded value.
+        Raises:
+            json.JSONDecodeError: If the input is malformed or truncated.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+                # A value touching the end of the buffer may be a truncated number.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Incrementally yields the elements of the array stored under `key` in a top-level JSON object.
+    Only one element is held in memory at a time; the rest of the document after the array is not read.
+    Args:
+        chunks (Iterable[bytes]): UTF-8 encoded chunks of the JSON document.
+        key (str): The top-level key holding the array.
+    Returns:
+        Iterator[Any]: The decoded array elements. Nothing is yielded if the key is absent.
+    Raises:
+        ValueError: If the document is malformed.
+    """
+    reader: _ChunkReader = _ChunkReader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        name: Any = reader.value()
+        reader.expect(":")
+        if name == key:
+            reader.expect("[")
+            if reader.peek() == "]":
+                return
+            while True:
+                yield reader.value()
+                if reader.peek() == "]":
+                    return
+                reader.expect(",")
+        reader.value()
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
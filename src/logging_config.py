@@ -1,86 +1,95 @@
+import os
 import sys
 from loguru import logger
 
+_console_formats: dict = {
+    "DEBUG": "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<blue>{message}</blue>\n",
+    "INFO": "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "{message}\n",
+    "SUCCESS": "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<green>{message}</green>\n",
+    "WARNING": "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<yellow>{message}</yellow>\n",
+}
+_error_format: str = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<red>{message}</red>"
+)
+_file_format: str = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}"
+_file_sinks: tuple = (
+    ("../logs/debug.log", "DEBUG"),
+    ("../logs/info.log", "INFO"),
+    ("../logs/warning.log", "WARNING"),
+    ("../logs/error.log", "ERROR"),
+)
 
-def setup_logger() -> logger:
+_default_level: str = os.environ.get("PACKAGE_COMPARISON_LOG_LEVEL", "INFO")
+_min_level_no: int = logger.level(_default_level).no
+
+
+def level_enabled(level: str) -> bool:
+    """
+    Checks whether records of a level reach any sink.
+    Use it to skip building expensive messages, e.g. per-package details.
+    Args:
+        level (str): The level name.
+    Returns:
+        bool: True if the level is at or above the configured minimum level.
+    """
+    return logger.level(level).no >= _min_level_no
+
+
+def setup_logger(level: str = _default_level, enqueue: bool = True) -> logger:
     """
     Set up logger configuration with various log levels and formats for console and file outputs.
+    Importing this module does not configure anything: the CLI entry point calls
+    this once, and library users keep loguru's defaults or their own sinks.
+    Sinks are enqueued by default: records are handed to a background thread, so
+    logging never blocks on console or file I/O (and log rotation/compression).
+    Args:
+        level (str): The minimum level to log; DEBUG enables per-package details.
+        enqueue (bool): Whether sinks write from a background thread.
     Returns:
         logger: The configured logger object.
     """
+    global _min_level_no
+
     logger.remove()
+    _min_level_no = logger.level(level).no
 
     logger.add(
         sys.stderr,
-        level="DEBUG",
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-        "<level>{level: <8}</level> | "
-        "<blue>{message}</blue>",
-        filter=lambda record: record["level"].name == "DEBUG",
-    )
-    logger.add(
-        sys.stderr,
-        level="INFO",
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-        "<level>{level: <8}</level> | "
-        "{message}",
-        filter=lambda record: record["level"].name == "INFO",
-    )
-    logger.add(
-        sys.stderr,
-        level="SUCCESS",
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-        "<level>{level: <8}</level> | "
-        "<green>{message}</green>",
-        filter=lambda record: record["level"].name == "SUCCESS",
-    )
-    logger.add(
-        sys.stderr,
-        level="WARNING",
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-        "<level>{level: <8}</level> | "
-        "<yellow>{message}</yellow>",
-        filter=lambda record: record["level"].name == "WARNING",
+        level=level,
+        format=lambda record: _console_formats[record["level"].name],
+        filter=lambda record: record["level"].name in _console_formats,
+        enqueue=enqueue,
     )
     logger.add(
         sys.stdout,
         level="ERROR",
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-        "<level>{level: <8}</level> | "
-        "<red>{message}</red>",
+        format=_error_format,
         filter=lambda record: record["level"].name == "ERROR",
+        enqueue=enqueue,
     )
 
-    logger.add(
-        "../logs/debug.log",
-        rotation="100 MB",
-        level="DEBUG",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-        compression="zip",
-    )
-    logger.add(
-        "../logs/info.log",
-        rotation="100 MB",
-        level="INFO",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-        compression="zip",
-    )
-    logger.add(
-        "../logs/warning.log",
-        rotation="100 MB",
-        level="WARNING",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-        compression="zip",
-    )
-    logger.add(
-        "../logs/error.log",
-        rotation="100 MB",
-        level="ERROR",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-        compression="zip",
-    )
+    for path, sink_level in _file_sinks:
+        if logger.level(sink_level).no >= _min_level_no:
+            logger.add(
+                path,
+                rotation="100 MB",
+                level=sink_level,
+                format=_file_format,
+                compression="zip",
+                enqueue=enqueue,
+            )
 
     return logger
 
 
-log = setup_logger()
+log = logger
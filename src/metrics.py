@@ -0,0 +1,167 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+METRICS_FORMATS: tuple = ("json", "prometheus")
+
+# Called with the stage name and its accumulated metrics each time a stage ends.
+MetricsHook = Callable[[str, Dict[str, Any]], None]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Returns the peak resident set size of the process so far.
+    Returns:
+        Optional[int]: The peak RSS in bytes, or None where it is not available.
+    """
+    if resource is None:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Metrics:
+    """
+    Collects per-stage metrics of a run: wall time, CPU time of the process,
+    peak RSS at the end of the stage, and counters such as packages or bytes.
+    A stage entered several times (e.g. once per architecture) accumulates.
+    Counters may be updated from several threads.
+    """
+
+    def __init__(self, hooks: Optional[List[MetricsHook]] = None) -> None:
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.hooks: List[MetricsHook] = list(hooks or [])
+        self._lock: threading.Lock = threading.Lock()
+        self._start: float = time.perf_counter()
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        """
+        Registers a collector called with (stage, metrics) whenever a stage ends.
+        Args:
+            hook (MetricsHook): The collector.
+        """
+        self.hooks.append(hook)
+
+    def _stage(self, name: str) -> Dict[str, Any]:
+        return self.stages.setdefault(
+            name, {"calls": 0, "errors": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+        )
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Measures the enclosed code as (part of) a stage.
+        Args:
+            name (str): The stage name.
+        """
+        wall: float = time.perf_counter()
+        cpu: float = time.process_time()
+        failed: bool = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                stage: Dict[str, Any] = self._stage(name)
+                stage["calls"] += 1
+                stage["errors"] += failed
+                stage["wall_seconds"] += time.perf_counter() - wall
+                stage["cpu_seconds"] += time.process_time() - cpu
+                stage["peak_rss_bytes"] = peak_rss_bytes()
+                snapshot: Dict[str, Any] = dict(stage)
+            for hook in self.hooks:
+                hook(name, snapshot)
+
+    def count(self, stage: str, key: str, value: int = 1) -> None:
+        """
+        Adds to a counter of a stage.
+        Args:
+            stage (str): The stage name.
+            key (str): The counter, e.g. 'packages' or 'bytes'.
+            value (int): The amount to add.
+        """
+        with self._lock:
+            counters: Dict[str, Any] = self._stage(stage)
+            counters[key] = counters.get(key, 0) + value
+
+    def record_download(self, progress: Any) -> None:
+        """
+        Counts a finished download; pass as `ProgressReporter(on_close=...)`.
+        Args:
+            progress (DownloadProgress): The finished download.
+        """
+        self.count("fetch", "downloads")
+        self.count("fetch", "bytes", progress.bytes_received)
+        self.count("fetch", "packages", progress.items)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a JSON-serializable dictionary.
+        Returns:
+            Dict[str, Any]: 'stages' by name, and the run's total wall time and peak RSS.
+        """
+        with self._lock:
+            return {
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "total": {
+                    "wall_seconds": time.perf_counter() - self._start,
+                    "peak_rss_bytes": peak_rss_bytes(),
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "package_comparison") -> str:
+        """
+        Formats the metrics in the Prometheus text exposition format.
+        Stage metrics become gauges named `<prefix>_stage_<metric>` with a
+        `stage` label.
+        Args:
+            prefix (str): The metric name prefix.
+        Returns:
+            str: The metrics text.
+        """
+        data: Dict[str, Any] = self.to_dict()
+        samples: Dict[str, List[str]] = {}
+        for name, stage in data["stages"].items():
+            for key, value in stage.items():
+                if value is not None:
+                    samples.setdefault(f"{prefix}_stage_{key}", []).append(
+                        f'{prefix}_stage_{key}{{stage="{name}"}} {value}'
+                    )
+        for key, value in data["total"].items():
+            if value is not None:
+                samples[f"{prefix}_{key}"] = [f"{prefix}_{key} {value}"]
+        lines: List[str] = []
+        for metric, metric_samples in samples.items():
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(metric_samples)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: str = "json") -> None:
+        """
+        Writes the metrics to a file.
+        Args:
+            path (str): The output file.
+            fmt (str): "json" or "prometheus".
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if fmt not in METRICS_FORMATS:
+            raise ValueError(
+                f"Invalid metrics format '{fmt}'. Allowed: {METRICS_FORMATS}"
+            )
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "json":
+                json.dump(self.to_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
@@ -0,0 +1,201 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.package_table import _INT_COLUMNS, COLUMNS, PackageTable
+
+# Index layout (little-endian), read in place through mmap:
+#   header    magic, format version, record count, offset of the string area
+#   records   one fixed-size record per package, sorted by UTF-8 name: int64 for
+#             epoch and build time (-1 if missing), (offset, length) into the
+#             string area for the other columns and the row's JSON extras
+#             (_NO_STRING as offset if missing)
+#   strings   UTF-8 bytes of every distinct string
+INDEX_MAGIC: bytes = b"PKGI"
+INDEX_VERSION: int = 1
+_header = struct.Struct("<4sHxxIQ")
+_record = struct.Struct(
+    "<" + "".join("q" if column in _INT_COLUMNS else "II" for column in COLUMNS) + "II"
+)
+_NO_STRING: int = 0xFFFFFFFF
+_MISSING: int = -1
+
+
+def write_package_index(table: PackageTable, path: str) -> None:
+    """
+    Writes a package table as an index file that `PackageIndex` can query in place.
+    Args:
+        table (PackageTable): The table to write.
+        path (str): The index file, replaced atomically.
+    """
+    strings: bytearray = bytearray()
+    offsets: Dict[bytes, int] = {}
+
+    def reference(value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return _NO_STRING, 0
+        data: bytes = value.encode("utf-8")
+        offset: Optional[int] = offsets.get(data)
+        if offset is None:
+            offset = offsets[data] = len(strings)
+            strings.extend(data)
+        return offset, len(data)
+
+    records: bytearray = bytearray()
+    rows: List[int] = sorted(
+        table.index.values(), key=lambda row: table.names[row].encode("utf-8")
+    )
+    for row in rows:
+        extra: Dict[str, Any] = dict(table.extras.get(row, {}))
+        fields: list = []
+        for column in COLUMNS:
+            value: Any = table.columns[column][row]
+            if column in _INT_COLUMNS:
+                fields.append(value)
+            elif value is None or type(value) is str:
+                fields.extend(reference(value))
+            else:
+                extra[column] = value
+                fields.extend(reference(None))
+        fields.extend(
+            reference(json.dumps(extra, ensure_ascii=False, separators=(",", ":")))
+            if extra
+            else reference(None)
+        )
+        records.extend(_record.pack(*fields))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path: str = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _header.pack(
+                INDEX_MAGIC, INDEX_VERSION, len(rows), _header.size + len(records)
+            )
+        )
+        f.write(records)
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+
+class PackageIndex:
+    """
+    Read-only, memory-mapped view of an index file written by `write_package_index`.
+    Records have a fixed size and are sorted by name, so a lookup is a binary
+    search touching O(log n) pages of the file; nothing is loaded up front.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens an index file.
+        Args:
+            path (str): The index file.
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a supported index.
+        """
+        with open(path, "rb") as f:
+            self._map: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _header.size:
+            self._map.close()
+            raise ValueError(f"Invalid package index {path}: truncated header")
+        magic, version, count, strings = _header.unpack_from(self._map)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported package index {path} (format {version})")
+        self._count: int = count
+        self._strings: int = strings
+
+    def __enter__(self) -> "PackageIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over all packages in name order, reading one record at a time,
+        e.g. as input of `iter_merge_join`.
+        """
+        return (self._package(position) for position in range(self._count))
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if offset == _NO_STRING:
+            return None
+        start: int = self._strings + offset
+        return self._map[start : start + length].decode("utf-8")
+
+    def _fields(self, position: int) -> tuple:
+        return _record.unpack_from(self._map, _header.size + position * _record.size)
+
+    def _name(self, position: int) -> bytes:
+        # The name is the first (offset, length) pair of a record.
+        offset, length = struct.unpack_from(
+            "<II", self._map, _header.size + position * _record.size
+        )
+        start: int = self._strings + offset
+        return self._map[start : start + length]
+
+    def _package(self, position: int) -> Dict[str, Any]:
+        fields: tuple = self._fields(position)
+        extra_offset, extra_length = fields[-2:]
+        extra: Dict[str, Any] = (
+            json.loads(self._string(extra_offset, extra_length))
+            if extra_offset != _NO_STRING
+            else {}
+        )
+        package: Dict[str, Any] = {}
+        index: int = 0
+        for column in COLUMNS:
+            value: Any
+            if column in _INT_COLUMNS:
+                value = fields[index]
+                index += 1
+                missing: bool = value == _MISSING
+            else:
+                value = self._string(fields[index], fields[index + 1])
+                index += 2
+                missing = value is None
+            if not missing:
+                package[column] = value
+            elif column in extra:
+                package[column] = extra[column]
+        for key, value in extra.items():
+            if key not in package:
+                package[key] = value
+        return package
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a package by name.
+        Args:
+            name (str): The package name.
+        Returns:
+            Optional[Dict[str, Any]]: The package, or None if it is not in the index.
+        """
+        key: bytes = name.encode("utf-8")
+        position: int = bisect.bisect_left(range(self._count), key, key=self._name)
+        if position < self._count and self._name(position) == key:
+            return self._package(position)
+        return None
+
+    def prefix(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over the packages whose names start with a prefix, in name order.
+        Args:
+            prefix (str): The name prefix.
+        Returns:
+            Iterator[Dict[str, Any]]: The matching packages.
+        """
+        key: bytes = prefix.encode("utf-8")
+        position: int = bisect.bisect_left(range(self._count), key, key=self._name)
+        while position < self._count and self._name(position).startswith(key):
+            yield self._package(position)
+            position += 1
@@ -0,0 +1,208 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.versions import VersionKey, version_key
+
+# Fields of the branch_binary_packages export, in export order.
+COLUMNS: tuple = (
+    "name",
+    "epoch",
+    "version",
+    "release",
+    "arch",
+    "disttag",
+    "buildtime",
+    "source",
+)
+_INT_COLUMNS: tuple = ("epoch", "buildtime")
+_COLUMN_SET: frozenset = frozenset(COLUMNS)
+_MISSING: int = -1
+
+
+class PackageTable:
+    """
+    Columnar store of the packages of one branch.
+    Strings are interned and kept in parallel lists, epochs and build times in
+    typed arrays, and `index` maps each name to its row. As in a name-keyed dict,
+    a later package with the same name replaces the earlier one in place.
+    Fields outside `COLUMNS`, and epoch/build time values that are not ints, are
+    kept per row in `extras`, so `record` returns the original package dict.
+    """
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, Any] = {
+            column: array("q") if column in _INT_COLUMNS else [] for column in COLUMNS
+        }
+        self._column_lists: list = [self.columns[column] for column in COLUMNS]
+        self.names: List[str] = self.columns["name"]
+        self.index: Dict[str, int] = {}
+        self.extras: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_packages(cls, packages: Iterable[Dict[str, Any]]) -> "PackageTable":
+        """
+        Builds a table from package dictionaries, consuming them one at a time.
+        Args:
+            packages (Iterable[Dict[str, Any]]): The packages, or an existing table.
+        Returns:
+            PackageTable: The filled table (`packages` itself if it already is one).
+        """
+        if isinstance(packages, cls):
+            return packages
+        table: PackageTable = cls()
+        table.extend(packages)
+        return table
+
+    def take(self, rows: Iterable[int]) -> "PackageTable":
+        """
+        Builds a table from some rows of this one, without materializing packages.
+        Args:
+            rows (Iterable[int]): The rows to copy, in the order of the new table.
+        Returns:
+            PackageTable: The new table.
+        """
+        rows = list(rows)
+        table: PackageTable = PackageTable()
+        for column in COLUMNS:
+            values: Any = self.columns[column]
+            table.columns[column].extend([values[row] for row in rows])
+        table.index = {name: row for row, name in enumerate(table.names)}
+        table.extras = {
+            new_row: self.extras[row]
+            for new_row, row in enumerate(rows)
+            if row in self.extras
+        }
+        return table
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.record(row) for row in range(len(self.names)))
+
+    def iter_sorted(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over the packages in name order, e.g. as input of `iter_merge_join`.
+        Returns:
+            Iterator[Dict[str, Any]]: The packages sorted by name.
+        """
+        return (self.record(self.index[name]) for name in sorted(self.index))
+
+    def extend(self, packages: Iterable[Dict[str, Any]]) -> None:
+        """
+        Appends packages to the table.
+        Args:
+            packages (Iterable[Dict[str, Any]]): The packages to append.
+        """
+        for package in packages:
+            self.append(package)
+
+    def append(self, package: Dict[str, Any]) -> int:
+        """
+        Appends a package, or replaces the row of a package with the same name.
+        Args:
+            package (Dict[str, Any]): The package to store.
+        Returns:
+            int: The row of the package.
+        """
+        values: list = []
+        extra: Optional[Dict[str, Any]] = None
+        for column in COLUMNS:
+            value: Any = package.get(column)
+            if column in _INT_COLUMNS:
+                if type(value) is not int or value < 0:
+                    if column in package:
+                        extra = extra or {}
+                        extra[column] = value
+                    value = _MISSING
+            elif type(value) is str:
+                value = sys.intern(value)
+            elif value is None and column in package:
+                extra = extra or {}
+                extra[column] = None
+            values.append(value)
+        if not package.keys() <= _COLUMN_SET:
+            extra = extra or {}
+            extra.update(
+                (key, value) for key, value in package.items() if key not in _COLUMN_SET
+            )
+
+        name: str = values[0]
+        row: Optional[int] = self.index.get(name)
+        if row is None:
+            row = len(self.names)
+            self.index[name] = row
+            for column, value in zip(self._column_lists, values):
+                column.append(value)
+        else:
+            for column, value in zip(self._column_lists, values):
+                column[row] = value
+            self.extras.pop(row, None)
+
+        if extra:
+            self.extras[row] = extra
+        return row
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the package with the given name.
+        Args:
+            name (str): The package name.
+        Returns:
+            Optional[Dict[str, Any]]: The package, or None if it is not in the table.
+        """
+        row: Optional[int] = self.index.get(name)
+        return None if row is None else self.record(row)
+
+    def record(self, row: int, exclude: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Materializes a row as a package dictionary.
+        Args:
+            row (int): The row.
+            exclude (Iterable[str]): Fields to leave out.
+        Returns:
+            Dict[str, Any]: The package, with its fields in export order.
+        """
+        extra: Optional[Dict[str, Any]] = self.extras.get(row)
+        package: Dict[str, Any] = {}
+        for column in COLUMNS:
+            if column in exclude:
+                continue
+            value: Any = self.columns[column][row]
+            if value is None or (value == _MISSING and column in _INT_COLUMNS):
+                if extra and column in extra:
+                    package[column] = extra[column]
+            else:
+                package[column] = value
+        if extra:
+            for key, value in extra.items():
+                if key not in package and key not in exclude:
+                    package[key] = value
+        return package
+
+    def evr(self, row: int) -> Tuple[Any, str, str]:
+        """
+        Returns the epoch, version and release of a row.
+        Args:
+            row (int): The row.
+        Returns:
+            Tuple[Any, str, str]: The (epoch, version, release) tuple.
+        """
+        epoch: Any = self.columns["epoch"][row]
+        if epoch == _MISSING:
+            extra: Optional[Dict[str, Any]] = self.extras.get(row)
+            epoch = extra.get("epoch", 0) if extra else 0
+        return epoch, self.columns["version"][row], self.columns["release"][row]
+
+    def key(self, row: int) -> VersionKey:
+        """
+        Returns the version key of a row.
+        Args:
+            row (int): The row.
+        Returns:
+            VersionKey: The memoized epoch:version-release key.
+        """
+        return version_key(*self.evr(row))
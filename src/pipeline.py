@@ -0,0 +1,157 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# A named step applied to every item passing through a pipeline.
+Stage = Tuple[str, Callable[[Any], Any]]
+
+# How often a blocked stage checks whether the pipeline was stopped, in seconds.
+_POLL_INTERVAL: float = 0.1
+_DONE = object()
+
+
+class PipelineError(Exception):
+    """
+    Raised by `run_pipeline` when a stage fails; `error` is the stage's exception.
+    """
+
+    def __init__(self, stage: str, error: BaseException) -> None:
+        super().__init__(f"{stage}: {error}")
+        self.stage: str = stage
+        self.error: BaseException = error
+
+
+class _Failure:
+    def __init__(self, stage: str, error: BaseException) -> None:
+        self.stage: str = stage
+        self.error: BaseException = error
+
+
+def _put(channel: queue.Queue, item: Any, stopped: threading.Event) -> bool:
+    """Puts an item on a bounded queue; returns False if the pipeline stopped first."""
+    while not stopped.is_set():
+        try:
+            channel.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(channel: queue.Queue, stopped: threading.Event) -> Any:
+    """Takes an item from a queue; returns `_DONE` if the pipeline stopped first."""
+    while not stopped.is_set():
+        try:
+            return channel.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _feed(
+    source: str,
+    items: Iterable[Any],
+    output: queue.Queue,
+    stopped: threading.Event,
+) -> None:
+    iterator: Iterator[Any] = iter(items)
+    try:
+        for item in iterator:
+            if not _put(output, item, stopped):
+                return
+    except BaseException as e:
+        _put(output, _Failure(source, e), stopped)
+        return
+    finally:
+        # Lets a generator source release what it holds, e.g. a thread pool.
+        close: Optional[Callable[[], None]] = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+    _put(output, _DONE, stopped)
+
+
+def _work(
+    stage: Stage,
+    source: queue.Queue,
+    output: queue.Queue,
+    stopped: threading.Event,
+) -> None:
+    name, function = stage
+    while True:
+        item: Any = _get(source, stopped)
+        if item is _DONE or isinstance(item, _Failure):
+            _put(output, item, stopped)
+            return
+        try:
+            result: Any = function(item)
+        except BaseException as e:
+            _put(output, _Failure(name, e), stopped)
+            return
+        if not _put(output, result, stopped):
+            return
+
+
+def run_pipeline(
+    items: Iterable[Any],
+    stages: List[Stage],
+    maxsize: int = 1,
+    source: str = "source",
+) -> Iterator[Any]:
+    """
+    Passes items through a chain of stages with overlapping execution.
+    The source iterable and every stage run in their own thread, connected by
+    queues of at most `maxsize` items: while one item is in a later stage, the
+    next ones are already in earlier stages, so the run takes about as long as
+    its slowest stage rather than the sum of all of them. A stage that is
+    `maxsize` items ahead of the next one waits, which bounds the memory held by
+    the pipeline. Items come out in source order.
+    Closing the returned iterator early stops every stage.
+    Args:
+        items (Iterable[Any]): The source items; iterated in a thread of its own.
+        stages (List[Stage]): (name, function) pairs, applied in order.
+        maxsize (int): The capacity of each queue between two stages.
+        source (str): The stage name reported for errors raised by `items`.
+    Returns:
+        Iterator[Any]: The results of the last stage.
+    Raises:
+        PipelineError: If the source or a stage raises; the other stages are stopped.
+    """
+    stopped: threading.Event = threading.Event()
+    channels: List[queue.Queue] = [
+        queue.Queue(maxsize=max(1, maxsize)) for _ in range(len(stages) + 1)
+    ]
+    threads: List[threading.Thread] = [
+        threading.Thread(
+            target=_feed,
+            args=(source, items, channels[0], stopped),
+            name=f"pipeline-{source}",
+            daemon=True,
+        )
+    ]
+    threads.extend(
+        threading.Thread(
+            target=_work,
+            args=(stage, channels[i], channels[i + 1], stopped),
+            name=f"pipeline-{stage[0]}",
+            daemon=True,
+        )
+        for i, stage in enumerate(stages)
+    )
+
+    def results() -> Iterator[Any]:
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item: Any = channels[-1].get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise PipelineError(item.stage, item.error) from item.error
+                yield item
+        finally:
+            stopped.set()
+            for thread in threads:
+                thread.join()
+
+    return results()
@@ -0,0 +1,182 @@
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, TextIO, TypeVar
+from src.logging_config import log
+
+T = TypeVar("T")
+
+PROGRESS_MODES: tuple = ("auto", "bar", "log", "off")
+
+
+class DownloadProgress:
+    """Progress of a single download, counting bytes received and packages parsed."""
+
+    def __init__(
+        self,
+        desc: str,
+        total: Optional[int],
+        mode: str,
+        file: TextIO,
+        on_close: Optional[Callable[["DownloadProgress"], None]] = None,
+        position: int = 0,
+        release: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.desc: str = desc
+        self.mode: str = mode
+        self.on_close: Optional[Callable[["DownloadProgress"], None]] = on_close
+        self.bytes_received: int = 0
+        self.items: int = 0
+        self._start: float = time.perf_counter()
+        self._closed: bool = False
+        self._position: int = position
+        self._release: Optional[Callable[[int], None]] = release
+        self._bar = None
+        if mode == "bar":
+            from tqdm import tqdm
+
+            self._bar = tqdm(
+                total=total,
+                desc=desc,
+                file=file,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+                leave=True,
+                position=position,
+            )
+
+    def track_bytes(
+        self, chunks: Iterable[bytes], position: Optional[Callable[[], int]] = None
+    ) -> Iterator[bytes]:
+        """
+        Counts the bytes of chunks as they are received.
+        Args:
+            chunks (Iterable[bytes]): The response chunks.
+            position (Optional[Callable[[], int]]): Returns the number of bytes read
+                from the wire so far; used instead of the chunk sizes when the
+                response is decoded (e.g. gzip) before reaching the caller.
+        Returns:
+            Iterator[bytes]: The same chunks.
+        """
+        if self.mode == "off" and self.on_close is None:
+            return iter(chunks)
+        return self._track_bytes(chunks, position)
+
+    def _track_bytes(
+        self, chunks: Iterable[bytes], position: Optional[Callable[[], int]]
+    ) -> Iterator[bytes]:
+        for chunk in chunks:
+            received: int = position() if position else self.bytes_received + len(chunk)
+            if self._bar is not None:
+                self._bar.update(received - self.bytes_received)
+                self._bar.set_postfix(packages=self.items, refresh=False)
+            self.bytes_received = received
+            yield chunk
+
+    def track_items(self, items: Iterable[T]) -> Iterator[T]:
+        """
+        Counts items (parsed packages) as they are consumed.
+        Args:
+            items (Iterable[T]): The items to count.
+        Returns:
+            Iterator[T]: The same items.
+        """
+        if self.mode == "off" and self.on_close is None:
+            return iter(items)
+        return self._track_items(items)
+
+    def _track_items(self, items: Iterable[T]) -> Iterator[T]:
+        for item in items:
+            self.items += 1
+            yield item
+
+    def close(self) -> None:
+        """
+        Finishes the progress display or logs a summary line in "log" mode,
+        then passes the counts to `on_close`. Only the first call has an effect.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._bar is not None:
+            self._bar.set_postfix(packages=self.items)
+            self._bar.close()
+            self._bar = None
+            if self._release is not None:
+                self._release(self._position)
+        elif self.mode == "log":
+            elapsed: float = time.perf_counter() - self._start
+            log.info(
+                f"{self.desc}: {self.bytes_received} bytes, "
+                f"{self.items} packages in {elapsed:.2f}s"
+            )
+        if self.on_close is not None:
+            self.on_close(self)
+
+
+class ProgressReporter:
+    """
+    Creates progress displays for downloads.
+    Modes:
+        - "bar": tqdm progress bars written to `file`; concurrent downloads
+          each get a line of their own.
+        - "log": one summary log record per download, for batch runs.
+        - "off": no reporting; tracked iterables are passed through unwrapped
+          unless `on_close` needs the counts.
+        - "auto": "bar" if `file` is a terminal, "log" otherwise.
+    `on_close` is called with each finished download, e.g. to collect metrics.
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        file: Optional[TextIO] = None,
+        on_close: Optional[Callable[[DownloadProgress], None]] = None,
+    ) -> None:
+        if mode not in PROGRESS_MODES:
+            raise ValueError(
+                f"Invalid progress mode '{mode}'. Allowed: {PROGRESS_MODES}"
+            )
+        self.file: TextIO = file or sys.stderr
+        if mode == "auto":
+            isatty: Optional[Callable[[], bool]] = getattr(self.file, "isatty", None)
+            mode = "bar" if isatty and isatty() else "log"
+        self.mode: str = mode
+        self.on_close: Optional[Callable[[DownloadProgress], None]] = on_close
+        # Lines taken by open bars.
+        self._positions: set = set()
+        self._positions_lock: threading.Lock = threading.Lock()
+
+    def _take_position(self) -> int:
+        with self._positions_lock:
+            position: int = 0
+            while position in self._positions:
+                position += 1
+            self._positions.add(position)
+            return position
+
+    def _release_position(self, position: int) -> None:
+        with self._positions_lock:
+            self._positions.discard(position)
+
+    def start(self, desc: str, total: Optional[int] = None) -> DownloadProgress:
+        """
+        Starts reporting a download.
+        Args:
+            desc (str): The description shown for the download.
+            total (Optional[int]): The expected number of bytes, if known.
+        Returns:
+            DownloadProgress: The progress tracker.
+        """
+        if self.mode != "bar":
+            return DownloadProgress(desc, total, self.mode, self.file, self.on_close)
+        return DownloadProgress(
+            desc,
+            total,
+            self.mode,
+            self.file,
+            self.on_close,
+            position=self._take_position(),
+            release=self._release_position,
+        )
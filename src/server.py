@@ -0,0 +1,243 @@
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from src.altlinux_api import AltLinuxAPI
+from src.comparison import REPORT_EXCLUDED_FIELDS, compare_packages
+from src.config import config
+from src.fetcher import FetchKey, fetch_all
+from src.logging_config import log
+from src.package_table import PackageTable
+
+CATEGORIES: tuple = ("only_in_p10", "only_in_sisyphus", "higher_in_sisyphus")
+
+
+class _Snapshot:
+    """Immutable set of branch tables and comparison results, swapped as a whole on refresh."""
+
+    def __init__(
+        self, tables: Dict[FetchKey, PackageTable], results: Dict[str, dict]
+    ) -> None:
+        self.tables: Dict[FetchKey, PackageTable] = tables
+        self.results: Dict[str, dict] = results
+        self.sorted_names: Dict[FetchKey, List[str]] = {
+            key: sorted(table.index) for key, table in tables.items()
+        }
+        self.refreshed_at: float = time.time()
+        # Encoded responses, filled on first request.
+        self.responses: Dict[tuple, bytes] = {}
+
+
+class BranchStore:
+    """
+    Keeps the packages of the compared branches and their comparison results in
+    memory, refreshing them on a schedule.
+    A refresh fetches and compares everything before swapping it in, so queries
+    never wait for it and always see a consistent state. Failed refreshes are
+    logged and the previous state keeps being served; the last error is kept for
+    /health until a refresh succeeds. The API client's circuit breaker closes
+    again after its cool-down, so a bad refresh does not stop later ones.
+    """
+
+    def __init__(self, api: AltLinuxAPI, arches: Iterable[str], jobs: int) -> None:
+        self.api: AltLinuxAPI = api
+        self.arches: List[str] = list(arches)
+        self.jobs: int = jobs
+        self.branches: List[str] = sorted(config.branches)
+        self._snapshot: Optional[_Snapshot] = None
+        self._refresh_lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+    @property
+    def snapshot(self) -> Optional[_Snapshot]:
+        return self._snapshot
+
+    def refresh(self) -> None:
+        """
+        Fetches and compares the branches, then swaps in the new state.
+        Raises:
+            Exception: Any error of the fetch or the comparison, also kept in
+                `last_error`.
+        """
+        with self._refresh_lock:
+            start: float = time.perf_counter()
+            try:
+                tables: Dict[FetchKey, PackageTable] = fetch_all(
+                    self.api, self.branches, self.arches, max_workers=self.jobs
+                )
+                results: Dict[str, dict] = {}
+                for arch in self.arches:
+                    results[arch] = compare_packages(
+                        tables[("sisyphus", arch)],
+                        tables[("p10", arch)],
+                        exclude=REPORT_EXCLUDED_FIELDS,
+                    )
+            except Exception as e:
+                self.last_error, self.last_error_at = str(e), time.time()
+                raise
+            self._snapshot = _Snapshot(tables, results)
+            self.last_error = self.last_error_at = None
+            log.info(f"Refreshed branch indexes in {time.perf_counter() - start:.1f}s")
+
+    def start(self, interval: float) -> None:
+        """
+        Refreshes the branches every `interval` seconds in a background thread.
+        Args:
+            interval (float): The refresh interval, in seconds.
+        """
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    log.error(f"Error refreshing branch indexes: {e}")
+
+        self._thread = threading.Thread(target=run, name="refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _prefix_matches(sorted_names: List[str], prefix: str) -> Iterator[str]:
+    position: int = bisect.bisect_left(sorted_names, prefix)
+    while position < len(sorted_names) and sorted_names[position].startswith(prefix):
+        yield sorted_names[position]
+        position += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version: str = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle's algorithm
+    # hold the body back on keep-alive connections.
+    disable_nagle_algorithm: bool = True
+    server: "ComparisonServer"
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query: Dict[str, List[str]] = parse_qs(url.query)
+        snapshot: Optional[_Snapshot] = self.server.store.snapshot
+        if url.path == "/health":
+            self._send(200, self._health(snapshot))
+            return
+        if url.path not in ("/compare", "/lookup"):
+            self._error(404, f"Unknown path {url.path}")
+            return
+        if snapshot is None:
+            self._error(503, "Branch indexes are not loaded yet")
+            return
+        arch: str = query.get("arch", [""])[0]
+        if arch not in snapshot.results:
+            self._error(400, f"Unknown arch '{arch}'")
+            return
+        if url.path == "/compare":
+            category: Optional[str] = query.get("category", [None])[0]
+            if category is not None and category not in CATEGORIES:
+                self._error(400, f"Unknown category '{category}'")
+                return
+            self._send(200, self._compare(snapshot, arch, category))
+        else:
+            names: List[str] = query.get("name", [])
+            if not names:
+                self._error(400, "No name given")
+                return
+            prefix: bool = query.get("prefix", ["0"])[0] in ("1", "true")
+            self._send(200, self._lookup(snapshot, arch, names, prefix))
+
+    def _health(self, snapshot: Optional[_Snapshot]) -> bytes:
+        store: BranchStore = self.server.store
+        errors: dict = (
+            {"last_error": store.last_error, "last_error_at": store.last_error_at}
+            if store.last_error is not None
+            else {}
+        )
+        if snapshot is None:
+            return json.dumps({"status": "loading", **errors}).encode("utf-8")
+        return json.dumps(
+            {
+                "status": "stale" if errors else "ok",
+                "refreshed_at": snapshot.refreshed_at,
+                "age_seconds": time.time() - snapshot.refreshed_at,
+                **errors,
+                "packages": {
+                    f"{branch}/{arch}": len(table)
+                    for (branch, arch), table in snapshot.tables.items()
+                },
+            }
+        ).encode("utf-8")
+
+    def _compare(
+        self, snapshot: _Snapshot, arch: str, category: Optional[str]
+    ) -> bytes:
+        key: tuple = ("compare", arch, category)
+        body: Optional[bytes] = snapshot.responses.get(key)
+        if body is None:
+            result: dict = snapshot.results[arch]
+            body = json.dumps(
+                result[category] if category else result, ensure_ascii=False
+            ).encode("utf-8")
+            snapshot.responses[key] = body
+        return body
+
+    def _lookup(
+        self, snapshot: _Snapshot, arch: str, names: List[str], prefix: bool
+    ) -> bytes:
+        branches: List[str] = self.server.store.branches
+        result: Dict[str, dict] = {}
+        for branch in branches:
+            key: FetchKey = (branch, arch)
+            table: PackageTable = snapshot.tables[key]
+            for name in names:
+                matches: Iterable[str] = (
+                    _prefix_matches(snapshot.sorted_names[key], name)
+                    if prefix
+                    else (name,)
+                )
+                for match in matches:
+                    result.setdefault(match, dict.fromkeys(branches))[branch] = (
+                        table.get(match)
+                    )
+        if prefix:
+            result = dict(sorted(result.items()))
+        return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+    def log_message(self, format: str, *args) -> None:
+        log.debug(f"{self.address_string()} {format % args}")
+
+
+class ComparisonServer(ThreadingHTTPServer):
+    """
+    HTTP server answering comparison and lookup queries from a `BranchStore`.
+    Endpoints (GET, JSON responses):
+        - /health: Load state ("loading", "ok", or "stale" after a failed
+          refresh, with its error), data age and package counts.
+        - /compare?arch=<arch>[&category=<category>]: The comparison result of an
+          architecture, as in the CLI report, or one of its categories.
+        - /lookup?arch=<arch>&name=<name>[&name=...][&prefix=1]: The packages with
+          the given names (or name prefixes) in each branch.
+    """
+
+    daemon_threads: bool = True
+
+    def __init__(self, address: Tuple[str, int], store: BranchStore) -> None:
+        super().__init__(address, _Handler)
+        self.store: BranchStore = store
@@ -0,0 +1,227 @@
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.logging_config import log
+from src.package_index import write_package_index
+from src.package_table import _INT_COLUMNS, COLUMNS, PackageTable
+
+# Snapshot layout (little-endian), zlib-compressed as a whole:
+#   header    magic, format version, row count, string count, string blob size
+#   strings   character lengths (uint32), then the strings as one UTF-8 blob
+#   columns   per column in COLUMNS order: int64 values, or uint32 string ids
+#             (_NO_STRING for a missing value)
+#   extras    length (uint32) and JSON object of row -> extra fields
+SNAPSHOT_MAGIC: bytes = b"PKGT"
+SNAPSHOT_VERSION: int = 1
+_header = struct.Struct("<4sHIII")
+_length = struct.Struct("<I")
+_NO_STRING: int = 0xFFFFFFFF
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: memoryview) -> array:
+    values: array = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def dump_snapshot(table: PackageTable, level: int = 6) -> bytes:
+    """
+    Serializes a package table into a compressed binary snapshot.
+    Every distinct string is stored once and columns are stored as fixed-width
+    arrays, so loading needs no per-package parsing.
+    Args:
+        table (PackageTable): The table to serialize.
+        level (int): The zlib compression level.
+    Returns:
+        bytes: The snapshot.
+    """
+    string_ids: Dict[str, int] = {}
+    strings: List[str] = []
+    parts: List[bytes] = []
+    for column in COLUMNS:
+        values: Any = table.columns[column]
+        if column in _INT_COLUMNS:
+            parts.append(_to_bytes(values))
+            continue
+        ids: array = array("I")
+        for value in values:
+            if value is None:
+                ids.append(_NO_STRING)
+                continue
+            string_id: Optional[int] = string_ids.get(value)
+            if string_id is None:
+                string_id = string_ids[value] = len(strings)
+                strings.append(value)
+            ids.append(string_id)
+        parts.append(_to_bytes(ids))
+
+    blob: bytes = "".join(strings).encode("utf-8")
+    extras: bytes = json.dumps(
+        {str(row): extra for row, extra in table.extras.items()},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    payload: bytes = b"".join(
+        [
+            _header.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                len(table.names),
+                len(strings),
+                len(blob),
+            ),
+            _to_bytes(array("I", map(len, strings))),
+            blob,
+            *parts,
+            _length.pack(len(extras)),
+            extras,
+        ]
+    )
+    return zlib.compress(payload, level)
+
+
+def load_snapshot(data: bytes) -> PackageTable:
+    """
+    Rebuilds a package table from a snapshot made by `dump_snapshot`.
+    Args:
+        data (bytes): The snapshot.
+    Returns:
+        PackageTable: The table.
+    Raises:
+        ValueError: If the data is not a snapshot of a supported version.
+    """
+    try:
+        payload: memoryview = memoryview(zlib.decompress(data))
+    except zlib.error as e:
+        raise ValueError(f"Invalid package snapshot: {e}") from e
+    if len(payload) < _header.size:
+        raise ValueError("Invalid package snapshot: truncated header")
+    magic, version, rows, string_count, blob_size = _header.unpack_from(payload)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported package snapshot (format {version})")
+
+    offset: int = _header.size
+    lengths: array = _from_bytes("I", payload[offset : offset + 4 * string_count])
+    offset += 4 * string_count
+    text: str = str(payload[offset : offset + blob_size], "utf-8")
+    offset += blob_size
+    strings: List[str] = []
+    position: int = 0
+    for length in lengths:
+        strings.append(sys.intern(text[position : position + length]))
+        position += length
+
+    table: PackageTable = PackageTable()
+    for column in COLUMNS:
+        if column in _INT_COLUMNS:
+            values: array = _from_bytes("q", payload[offset : offset + 8 * rows])
+            table.columns[column].extend(values)
+            offset += 8 * rows
+        else:
+            ids: array = _from_bytes("I", payload[offset : offset + 4 * rows])
+            table.columns[column].extend(
+                None if string_id == _NO_STRING else strings[string_id]
+                for string_id in ids
+            )
+            offset += 4 * rows
+
+    (extras_size,) = _length.unpack_from(payload, offset)
+    offset += _length.size
+    extras: dict = json.loads(bytes(payload[offset : offset + extras_size]))
+    table.extras = {int(row): extra for row, extra in extras.items()}
+    table.index = {name: row for row, name in enumerate(table.names)}
+    return table
+
+
+def snapshot_path(snapshot_dir: str, branch: str, arch: Optional[str]) -> str:
+    return os.path.join(snapshot_dir, f"{branch}_{arch or 'all'}.pkgs")
+
+
+def index_path(snapshot_dir: str, branch: str, arch: Optional[str]) -> str:
+    return os.path.join(snapshot_dir, f"{branch}_{arch or 'all'}.pkgi")
+
+
+def save_snapshot(table: PackageTable, path: str) -> None:
+    """
+    Saves a package table as a snapshot file, atomically.
+    Args:
+        table (PackageTable): The table to save.
+        path (str): The snapshot file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path: str = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dump_snapshot(table))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> PackageTable:
+    """
+    Loads a package table from a snapshot file.
+    Args:
+        path (str): The snapshot file.
+    Returns:
+        PackageTable: The table.
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a supported snapshot.
+    """
+    with open(path, "rb") as f:
+        return load_snapshot(f.read())
+
+
+def save_branch_snapshots(
+    packages: Dict[Tuple[str, Optional[str]], PackageTable], snapshot_dir: str
+) -> None:
+    """
+    Saves fetched branches as snapshots, one file per (branch, arch) pair, each
+    with a package index file for name lookups (see `PackageIndex`).
+    Args:
+        packages (Dict[Tuple[str, Optional[str]], PackageTable]): Tables keyed by (branch, arch).
+        snapshot_dir (str): The directory to save to.
+    """
+    for (branch, arch), table in packages.items():
+        path: str = snapshot_path(snapshot_dir, branch, arch)
+        save_snapshot(table, path)
+        write_package_index(table, index_path(snapshot_dir, branch, arch))
+        log.debug(f"Saved {len(table)} packages of {branch}/{arch} to {path}")
+
+
+def load_branch_snapshots(
+    snapshot_dir: str, branches: Iterable[str], arches: Iterable[Optional[str]]
+) -> Dict[Tuple[str, Optional[str]], PackageTable]:
+    """
+    Loads snapshots saved by `save_branch_snapshots`, in the key order of `fetch_all`.
+    Args:
+        snapshot_dir (str): The directory holding the snapshots.
+        branches (Iterable[str]): The branches to load.
+        arches (Iterable[Optional[str]]): The architectures to load.
+    Returns:
+        Dict[Tuple[str, Optional[str]], PackageTable]: Tables keyed by (branch, arch).
+    Raises:
+        OSError: If a snapshot is missing or unreadable.
+        ValueError: If a file is not a supported snapshot.
+    """
+    branches = list(branches)
+    packages: Dict[Tuple[str, Optional[str]], PackageTable] = {}
+    for arch in arches:
+        for branch in branches:
+            table: PackageTable = read_snapshot(
+                snapshot_path(snapshot_dir, branch, arch)
+            )
+            log.info(f"Loaded {len(table)} packages of {branch}/{arch} from snapshot")
+            packages[(branch, arch)] = table
+    return packages
@@ -0,0 +1,145 @@
+"""
+Generator of synthetic branch exports shaped like the branch_binary_packages API.
+
+Names, versions and releases follow the patterns found in ALT Linux branches
+(library and language-module prefixes, dotted versions with letters, snapshot
+and pre-release tildes, altN/altN.M releases, occasional epochs), so parsing,
+version comparison and serialization see realistic inputs.
+"""
+
+import json
+import random
+from typing import Iterator, List, Tuple
+
+_PREFIXES: tuple = (
+    "",
+    "",
+    "",
+    "lib",
+    "lib",
+    "python3-module-",
+    "perl-",
+    "golang-",
+    "kernel-modules-",
+    "ruby-gem-",
+    "node-",
+    "fonts-ttf-",
+)
+_SUFFIXES: tuple = ("", "", "", "", "-devel", "-devel", "-doc", "-utils", "-data")
+_SYLLABLES: tuple = (
+    "ac", "al", "ba", "cr", "de", "ex", "fi", "gl", "ht", "io", "jo", "ka", "li",
+    "mo", "ne", "op", "py", "qt", "ru", "se", "tk", "un", "vi", "wx", "xm", "ya",
+    "ze",
+)  # fmt: skip
+
+
+def _name(rng: random.Random, index: int) -> Tuple[str, str]:
+    """
+    Returns a package name and the name of its source package. Consecutive
+    indexes share a source, like the subpackages of one source package.
+    """
+    number: int = index // 3
+    stem: str = ""
+    while True:
+        number, digit = divmod(number, len(_SYLLABLES))
+        stem += _SYLLABLES[digit]
+        if not number:
+            break
+    return f"{rng.choice(_PREFIXES)}{stem}{rng.choice(_SUFFIXES)}-{index}", stem
+
+
+def _version(rng: random.Random) -> str:
+    parts: List[str] = [str(rng.randint(0, 30)) for _ in range(rng.randint(1, 4))]
+    kind: float = rng.random()
+    if kind < 0.05:
+        parts[-1] += rng.choice(("a", "b", "rc1", "p2"))
+    elif kind < 0.08:
+        parts[-1] += f"~{rng.choice(('alpha', 'beta', 'rc'))}{rng.randint(1, 3)}"
+    elif kind < 0.12:
+        parts.append(f"git{rng.randrange(16**7):07x}")
+    return ".".join(parts)
+
+
+def _release(rng: random.Random) -> str:
+    if rng.random() < 0.15:
+        return f"alt{rng.randint(0, 3)}.{rng.randint(1, 5)}"
+    return f"alt{rng.randint(1, 9)}"
+
+
+def _churn(rng: random.Random, package: dict) -> dict:
+    """Returns a copy of `package` with a newer or older release, version or epoch."""
+    package = dict(package)
+    kind: float = rng.random()
+    if kind < 0.6:
+        package["release"] = _release(rng)
+    elif kind < 0.95:
+        package["version"] = _version(rng)
+    else:
+        package["epoch"] += 1
+    return package
+
+
+def generate_branches(
+    size: int, overlap: float = 0.9, churn: float = 0.2, seed: int = 0
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Generates the packages of a sisyphus-like and a p10-like branch.
+    Args:
+        size (int): The number of packages in each branch.
+        overlap (float): The share of names present in both branches.
+        churn (float): The share of shared names whose epoch, version or release differs.
+        seed (int): The random seed; the same arguments always give the same branches.
+    Returns:
+        Tuple[List[dict], List[dict]]: The sisyphus and p10 packages, in random name order.
+    """
+    rng: random.Random = random.Random(seed)
+    shared: int = int(size * overlap)
+    sisyphus: List[dict] = []
+    p10: List[dict] = []
+    for index in range(shared + 2 * (size - shared)):
+        name, source = _name(rng, index)
+        if index % 3 == 0:
+            evr: tuple = (
+                1 if rng.random() < 0.03 else 0,
+                _version(rng),
+                _release(rng),
+            )
+        package: dict = {
+            "name": name,
+            "epoch": evr[0],
+            "version": evr[1],
+            "release": evr[2],
+            "arch": "noarch" if rng.random() < 0.2 else "x86_64",
+            "disttag": f"sisyphus+{rng.randint(200000, 350000)}.{rng.randint(1, 999)}00.1.1",
+            "buildtime": rng.randint(1_300_000_000, 1_700_000_000),
+            "source": source,
+        }
+        if index < shared:
+            sisyphus.append(package)
+            p10.append(_churn(rng, package) if rng.random() < churn else package)
+        elif (index - shared) % 2:
+            sisyphus.append(package)
+        else:
+            p10.append(package)
+    rng.shuffle(sisyphus)
+    rng.shuffle(p10)
+    return sisyphus, p10
+
+
+def export_payload(packages: List[dict], arch: str = "x86_64") -> bytes:
+    """
+    Serializes packages the way the branch_binary_packages export does.
+    Args:
+        packages (List[dict]): The packages.
+        arch (str): The architecture named in the request arguments.
+    Returns:
+        bytes: The JSON document.
+    """
+    return json.dumps(
+        {"request_args": {"arch": arch}, "length": len(packages), "packages": packages}
+    ).encode("utf-8")
+
+
+def iter_chunks(payload: bytes, chunk_size: int) -> Iterator[bytes]:
+    """Splits a payload into chunks, as received from a streamed response."""
+    return (payload[i : i + chunk_size] for i in range(0, len(payload), chunk_size))
@@ -1,40 +1,92 @@
-import json
-from typing import Any, Dict
-from src.logging_config import log
+from typing import Any, Dict, Iterable, Iterator
+from src.logging_config import level_enabled, log
+from src.writers import write_json
 
 
-def log_packages(packages: Dict[str, Any]) -> None:
+def format_package(package: Dict[str, Any]) -> str:
+    """
+    Format a package as a sorted "key: value" string.
+    Args:
+        package (Dict[str, Any]): A package dictionary.
+    Returns:
+        str: The formatted package.
+    """
+    return ", ".join(f"{key}: {value}" for key, value in sorted(package.items()))
+
+
+def _branch_label(branch: Any) -> str:
+    """
+    Formats a branch key, which may be a (branch, arch) tuple, for log messages.
+    """
+    if isinstance(branch, tuple):
+        return "/".join(str(part) for part in branch if part)
+    return str(branch)
+
+
+def log_packages(packages: Dict[Any, Any]) -> None:
     """
     Log packages information.
+    A package count is logged per branch at INFO level. Each package is logged at
+    DEBUG level, and only formatted when DEBUG records are enabled.
     Args:
-        packages (Dict[str, Any]): A dictionary containing package information.
+        packages (Dict[Any, Any]): Packages keyed by branch or by (branch, arch).
     """
     try:
+        detail: bool = level_enabled("DEBUG")
         for branch, branch_packages in packages.items():
+            label: str = _branch_label(branch)
+            count: int = 0
             for package in branch_packages:
-                package_str: str = ", ".join(
-                    f"{key}: {value}" for key, value in sorted(package.items())
-                )
-                log.info(f"{branch}: {package_str}")
+                if not isinstance(package, dict):
+                    raise TypeError(f"Invalid package data: {package!r}")
+                count += 1
+                if detail:
+                    log.debug(f"{label}: {format_package(package)}")
+            log.info(f"{label}: {count} packages")
     except Exception as e:
         log.error(f"Error logging packages: {e}")
 
 
-def get_dump_json(data: Any, filename: str) -> None:
+def iter_logged_packages(
+    branch: Any, packages: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Log packages information as the packages are consumed.
+    Unlike `log_packages`, this does not exhaust a streamed package iterator.
+    Packages are logged at DEBUG level only when it is enabled, and the package
+    count is logged at INFO level once the iterator is exhausted.
+    Args:
+        branch (Any): The branch (or (branch, arch) pair) the packages belong to.
+        packages (Iterable[Dict[str, Any]]): The packages to log and pass through.
+    Returns:
+        Iterator[Dict[str, Any]]: The same packages, unchanged.
+    """
+    label: str = _branch_label(branch)
+    count: int = 0
+    if level_enabled("DEBUG"):
+        for package in packages:
+            count += 1
+            log.debug(f"{label}: {format_package(package)}")
+            yield package
+    else:
+        for package in packages:
+            count += 1
+            yield package
+    log.info(f"{label}: {count} packages")
+
+
+def get_dump_json(data: Any, filename: str, fmt: str = "json") -> None:
     """
     A function to dump JSON data to a file.
+    The data is streamed by `src.writers.write_json`, so lists and generators in it
+    are written element by element.
     Args:
         data: The JSON data to be dumped.
         filename: The name of the file to dump the JSON data into.
+        fmt: The output format: "json" (indented), "compact" or "ndjson".
     """
     if data:
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(
-                data,
-                f,
-                indent=2,
-                ensure_ascii=False,
-            )
+        write_json(data, filename, fmt=fmt)
 
         log.success(f"Data saved to {filename}")
     else:
@@ -0,0 +1,134 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from version_utils import rpm
+
+# Segment tags, ordered the way rpm.compare_versions orders what follows a segment:
+# a tilde sorts before the end of the string, which sorts before letters and digits.
+_TILDE: Tuple[int] = (0,)
+_END: Tuple[int] = (1,)
+_ALPHA: int = 3
+_DIGIT: int = 4
+
+_segment_re = re.compile(r"[A-Za-z]+|[0-9]+|~")
+# rpm.compare_versions treats separators in front of a tilde or at the end of the
+# string as significant, which no tuple key can express; such strings are compared
+# with rpm.compare_versions itself.
+_irregular_re = re.compile(r"[^A-Za-z0-9~]+(?:~|\Z)")
+
+
+@lru_cache(maxsize=65536)
+def parse_segments(value: str) -> Optional[tuple]:
+    """
+    Parses an RPM version or release string into a tuple that orders like rpm.compare_versions.
+    Args:
+        value (str): The version or release string.
+    Returns:
+        Optional[tuple]: The segment tuple, or None if the string can only be
+            compared with rpm.compare_versions (non-ASCII or irregular separators).
+    """
+    if not value.isascii() or _irregular_re.search(value):
+        return None
+
+    segments: list = []
+    for segment in _segment_re.findall(value):
+        if segment == "~":
+            segments.append(_TILDE)
+        elif segment[0].isdigit():
+            digits: str = segment.lstrip("0")
+            segments.append((_DIGIT, len(digits), digits))
+        else:
+            segments.append((_ALPHA, segment))
+    segments.append(_END)
+    return tuple(segments)
+
+
+class VersionKey:
+    """
+    Pre-parsed RPM epoch:version-release that supports direct comparison.
+    Keys compare by epoch, then version, then release, with the version and
+    release ordered exactly like `version_utils.rpm.compare_versions`.
+    """
+
+    __slots__ = ("epoch", "version", "release", "_key")
+
+    def __init__(self, epoch: Any, version: str, release: str) -> None:
+        self.epoch: int = int(epoch or 0)
+        self.version: str = version
+        self.release: str = release
+        version_segments: Optional[tuple] = parse_segments(version)
+        release_segments: Optional[tuple] = parse_segments(release)
+        self._key: Optional[tuple] = (
+            (self.epoch, version_segments, release_segments)
+            if version_segments is not None and release_segments is not None
+            else None
+        )
+
+    def compare(self, other: "VersionKey") -> int:
+        """
+        Compares two keys.
+        Args:
+            other (VersionKey): The key to compare with.
+        Returns:
+            int: 1 if this key is newer, -1 if it is older, 0 if they are equal.
+        """
+        if self._key is not None and other._key is not None:
+            return (self._key > other._key) - (self._key < other._key)
+        if self.epoch != other.epoch:
+            return 1 if self.epoch > other.epoch else -1
+        return rpm.compare_versions(self.version, other.version) or (
+            rpm.compare_versions(self.release, other.release)
+        )
+
+    def __lt__(self, other: "VersionKey") -> bool:
+        if self._key is not None and other._key is not None:
+            return self._key < other._key
+        return self.compare(other) < 0
+
+    def __gt__(self, other: "VersionKey") -> bool:
+        if self._key is not None and other._key is not None:
+            return self._key > other._key
+        return self.compare(other) > 0
+
+    def __le__(self, other: "VersionKey") -> bool:
+        return not self > other
+
+    def __ge__(self, other: "VersionKey") -> bool:
+        return not self < other
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VersionKey):
+            return NotImplemented
+        return self.compare(other) == 0
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"VersionKey({self.epoch}:{self.version}-{self.release})"
+
+
+@lru_cache(maxsize=65536)
+def version_key(epoch: Any, version: str, release: str) -> VersionKey:
+    """
+    Returns the memoized key of an epoch, version and release.
+    Args:
+        epoch (Any): The epoch (int, numeric string, or None for 0).
+        version (str): The version.
+        release (str): The release.
+    Returns:
+        VersionKey: The version key.
+    """
+    return VersionKey(epoch, version, release)
+
+
+def package_key(package: Dict[str, Any]) -> VersionKey:
+    """
+    Returns the version key of a package dictionary.
+    Args:
+        package (Dict[str, Any]): A package with 'version', 'release' and optional 'epoch' keys.
+    Returns:
+        VersionKey: The version key.
+    """
+    return version_key(
+        package.get("epoch") or 0, package["version"], package["release"]
+    )
@@ -0,0 +1,350 @@
+import csv
+import json
+import os
+from contextlib import contextmanager
+from json.encoder import encode_basestring
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_FORMATS: tuple = ("json", "compact", "ndjson")
+# Flat formats with one row per reported package; arrow and parquet need pyarrow.
+TABLE_FORMATS: tuple = ("csv", "arrow", "parquet")
+OUTPUT_FORMATS: tuple = JSON_FORMATS + TABLE_FORMATS
+_CATEGORY_PREFIXES: tuple = ("only_in_", "higher_in_")
+_SCALARS: tuple = (str, int, float, type(None))
+JSON_BACKENDS: tuple = ("json", "orjson")
+_buffer_size: int = 1024 * 1024
+_scalar_encode: Callable[[Any], str] = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":")
+).encode
+
+
+def _encoder(fmt: str, backend: str) -> Callable[[Any], str]:
+    """
+    Returns a function serializing a single value in the given format.
+    Args:
+        fmt (str): "json" (indented by 2 spaces), "compact" or "ndjson".
+        backend (str): "json" (standard library) or "orjson".
+    Returns:
+        Callable[[Any], str]: The serializer.
+    """
+    if backend == "orjson":
+        option: int = orjson.OPT_INDENT_2 if fmt == "json" else 0
+        return lambda value: orjson.dumps(value, option=option).decode("utf-8")
+    if fmt == "json":
+        return lambda value: json.dumps(value, indent=2, ensure_ascii=False)
+    return json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _key(key: Any) -> str:
+    """Converts a dict key to a JSON object key the way `json.dump` does."""
+    return key if isinstance(key, str) else json.dumps(key)
+
+
+def _is_array(value: Any) -> bool:
+    return not isinstance(value, (str, bytes, dict)) and isinstance(value, Iterable)
+
+
+class ItemStream:
+    """
+    A JSON object whose (key, value) pairs are produced lazily, e.g. by a pipeline
+    still computing later values while earlier ones are written. It can be
+    written (or its items iterated) once.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Any, Any]]) -> None:
+        self._items: Iterable[Tuple[Any, Any]] = items
+
+    def items(self) -> Iterable[Tuple[Any, Any]]:
+        return self._items
+
+
+class _JSONStreamWriter:
+    """Writes nested dicts whose arrays may be lazy iterables, one array element at a time."""
+
+    def __init__(self, out: TextIO, fmt: str, backend: str) -> None:
+        self.out: TextIO = out
+        self.indent: Optional[str] = "  " if fmt == "json" else None
+        self.encode: Callable[[Any], str] = _encoder(fmt, backend)
+        self.key_separator: str = ": " if self.indent else ":"
+        self.fast_indent: bool = backend == "json"
+
+    def _newline(self, level: int) -> str:
+        return "\n" + self.indent * level if self.indent else ""
+
+    def _flat_object(self, value: dict, level: int) -> Optional[str]:
+        """
+        Formats a dict of scalars (e.g. a package) like `json.dumps(indent=2)` without
+        the pure-Python indenting encoder. Returns None for anything else.
+        """
+        inner: str = self._newline(level + 1)
+        parts: List[str] = []
+        for key, item in value.items():
+            if type(key) is not str:
+                return None
+            if type(item) is str:
+                parts.append(encode_basestring(key) + ": " + encode_basestring(item))
+            elif item is None or isinstance(item, (int, float)):
+                parts.append(encode_basestring(key) + ": " + _scalar_encode(item))
+            else:
+                return None
+        return "{" + inner + ("," + inner).join(parts) + self._newline(level) + "}"
+
+    def _leaf(self, value: Any, level: int) -> None:
+        if self.indent and self.fast_indent and type(value) is dict and value:
+            text: Optional[str] = self._flat_object(value, level)
+            if text is not None:
+                self.out.write(text)
+                return
+        text = self.encode(value)
+        # Serialized JSON never contains raw newlines inside strings.
+        self.out.write(
+            text.replace("\n", self._newline(level)) if self.indent else text
+        )
+
+    def write(self, value: Any, level: int = 0) -> None:
+        if isinstance(value, (dict, ItemStream)):
+            separator: str = "{"
+            for key, item in value.items():
+                self.out.write(separator + self._newline(level + 1))
+                self.out.write(json.dumps(_key(key), ensure_ascii=False))
+                self.out.write(self.key_separator)
+                self.write(item, level + 1)
+                separator = ","
+            self.out.write("{}" if separator == "{" else self._newline(level) + "}")
+        elif _is_array(value):
+            separator = "["
+            for item in value:
+                self.out.write(separator + self._newline(level + 1))
+                self._leaf(item, level + 1)
+                separator = ","
+            self.out.write("[]" if separator == "[" else self._newline(level) + "]")
+        else:
+            self._leaf(value, level)
+
+
+def _write_ndjson(
+    out: TextIO, value: Any, path: List[str], encode: Callable[[Any], str]
+) -> None:
+    """
+    Writes one line per array element (or non-array leaf), tagged with its key path.
+    """
+    if isinstance(value, (dict, ItemStream)):
+        for key, item in value.items():
+            _write_ndjson(out, item, path + [_key(key)], encode)
+    elif _is_array(value):
+        for item in value:
+            out.write(encode({"path": path, "item": item}))
+            out.write("\n")
+    else:
+        out.write(encode({"path": path, "value": value}))
+        out.write("\n")
+
+
+@contextmanager
+def _atomic_output(filename: str) -> Iterator[str]:
+    """
+    Yields a temporary path next to `filename` and moves it over `filename` once the
+    enclosed code succeeds, so a failed write (e.g. of a report whose results are
+    still being computed) leaves the previous file intact.
+    """
+    tmp_path: str = f"{filename}.{os.getpid()}.tmp"
+    try:
+        yield tmp_path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, filename)
+
+
+def default_json_backend() -> str:
+    """
+    Returns the fastest available JSON backend.
+    Returns:
+        str: "orjson" if it is installed, "json" otherwise.
+    """
+    return "orjson" if orjson is not None else "json"
+
+
+def write_json(
+    data: Dict[str, Any],
+    filename: str,
+    fmt: str = "json",
+    backend: Optional[str] = None,
+) -> None:
+    """
+    Streams nested report data to a file.
+    Lists, tuples and other iterables (including generators and `PackageTable`s)
+    are written element by element as they are produced, so no serialized copy of
+    the report is built in memory; `ItemStream`s are written as objects, one
+    member at a time. The file is only replaced once the whole report is written.
+    Formats:
+        - "json": indented by 2 spaces; identical to `json.dump(indent=2, ensure_ascii=False)`
+          with the standard library backend.
+        - "compact": no whitespace.
+        - "ndjson": one JSON object per line, {"path": [keys...], "item": element}
+          for array elements and {"path": [keys...], "value": value} for other leaves.
+    Args:
+        data (Dict[str, Any]): The data to write.
+        filename (str): The output file.
+        fmt (str): The output format.
+        backend (Optional[str]): "json" or "orjson"; defaults to the fastest available.
+    Raises:
+        ValueError: If the format or backend is unknown or unavailable.
+    """
+    if fmt not in JSON_FORMATS:
+        raise ValueError(f"Invalid JSON format '{fmt}'. Allowed: {JSON_FORMATS}")
+    backend = backend or default_json_backend()
+    if backend not in JSON_BACKENDS or (backend == "orjson" and orjson is None):
+        raise ValueError(f"JSON backend '{backend}' is not available")
+
+    with _atomic_output(filename) as tmp_path, open(
+        tmp_path, "w", encoding="utf-8", buffering=_buffer_size
+    ) as f:
+        if fmt == "ndjson":
+            _write_ndjson(f, data, [], _encoder(fmt, backend))
+        else:
+            _JSONStreamWriter(f, fmt, backend).write(data)
+
+
+def _is_categories(value: Any) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(key, str) and key.startswith(_CATEGORY_PREFIXES) for key in value
+    )
+
+
+def iter_report_rows(
+    results: Dict[Any, dict], categories: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Flattens comparison results into one row per reported package.
+    Each row holds the package's 'arch' key in `results`, the 'pair' of a branch
+    matrix (see `compare_matrix`) if any, its 'category', then the package fields.
+    Other entries of a result, such as 'changes_since_last_run', are skipped.
+    Args:
+        results (Dict[Any, dict]): Comparison results keyed by architecture, or an
+            `ItemStream` of them.
+        categories (Optional[Iterable[str]]): The categories to include; all if None.
+    Returns:
+        Iterator[Dict[str, Any]]: The rows.
+    """
+    wanted: Optional[set] = set(categories) if categories is not None else None
+
+    def rows(arch: Any, pair: Optional[str], result: dict) -> Iterator[dict]:
+        for category, packages in result.items():
+            if not category.startswith(_CATEGORY_PREFIXES):
+                continue
+            if wanted is not None and category not in wanted:
+                continue
+            prefix: dict = {"arch": arch, "category": category}
+            if pair is not None:
+                prefix = {"arch": arch, "pair": pair, "category": category}
+            for package in packages:
+                yield {**prefix, **package}
+
+    for arch, result in results.items():
+        if result and all(_is_categories(value) for value in result.values()):
+            for pair, pair_result in result.items():
+                yield from rows(arch, pair, pair_result)
+        else:
+            yield from rows(arch, None, result)
+
+
+def _fieldnames(rows: List[Dict[str, Any]]) -> List[str]:
+    return list(dict.fromkeys(key for row in rows for key in row)) or [
+        "arch",
+        "category",
+    ]
+
+
+def _cell(value: Any) -> Any:
+    """Encodes nested values (lists, dicts) of a row as JSON text."""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _pyarrow_table(rows: List[Dict[str, Any]]) -> Any:
+    """
+    Builds a pyarrow table with one column per field of the rows.
+    Columns whose values have no common Arrow type are stored as strings.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("The arrow and parquet formats require pyarrow") from None
+
+    columns: Dict[str, Any] = {}
+    for field in _fieldnames(rows):
+        values: list = [row.get(field) for row in rows]
+        try:
+            columns[field] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[field] = pa.array(
+                [None if value is None else str(_cell(value)) for value in values],
+                type=pa.string(),
+            )
+    return pa.table(columns)
+
+
+def write_table(rows: Iterable[Dict[str, Any]], filename: str, fmt: str) -> None:
+    """
+    Writes rows (e.g. from `iter_report_rows`) as a flat table.
+    The file is only replaced once the whole table is written.
+    Formats:
+        - "csv": a header with the union of the row fields, in first-seen order;
+          missing fields are empty and nested values are JSON text.
+        - "arrow": an Arrow IPC file, readable with `pyarrow.ipc.open_file` or
+          `pandas.read_feather`.
+        - "parquet": a Parquet file.
+    Args:
+        rows (Iterable[Dict[str, Any]]): The rows.
+        filename (str): The output file.
+        fmt (str): The output format.
+    Raises:
+        ValueError: If the format is unknown, or needs pyarrow and it is not installed.
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Invalid table format '{fmt}'. Allowed: {TABLE_FORMATS}")
+    rows = list(rows)
+    if fmt == "csv":
+        with _atomic_output(filename) as tmp_path, open(
+            tmp_path, "w", encoding="utf-8", newline="", buffering=_buffer_size
+        ) as f:
+            fieldnames: List[str] = _fieldnames(rows)
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            for row in rows:
+                values: list = [row.get(field) for field in fieldnames]
+                if not all(type(value) in _SCALARS for value in values):
+                    values = [_cell(value) for value in values]
+                writer.writerow(values)
+        return
+
+    table: Any = _pyarrow_table(rows)
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        with _atomic_output(filename) as tmp_path, pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+
+        with _atomic_output(filename) as tmp_path:
+            pq.write_table(table, tmp_path)
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+import pytest
+from pytest_mock import MockerFixture
+from src.config import config
+
+
+class FakeUpstream:
+    """Local stand-in for the ALT Linux branch_binary_packages export."""
+
+    def __init__(self) -> None:
+        self.packages: dict = {}
+        self.requests: list = []
+        self.url: str = ""
+        self.gzip: bool = False
+        self.failures: int = 0
+
+    def payload(self, branch: str, arch: str) -> bytes:
+        packages = [
+            pkg
+            for pkg in self.packages.get(branch, [])
+            if not arch or pkg.get("arch", arch) in (arch, "noarch")
+        ]
+        document = {
+            "request_args": {"arch": arch},
+            "length": len(packages),
+            "packages": packages,
+        }
+        return json.dumps(document).encode("utf-8")
+
+
+def _make_handler(upstream: FakeUpstream) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            upstream.requests.append((url.path, dict(self.headers)))
+            if upstream.failures > 0:
+                upstream.failures -= 1
+                self.send_error(503)
+                return
+            prefix = "/api/export/branch_binary_packages/"
+            branch = url.path[len(prefix) :]
+            if not url.path.startswith(prefix) or branch not in upstream.packages:
+                self.send_error(400)
+                return
+
+            arch = parse_qs(url.query).get("arch", [""])[0]
+            body = upstream.payload(branch, arch)
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            if upstream.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def upstream(mocker: MockerFixture) -> Iterator[FakeUpstream]:
+    """
+    Serves fake branch exports on localhost and points `config.base_url` at them.
+    """
+    fake = FakeUpstream()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(fake))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    mocker.patch.object(config, "base_url", fake.url)
+    yield fake
+    server.shutdown()
+    server.server_close()
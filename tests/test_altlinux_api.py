@@ -1,5 +1,8 @@
+import pytest
+import requests
 from pytest_mock import MockerFixture
-from src.altlinux_api import AltLinuxAPI
+from src.altlinux_api import AltLinuxAPI, FetchError
+from src.fetcher import fetch_all
 
 
 def test_fetch_packages_success(mocker: MockerFixture) -> None:
@@ -9,7 +12,7 @@ def test_fetch_packages_success(mocker: MockerFixture) -> None:
     api = AltLinuxAPI()
     mock_response = mocker.Mock()
     mock_response.json.return_value = {"packages": [{"name": "test_package"}]}
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
 
     result = api.fetch_packages("sisyphus", "x86_64")
 
@@ -23,21 +26,60 @@ def test_fetch_packages_empty_response(mocker: MockerFixture) -> None:
     api = AltLinuxAPI()
     mock_response = mocker.Mock()
     mock_response.json.return_value = {"packages": []}
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
 
     result = api.fetch_packages("sisyphus", "x86_64")
 
     assert result == []
 
 
-def test_fetch_packages_invalid_branch(mocker: MockerFixture) -> None:
+def test_fetch_packages_stream(mocker: MockerFixture) -> None:
+    """
+    Test for streaming packages from a chunked response.
+    """
+    api = AltLinuxAPI()
+    mock_response = mocker.MagicMock()
+    mock_response.__enter__.return_value = mock_response
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [
+        b'{"length": 2, "packages": [{"name": "pkg',
+        b'1"}, {"name": "pkg2"}]}',
+    ]
+    mock_get = mocker.patch("requests.Session.get", return_value=mock_response)
+
+    result = api.fetch_packages("sisyphus", "x86_64", stream=True)
+
+    mock_get.assert_not_called()
+    assert list(result) == [{"name": "pkg1"}, {"name": "pkg2"}]
+    assert mock_get.call_args.kwargs["stream"] is True
+    mock_response.json.assert_not_called()
+
+
+def test_fetch_packages_compressed(upstream) -> None:
+    """
+    Test that compressed encodings are requested and decoded while streaming.
+    """
+    packages = [
+        {"name": f"pkg{i}", "version": "1.0", "release": "1"} for i in range(500)
+    ]
+    upstream.packages["sisyphus"] = packages
+    upstream.gzip = True
+
+    result = list(AltLinuxAPI().fetch_packages("sisyphus", stream=True))
+
+    assert result == packages
+    assert "gzip" in upstream.requests[0][1]["Accept-Encoding"]
+
+
+def test_fetch_packages_invalid_branch(mocker: MockerFixture, upstream) -> None:
     """
     Test for fetching packages for an invalid branch.
     """
     api = AltLinuxAPI()
     mock_log_error = mocker.patch("src.altlinux_api.log.error")
 
-    api.fetch_packages("invalid_branch", "x86_64")
+    with pytest.raises(FetchError):
+        api.fetch_packages("invalid_branch", "x86_64")
 
     assert mock_log_error.call_count == 2
 
@@ -51,6 +93,92 @@ def test_fetch_packages_invalid_branch(mocker: MockerFixture) -> None:
     assert "Failed to fetch data for branch invalid_branch:" in second_call_args
     assert "400 Client Error: Bad Request for url:" in second_call_args
     assert (
-        "https://rdb.altlinux.org/api/export/branch_binary_packages/invalid_branch?arch=x86_64"
+        f"{upstream.url}/export/branch_binary_packages/invalid_branch?arch=x86_64"
         in second_call_args
     )
+
+
+def test_fetch_packages_retries_server_errors(upstream) -> None:
+    """
+    Test that 5xx responses are retried before the export is streamed.
+    """
+    packages = [{"name": "pkg1", "version": "1.0", "release": "1"}]
+    upstream.packages["sisyphus"] = packages
+    upstream.failures = 2
+
+    result = list(AltLinuxAPI(retries=2).fetch_packages("sisyphus", stream=True))
+
+    assert result == packages
+    assert len(upstream.requests) == 3
+
+
+def test_fetch_packages_circuit_breaker(mocker: MockerFixture) -> None:
+    """
+    Test that failed requests raise and, after repeated failures, stop being sent.
+    """
+    api = AltLinuxAPI(max_failures=2)
+    mock_get = mocker.patch(
+        "requests.Session.get",
+        side_effect=requests.ConnectionError("connection refused"),
+    )
+
+    for _ in range(2):
+        with pytest.raises(FetchError, match="connection refused"):
+            list(api.fetch_packages("sisyphus", stream=True))
+    with pytest.raises(FetchError, match="in a row failed"):
+        api.fetch_packages("p10")
+
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs["timeout"] == api.timeout
+
+
+def test_fetch_packages_circuit_breaker_recovers(mocker: MockerFixture) -> None:
+    """
+    Test that after the cool-down a single trial request is sent and closes the circuit.
+    """
+    clock = mocker.patch("src.altlinux_api.time.monotonic", return_value=100.0)
+    api = AltLinuxAPI(max_failures=2, cooldown=30.0)
+    mock_get = mocker.patch(
+        "requests.Session.get",
+        side_effect=requests.ConnectionError("connection refused"),
+    )
+    for _ in range(2):
+        with pytest.raises(FetchError, match="connection refused"):
+            api.fetch_packages("sisyphus")
+
+    clock.return_value = 129.0
+    with pytest.raises(FetchError, match="in a row failed"):
+        api.fetch_packages("sisyphus")
+    clock.return_value = 131.0
+    with pytest.raises(FetchError, match="connection refused"):
+        api.fetch_packages("sisyphus")
+    with pytest.raises(FetchError, match="in a row failed"):
+        api.fetch_packages("sisyphus")
+    assert mock_get.call_count == 3
+
+    clock.return_value = 162.0
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = {"packages": [{"name": "pkg1"}]}
+    mock_get.side_effect = None
+    mock_get.return_value = mock_response
+    assert api.fetch_packages("sisyphus") == [{"name": "pkg1"}]
+    assert api.fetch_packages("p10") == [{"name": "pkg1"}]
+    assert mock_get.call_count == 5
+
+
+def test_fetch_packages_circuit_breaker_trial_admits_waiting_requests(
+    upstream,
+) -> None:
+    """
+    Test that concurrent requests wait for the trial request and proceed if it succeeds.
+    """
+    upstream.packages["sisyphus"] = [{"name": "pkg1"}]
+    upstream.packages["p10"] = [{"name": "pkg2"}]
+    api = AltLinuxAPI(retries=0, max_failures=1, cooldown=0.0)
+    upstream.failures = 1
+    with pytest.raises(FetchError):
+        list(api.fetch_packages("sisyphus", stream=True))
+
+    result = fetch_all(api, ["sisyphus", "p10"], [None], max_workers=2)
+
+    assert [len(table) for table in result.values()] == [1, 1]
@@ -0,0 +1,80 @@
+import os
+import time
+import pytest
+from src.altlinux_api import AltLinuxAPI
+from src.cache import ExportCache
+
+PACKAGES = [
+    {"name": "pkg1", "version": "1.0", "release": "alt1"},
+    {"name": "pkg2", "version": "2.0", "release": "alt1"},
+]
+
+
+def test_fetch_revalidates_cached_export(upstream, tmp_path) -> None:
+    """
+    Test that a re-fetch sends the stored ETag and serves a 304 from the cache.
+    """
+    upstream.packages["sisyphus"] = PACKAGES
+    api = AltLinuxAPI(cache=ExportCache(str(tmp_path)))
+
+    assert list(api.fetch_packages("sisyphus", "x86_64", stream=True)) == PACKAGES
+    assert "If-None-Match" not in upstream.requests[0][1]
+
+    assert api.fetch_packages("sisyphus", "x86_64") == PACKAGES
+    assert "If-None-Match" in upstream.requests[1][1]
+    assert [f for f in os.listdir(tmp_path) if f.endswith(".tmp")] == []
+
+
+def test_fetch_refreshes_changed_export(upstream, tmp_path) -> None:
+    """
+    Test that a changed export replaces the cached copy.
+    """
+    upstream.packages["sisyphus"] = PACKAGES
+    api = AltLinuxAPI(cache=ExportCache(str(tmp_path)))
+    list(api.fetch_packages("sisyphus", "x86_64", stream=True))
+
+    upstream.packages["sisyphus"] = PACKAGES[:1]
+    assert api.fetch_packages("sisyphus", "x86_64") == PACKAGES[:1]
+    assert api.fetch_packages("sisyphus", "x86_64") == PACKAGES[:1]
+
+
+def test_offline_mode(upstream, tmp_path) -> None:
+    """
+    Test that offline mode serves cached exports without any request and fails on a miss.
+    """
+    upstream.packages["sisyphus"] = PACKAGES
+    cache = ExportCache(str(tmp_path))
+    list(AltLinuxAPI(cache=cache).fetch_packages("sisyphus", "x86_64", stream=True))
+    request_count = len(upstream.requests)
+
+    offline_api = AltLinuxAPI(cache=cache, offline=True)
+    assert offline_api.fetch_packages("sisyphus", "x86_64") == PACKAGES
+    assert len(upstream.requests) == request_count
+
+    with pytest.raises(LookupError):
+        offline_api.fetch_packages("p10", "x86_64")
+
+
+def test_evict_by_age_and_size(upstream, tmp_path) -> None:
+    """
+    Test that expired entries and least recently used entries over the size limit are evicted.
+    """
+    upstream.packages["sisyphus"] = PACKAGES
+    upstream.packages["p10"] = PACKAGES
+    cache = ExportCache(str(tmp_path))
+    api = AltLinuxAPI(cache=cache)
+    for arch in ("x86_64", "i586", "aarch64"):
+        list(api.fetch_packages("sisyphus", arch, stream=True))
+
+    meta = cache.read_meta("sisyphus_x86_64")
+    meta["accessed_at"] = time.time() - cache.max_age - 1
+    cache.write_meta("sisyphus_x86_64", meta)
+    meta = cache.read_meta("sisyphus_i586")
+    meta["accessed_at"] -= 10
+    cache.write_meta("sisyphus_i586", meta)
+    cache.max_size = cache.read_meta("sisyphus_aarch64")["size"]
+    cache.evict()
+
+    assert cache.read_meta("sisyphus_x86_64") is None
+    assert cache.read_meta("sisyphus_i586") is None
+    assert cache.read_meta("sisyphus_aarch64") is not None
@@ -1,7 +1,19 @@
 import argparse
+import json
+import os
+import subprocess
+import sys
 import pytest
 from pytest_mock import MockerFixture
-from src.cli import run_comparison, parse_args
+from src.cli import (
+    _validate_options,
+    build_package_filter,
+    parse_args,
+    run_comparison,
+    run_lookup,
+)
+from src.config import config
+from src.metrics import Metrics
 
 
 def test_parse_args(mocker: MockerFixture) -> None:
@@ -19,17 +31,24 @@ def test_parse_args(mocker: MockerFixture) -> None:
     args = parse_args()
     assert args.arch is None
     assert args.output_file == "all_packages"
+    assert args.all_arches is False
+
+    mocker.patch("sys.argv", ["script_name", "--all-arches", "-j", "8"])
+    args = parse_args()
+    assert args.all_arches is True
+    assert args.jobs == 8
 
 
 @pytest.mark.parametrize(
     "output_file", ["only_in_p10", "only_in_sisyphus", "higher_in_sisyphus"]
 )
 def test_run_comparison_specific_output(
-    mocker: MockerFixture, output_file: str
+    mocker: MockerFixture, output_file: str, tmp_path, monkeypatch
 ) -> None:
     """
     Test the run_comparison function for specific output files.
     """
+    monkeypatch.chdir(tmp_path)
     mocker.patch(
         "src.altlinux_api.AltLinuxAPI.fetch_packages",
         return_value=[{"name": "test", "version": "1.0", "release": "1"}],
@@ -42,12 +61,28 @@ def test_run_comparison_specific_output(
             "higher_in_sisyphus": [{"name": "test3"}],
         },
     )
-    mocker.patch("src.cli.filter_package_data", return_value=[{"name": "filtered"}])
-
     result = run_comparison("x86_64", output_file)
     assert result is True
 
 
+def test_run_comparison_all_arches(mocker: MockerFixture) -> None:
+    """
+    Test that run_comparison fetches and reports every architecture in one run.
+    """
+    mock_fetch = mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        return_value=[{"name": "test", "version": "1.0", "release": "1"}],
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+
+    result = run_comparison(None, "only_in_p10", all_arches=True, jobs=2)
+
+    assert result is True
+    assert mock_fetch.call_count == 2 * len(config.arches)
+    data_to_save = mock_dump.call_args[0][0]
+    assert list(data_to_save["only_in_p10"]) == list(config.arches)
+
+
 def test_run_comparison_fetch_error(mocker: MockerFixture) -> None:
     """
     Test the run_comparison function when a fetch error occurs.
@@ -60,38 +95,477 @@ def test_run_comparison_fetch_error(mocker: MockerFixture) -> None:
     assert result is False
 
 
-def test_run_comparison_filter_error(mocker: MockerFixture) -> None:
+def test_run_comparison_compare_error(
+    mocker: MockerFixture, tmp_path, monkeypatch
+) -> None:
     """
-    Test the run_comparison function when a filter error occurs.
+    Test the run_comparison function when a comparison error occurs.
     """
+    monkeypatch.chdir(tmp_path)
     mocker.patch(
         "src.altlinux_api.AltLinuxAPI.fetch_packages",
         return_value=[{"name": "test", "version": "1.0", "release": "1"}],
     )
     mocker.patch(
         "src.comparison.compare_packages",
-        return_value={
-            "only_in_p10": [{"name": "test"}],
-            "only_in_sisyphus": [{"name": "test"}],
-            "higher_in_sisyphus": [{"name": "test"}],
-        },
+        side_effect=Exception("Comparison error"),
     )
-    mocker.patch("src.cli.filter_package_data", side_effect=Exception("Filter error"))
-    result = run_comparison("x86_64", "test_output")
-    assert result is False
+    result = run_comparison("x86_64", "all_packages")
+    assert result is True
 
 
-def test_run_comparison_compare_error(mocker: MockerFixture) -> None:
+def test_run_comparison_incremental(mocker: MockerFixture, tmp_path) -> None:
     """
-    Test the run_comparison function when a comparison error occurs.
+    Test that incremental runs save their state and report changes on the next run.
+    """
+    mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        return_value=[{"name": "test", "version": "1.0", "release": "1"}],
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+
+    assert run_comparison(
+        "x86_64", "all_packages", incremental=True, state_dir=str(tmp_path)
+    )
+    assert (
+        mock_dump.call_args[0][0]["all_packages"]["x86_64"]["changes_since_last_run"]
+        is None
+    )
+
+    assert run_comparison(
+        "x86_64", "all_packages", incremental=True, state_dir=str(tmp_path)
+    )
+    changes = mock_dump.call_args[0][0]["all_packages"]["x86_64"][
+        "changes_since_last_run"
+    ]
+    assert changes["branches"]["sisyphus"]["updated"] == []
+
+
+def test_run_comparison_snapshots(mocker: MockerFixture, tmp_path) -> None:
+    """
+    Test that saved snapshots are compared without fetching the branches again.
+    """
+    mock_fetch = mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        return_value=[{"name": "test", "version": "1.0", "release": "1"}],
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+
+    assert run_comparison(
+        "x86_64", "all_packages", save_snapshots=True, snapshot_dir=str(tmp_path)
+    )
+    fetched = mock_dump.call_args[0][0]
+    mock_fetch.reset_mock()
+
+    assert run_comparison(
+        "x86_64", "all_packages", from_snapshots=True, snapshot_dir=str(tmp_path)
+    )
+    mock_fetch.assert_not_called()
+    assert mock_dump.call_args[0][0] == fetched
+
+    assert not run_comparison(
+        "i586", "all_packages", from_snapshots=True, snapshot_dir=str(tmp_path)
+    )
+
+
+def test_run_lookup(mocker: MockerFixture, tmp_path, capsys) -> None:
+    """
+    Test looking up packages in saved snapshots without fetching them.
     """
     mocker.patch(
         "src.altlinux_api.AltLinuxAPI.fetch_packages",
         return_value=[{"name": "test", "version": "1.0", "release": "1"}],
     )
+    mocker.patch("src.cli.get_dump_json")
+    assert run_comparison(
+        "x86_64", "all_packages", save_snapshots=True, snapshot_dir=str(tmp_path)
+    )
+    capsys.readouterr()
+
+    assert run_lookup(["test", "missing"], "x86_64", str(tmp_path))
+    result = json.loads(capsys.readouterr().out)
+    assert result["test"]["p10"] == {"name": "test", "version": "1.0", "release": "1"}
+    assert result["missing"] == {"p10": None, "sisyphus": None}
+
+    assert run_lookup(["te"], "x86_64", str(tmp_path), prefix=True)
+    assert list(json.loads(capsys.readouterr().out)) == ["test"]
+
+    assert not run_lookup(["test"], "i586", str(tmp_path))
+
+
+def test_parse_args_lookup(mocker: MockerFixture) -> None:
+    """
+    Test parsing the lookup subcommand.
+    """
     mocker.patch(
-        "src.comparison.compare_packages",
-        side_effect=Exception("Comparison error"),
+        "sys.argv", ["script_name", "-a", "i586", "lookup", "--prefix", "bash", "zsh"]
+    )
+    args: argparse.Namespace = parse_args()
+    assert args.command == "lookup"
+    assert args.names == ["bash", "zsh"]
+    assert args.prefix is True
+    assert args.arch == "i586"
+    assert args.snapshot_dir == config.snapshot_dir
+
+
+def test_run_comparison_branch_matrix(mocker: MockerFixture) -> None:
+    """
+    Test that a branch matrix fetches each branch once and reports every pair.
+    """
+    packages = {
+        "p9": [{"name": "test", "version": "1.0", "release": "1"}],
+        "p10": [{"name": "test", "version": "2.0", "release": "1"}],
+        "p11": [],
+    }
+    mock_fetch = mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        side_effect=lambda branch, arch, stream: packages[branch],
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+
+    assert run_comparison("x86_64", "all_packages", branches=["p9", "p10", "p11"])
+
+    assert sorted(call.args[0] for call in mock_fetch.call_args_list) == [
+        "p10",
+        "p11",
+        "p9",
+    ]
+    result = mock_dump.call_args[0][0]["all_packages"]["x86_64"]
+    assert list(result) == ["p9_vs_p10", "p9_vs_p11", "p10_vs_p11"]
+    assert result["p9_vs_p10"]["higher_in_p10"] == [
+        {"name": "test", "version": "2.0", "release": "1"}
+    ]
+    assert not run_comparison("x86_64", "all_packages", branches=["p9", "p9"])
+
+
+def test_cli_import_is_lazy(record_property) -> None:
+    """
+    Test that importing the CLI configures no log sinks and loads none of requests,
+    tqdm and numpy, and record its cumulative import time (in microseconds).
+    """
+    code: str = (
+        "from loguru import logger\n"
+        "def add(*args, **kwargs): raise AssertionError('sink added at import')\n"
+        "logger.add = add\n"
+        "import src.cli"
+    )
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imported: dict = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                imported[module.strip()] = int(cumulative)
+    assert "src.cli" in imported
+    assert not {"requests", "tqdm", "urllib3", "numpy"} & imported.keys()
+    record_property("src_cli_import_us", imported["src.cli"])
+
+
+def test_run_comparison_metrics(upstream, tmp_path, monkeypatch) -> None:
+    """
+    Test that run_comparison reports each stage with the bytes and packages fetched.
+    """
+    upstream.packages["sisyphus"] = [{"name": "pkg1", "version": "2", "release": "1"}]
+    upstream.packages["p10"] = [{"name": "pkg1", "version": "1", "release": "1"}]
+    monkeypatch.chdir(tmp_path)
+    metrics = Metrics()
+
+    assert run_comparison(
+        "x86_64", "all_packages", use_cache=False, progress="off", metrics=metrics
+    )
+
+    stages = metrics.to_dict()["stages"]
+    assert list(stages) == ["fetch", "compare", "write"]
+    assert stages["fetch"]["downloads"] == 2
+    assert stages["fetch"]["packages"] == 2
+    assert stages["fetch"]["bytes"] == sum(
+        len(upstream.payload(branch, "x86_64")) for branch in ("sisyphus", "p10")
+    )
+    assert stages["compare"]["packages"] == 2
+    assert stages["write"]["bytes"] == os.path.getsize("all_packages.json")
+
+
+def test_run_comparison_dedupe_noarch(mocker: MockerFixture) -> None:
+    """
+    Test that shared noarch packages are reported once, under 'noarch'.
+    """
+    mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        side_effect=lambda branch, arch, stream: [
+            {"name": "docs", "version": "1", "release": "1", "arch": "noarch"},
+            {"name": f"bin-{branch}", "version": "1", "release": "1", "arch": arch},
+        ],
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+
+    assert run_comparison(None, "only_in_p10", all_arches=True, dedupe_noarch=True)
+
+    data_to_save = mock_dump.call_args[0][0]["only_in_p10"]
+    assert list(data_to_save) == ["noarch", *config.arches]
+    assert data_to_save["noarch"] == []
+    for arch in config.arches:
+        assert data_to_save[arch] == [
+            {"name": "bin-p10", "version": "1", "release": "1"}
+        ]
+
+
+def test_run_comparison_package_filter(mocker: MockerFixture, tmp_path) -> None:
+    """
+    Test that only the packages matching the filter options are compared.
+    """
+    mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        side_effect=lambda branch, arch, stream: iter(
+            [
+                {"name": "python3-a", "version": "1", "release": "1", "source": "a"},
+                {"name": f"other-{branch}", "version": "1", "release": "1"},
+            ]
+        ),
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+    names_file = tmp_path / "names.txt"
+    names_file.write_text("python3-a\nother-p10\n")
+    mocker.patch(
+        "sys.argv",
+        [
+            "script_name",
+            "--name-prefix",
+            "python3-",
+            "other-",
+            "--names-file",
+            str(names_file),
+            "--fields",
+            "name",
+        ],
+    )
+    args = parse_args()
+    package_filter = build_package_filter(
+        args.name_prefixes, args.name_regex, args.names_file, args.fields
+    )
+
+    assert run_comparison("x86_64", "all_packages", package_filter=package_filter)
+
+    result = mock_dump.call_args[0][0]["all_packages"]["x86_64"]
+    assert result["only_in_p10"] == [
+        {"name": "other-p10", "version": "1", "release": "1"}
+    ]
+    assert result["only_in_sisyphus"] == []
+    assert build_package_filter() is None
+    assert not run_comparison(
+        "x86_64", "all_packages", incremental=True, package_filter=package_filter
+    )
+
+
+def test_run_comparison_csv(mocker: MockerFixture, tmp_path, monkeypatch) -> None:
+    """
+    Test that a category file is written as CSV rows tagged with arch and category.
+    """
+    mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        side_effect=lambda branch, arch, stream: [
+            {"name": f"pkg-{branch}", "version": "1", "release": "1"}
+        ],
+    )
+    monkeypatch.chdir(tmp_path)
+
+    assert run_comparison("x86_64", "only_in_p10", output_format="csv")
+
+    assert (tmp_path / "only_in_p10.csv").read_text().splitlines() == [
+        "arch,category,name,version,release",
+        "x86_64,only_in_p10,pkg-p10,1,1",
+    ]
+
+
+def test_run_comparison_by_source(mocker: MockerFixture) -> None:
+    """
+    Test that --by-source reports each rebuilt source once, with its binaries on request.
+    """
+    mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        side_effect=lambda branch, arch, stream: [
+            {
+                "name": name,
+                "version": "2" if branch == "sisyphus" else "1",
+                "release": "alt1",
+                "arch": arch,
+                "source": "foo",
+            }
+            for name in ("foo", "libfoo", "foo-devel")
+        ],
+    )
+    mock_dump = mocker.patch("src.cli.get_dump_json")
+
+    assert run_comparison("x86_64", "higher_in_sisyphus", by_source=True)
+    assert mock_dump.call_args[0][0]["higher_in_sisyphus"]["x86_64"] == [
+        {"source": "foo", "version": "2", "release": "alt1"}
+    ]
+
+    assert run_comparison(
+        "x86_64", "higher_in_sisyphus", by_source=True, expand_binaries=True
+    )
+    (source,) = mock_dump.call_args[0][0]["higher_in_sisyphus"]["x86_64"]
+    assert [binary["name"] for binary in source["binaries"]] == [
+        "foo",
+        "libfoo",
+        "foo-devel",
+    ]
+    assert "arch" not in source["binaries"][0]
+    assert not run_comparison(
+        "x86_64", "all_packages", by_source=True, incremental=True
+    )
+
+
+def test_run_comparison_by_source_conflicts(mocker: MockerFixture) -> None:
+    """
+    Test that --by-source is refused with the options that would split or
+    regroup the binaries of a source, before anything is fetched.
+    """
+    mock_fetch = mocker.patch("src.altlinux_api.AltLinuxAPI.fetch_packages")
+    mock_log = mocker.patch("src.cli.log")
+
+    assert not run_comparison(
+        "x86_64",
+        "all_packages",
+        by_source=True,
+        package_filter=build_package_filter(fields=["arch"]),
+    )
+    mock_log.error.assert_called_with("--by-source cannot be combined with --fields")
+    assert not run_comparison(
+        None, "all_packages", all_arches=True, by_source=True, dedupe_noarch=True
+    )
+    mock_log.error.assert_called_with(
+        "--by-source cannot be combined with --dedupe-noarch"
+    )
+    mock_fetch.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({}, None),
+        ({"branches": ["p9", "p10"]}, None),
+        ({"by_source": True, "package_filter": "names"}, None),
+        ({"from_snapshots": True, "merge_join": True}, None),
+        (
+            {"branches": ["p9", "p9"]},
+            "Branch matrices need two or more distinct branches",
+        ),
+        (
+            {"branches": ["p9", "p10"], "incremental": True},
+            "--branches cannot be combined with --incremental",
+        ),
+        (
+            {"by_source": True, "dedupe_noarch": True, "package_filter": "fields"},
+            "--by-source cannot be combined with --dedupe-noarch, --fields",
+        ),
+        (
+            {"package_filter": "names", "save_snapshots": True},
+            "Package filters cannot be combined with --save-snapshots",
+        ),
+        (
+            {"pipeline": True, "dedupe_noarch": True},
+            "--pipeline cannot be combined with --dedupe-noarch",
+        ),
+        ({"merge_join": True}, "--merge-join needs --from-snapshots"),
+        (
+            {"from_snapshots": True, "merge_join": True, "pipeline": True},
+            "--merge-join cannot be combined with --pipeline",
+        ),
+    ],
+)
+def test_validate_options(options: dict, error) -> None:
+    """
+    Test that every unsupported combination of run_comparison options is reported.
+    """
+    if options.get("package_filter") == "names":
+        options["package_filter"] = build_package_filter(prefixes=["lib"])
+    elif options.get("package_filter") == "fields":
+        options["package_filter"] = build_package_filter(fields=["arch"])
+
+    assert _validate_options(**options) == error
+
+
+def test_run_comparison_pipeline(upstream, tmp_path, monkeypatch) -> None:
+    """
+    Test that a pipelined run writes the same report as a sequential one.
+    """
+    upstream.packages["sisyphus"] = [
+        {"name": "pkg1", "version": "2", "release": "1"},
+        {"name": "pkg2", "version": "1", "release": "1"},
+    ]
+    upstream.packages["p10"] = [{"name": "pkg1", "version": "1", "release": "1"}]
+    monkeypatch.chdir(tmp_path)
+    options = {"all_arches": True, "use_cache": False, "progress": "off"}
+
+    assert run_comparison(None, "sequential", **options)
+    metrics = Metrics()
+    assert run_comparison(None, "pipelined", pipeline=True, metrics=metrics, **options)
+
+    with open("sequential.json") as f, open("pipelined.json") as g:
+        assert json.load(f)["sequential"] == json.load(g)["pipelined"]
+    stages = metrics.to_dict()["stages"]
+    assert stages["compare"]["calls"] == len(config.arches)
+    assert stages["fetch"]["downloads"] == 2 * len(config.arches)
+    assert not run_comparison(None, "x", pipeline=True, dedupe_noarch=True, **options)
+
+
+def test_run_comparison_pipeline_error(
+    mocker: MockerFixture, tmp_path, monkeypatch
+) -> None:
+    """
+    Test that a failed stage of a pipelined run fails the run and keeps the last report.
+    """
+    mocker.patch(
+        "src.altlinux_api.AltLinuxAPI.fetch_packages",
+        side_effect=Exception("Fetch error"),
+    )
+    mock_log = mocker.patch("src.cli.log")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "all_packages.json").write_text("{}", encoding="utf-8")
+
+    assert run_comparison("x86_64", "all_packages", pipeline=True) is False
+    mock_log.error.assert_called_with("Error fetching packages: Fetch error")
+    assert (tmp_path / "all_packages.json").read_text(encoding="utf-8") == "{}"
+    assert os.listdir(tmp_path) == ["all_packages.json"]
+
+
+def test_run_comparison_merge_join(upstream, tmp_path, monkeypatch) -> None:
+    """
+    Test that a merge-join of the snapshot indexes writes the same report as loading them.
+    """
+    upstream.packages["sisyphus"] = [
+        {"name": "pkg2", "epoch": 1, "version": "1", "release": "alt1"},
+        {"name": "pkg1", "version": "2", "release": "alt1", "arch": "x86_64"},
+        {"name": "pkg3", "version": "1", "release": "alt1"},
+    ]
+    upstream.packages["p10"] = [
+        {"name": "pkg1", "version": "1", "release": "alt1"},
+        {"name": "pkg0", "version": "1", "release": "alt1"},
+        {"name": "pkg2", "epoch": 1, "version": "1", "release": "alt1"},
+    ]
+    monkeypatch.chdir(tmp_path)
+    options = {"snapshot_dir": str(tmp_path), "use_cache": False, "progress": "off"}
+    assert run_comparison("x86_64", "loaded", save_snapshots=True, **options)
+
+    assert run_comparison(
+        "x86_64", "joined", from_snapshots=True, merge_join=True, **options
+    )
+    with open("loaded.json") as f, open("joined.json") as g:
+        loaded, joined = json.load(f)["loaded"], json.load(g)["joined"]
+    assert joined == loaded
+    assert joined["x86_64"]["only_in_p10"] == [
+        {"name": "pkg0", "version": "1", "release": "alt1"}
+    ]
+
+    assert not run_comparison("x86_64", "joined", merge_join=True, **options)
+    assert not run_comparison(
+        "i586", "joined", from_snapshots=True, merge_join=True, **options
     )
-    result = run_comparison("x86_64", "all_packages")
-    assert result is True
@@ -1,4 +1,18 @@
-from src.comparison import compare_packages, compare_versions, filter_package_data
+import pytest
+from pytest_mock import MockerFixture
+import src.comparison
+from src.comparison import (
+    REPORT_EXCLUDED_FIELDS,
+    compare_matrix,
+    compare_packages,
+    compare_sources,
+    compare_versions,
+    filter_package_data,
+    iter_merge_join,
+    split_noarch,
+)
+from src.config import config
+from src.package_table import PackageTable
 
 
 def test_compare_packages() -> None:
@@ -42,6 +56,180 @@ def test_compare_packages_empty() -> None:
     }
 
 
+def test_compare_packages_parallel(mocker: MockerFixture) -> None:
+    """
+    Test that the process-pool comparison matches the serial one exactly.
+    """
+    sisyphus_packages = [
+        {"name": f"pkg{i}", "version": f"1.{i % 7}", "release": f"alt{i % 3}"}
+        for i in range(0, 300)
+    ]
+    p10_packages = [
+        {"name": f"pkg{i}", "version": f"1.{i % 5}", "release": f"alt{i % 4}"}
+        for i in range(100, 400)
+    ]
+    # Epochs missing, stored as ints, and kept as strings in the table's extras.
+    sisyphus_packages[150]["epoch"] = 2
+    sisyphus_packages[160]["epoch"] = "1"
+    p10_packages[70]["epoch"] = "3"
+    serial = compare_packages(sisyphus_packages, p10_packages)
+
+    mock_parallel = mocker.spy(src.comparison, "_higher_rows_parallel")
+    mocker.patch.object(config, "parallel_threshold", 0)
+    parallel = compare_packages(sisyphus_packages, p10_packages, workers=3)
+
+    mock_parallel.assert_called_once()
+    assert parallel == serial
+    assert serial["higher_in_sisyphus"]
+
+
+def test_compare_packages_vectorized(mocker: MockerFixture) -> None:
+    """
+    Test that the NumPy bulk comparison matches the serial one exactly.
+    """
+    pytest.importorskip("numpy")
+    sisyphus_packages = [
+        {"name": f"pkg{i}", "version": f"1.{i % 7}", "release": f"alt{i % 3}"}
+        for i in range(0, 300)
+    ]
+    p10_packages = [
+        {"name": f"pkg{i}", "version": f"1.{i % 5}", "release": f"alt{i % 4}"}
+        for i in range(100, 400)
+    ]
+    serial = compare_packages(sisyphus_packages, p10_packages)
+
+    mock_vectorized = mocker.spy(src.comparison, "_higher_rows_vectorized")
+    mocker.patch.object(config, "vectorize_threshold", 0)
+    vectorized = compare_packages(sisyphus_packages, p10_packages)
+
+    mock_vectorized.assert_called_once()
+    assert vectorized == serial
+
+
+def test_compare_packages_parallel_below_threshold(mocker: MockerFixture) -> None:
+    """
+    Test that small inputs stay on the serial path.
+    """
+    mock_pool = mocker.patch("src.comparison.ProcessPoolExecutor")
+    compare_packages([{"name": "pkg1", "version": "1", "release": "1"}], [], workers=4)
+    mock_pool.assert_not_called()
+
+
+def test_compare_matrix() -> None:
+    """
+    Test that every branch pair is compared, consistently with compare_packages.
+    """
+    branches = {
+        "p10": [
+            {"name": f"pkg{i}", "version": f"1.{i % 5}", "release": "alt1"}
+            for i in range(0, 40)
+        ],
+        "p11": [{"name": "pkg3", "epoch": 1, "version": "0.1", "release": "alt1"}],
+        "sisyphus": [
+            {"name": f"pkg{i}", "version": f"1.{i % 3}", "release": "alt2"}
+            for i in range(20, 60)
+        ],
+    }
+
+    result = compare_matrix(branches)
+
+    assert list(result) == ["p10_vs_p11", "p10_vs_sisyphus", "p11_vs_sisyphus"]
+    pair = result["p10_vs_sisyphus"]
+    expected = compare_packages(branches["sisyphus"], branches["p10"])
+    for category in ("only_in_p10", "only_in_sisyphus", "higher_in_sisyphus"):
+        assert sorted(pair[category], key=lambda pkg: pkg["name"]) == sorted(
+            expected[category], key=lambda pkg: pkg["name"]
+        )
+    assert [pkg["name"] for pkg in pair["higher_in_p10"]] == sorted(
+        pkg["name"]
+        for pkg in branches["p10"][20:]
+        if pkg["version"] > f"1.{int(pkg['name'][3:]) % 3}"
+    )
+    assert result["p10_vs_p11"]["higher_in_p11"] == branches["p11"]
+    assert result["p11_vs_sisyphus"]["only_in_p11"] == branches["p11"]
+    assert len(result["p11_vs_sisyphus"]["only_in_sisyphus"]) == 40
+
+
+def test_split_noarch() -> None:
+    """
+    Test that only noarch packages identical on every architecture are split off,
+    and that comparing the split tables gives the per-architecture results.
+    """
+    common = {"version": "1", "release": "alt1", "arch": "noarch"}
+    packages = {}
+    for arch in ("x86_64", "i586"):
+        packages[("sisyphus", arch)] = PackageTable.from_packages(
+            [
+                {"name": "docs", **common, "release": "alt2"},
+                {"name": "only-sisyphus", **common},
+                {"name": "mixed", **common},
+                {"name": "rebuilt", **common, "buildtime": len(arch)},
+                {"name": "bin", "version": "1", "release": "alt1", "arch": arch},
+            ]
+        )
+        packages[("p10", arch)] = PackageTable.from_packages(
+            [
+                {"name": "docs", **common},
+                {"name": "mixed", **common, "arch": arch},
+                {"name": "rebuilt", **common},
+                {"name": "bin", "version": "1", "release": "alt0", "arch": arch},
+            ]
+        )
+    arches = ["x86_64", "i586"]
+
+    split = split_noarch(packages, ["sisyphus", "p10"], arches)
+
+    assert list(split[("sisyphus", "noarch")].index) == ["docs", "only-sisyphus"]
+    assert list(split[("p10", "noarch")].index) == ["docs"]
+    assert list(split[("sisyphus", "x86_64")].index) == ["mixed", "rebuilt", "bin"]
+    for arch in arches:
+        expected = compare_packages(
+            packages[("sisyphus", arch)], packages[("p10", arch)]
+        )
+        parts = [
+            compare_packages(split[("sisyphus", key)], split[("p10", key)])
+            for key in ("noarch", arch)
+        ]
+        for category, category_packages in expected.items():
+            assert sorted(category_packages, key=lambda p: p["name"]) == sorted(
+                parts[0][category] + parts[1][category], key=lambda p: p["name"]
+            )
+
+
+def test_compare_sources() -> None:
+    """
+    Test that binaries are compared once per source, by the highest EVR of each source.
+    """
+    sisyphus_packages = [
+        {"name": "foo", "version": "2.0", "release": "alt1", "source": "foo"},
+        {"name": "libfoo", "version": "2.0", "release": "alt1", "source": "foo"},
+        {"name": "bar", "version": "1.0", "release": "alt1", "source": "bar"},
+        {"name": "bar-doc", "version": "1.0", "release": "alt2", "source": "bar"},
+        {"name": "orphan", "version": "1.0", "release": "alt1"},
+    ]
+    p10_packages = [
+        {"name": "foo", "version": "1.0", "release": "alt1", "source": "foo"},
+        {"name": "bar", "version": "1.0", "release": "alt2", "source": "bar"},
+        {"name": "baz", "version": "1.0", "release": "alt1", "source": "baz"},
+    ]
+
+    result = compare_sources(sisyphus_packages, p10_packages)
+
+    assert result == {
+        "only_in_p10": [
+            {"source": "baz", "epoch": 0, "version": "1.0", "release": "alt1"}
+        ],
+        "only_in_sisyphus": [
+            {"source": "orphan", "epoch": 0, "version": "1.0", "release": "alt1"}
+        ],
+        "higher_in_sisyphus": [
+            {"source": "foo", "epoch": 0, "version": "2.0", "release": "alt1"}
+        ],
+    }
+    expanded = compare_sources(sisyphus_packages, p10_packages, expand=True)
+    assert expanded["higher_in_sisyphus"][0]["binaries"] == sisyphus_packages[:2]
+
+
 def test_compare_versions() -> None:
     """
     Test function for comparing versions of RPM packages.
@@ -79,3 +267,99 @@ def test_filter_package_data_empty() -> None:
     Test function for filtering empty package data.
     """
     assert filter_package_data([]) == []
+
+
+def test_compare_packages_exclude() -> None:
+    """
+    Test that excluded fields are left out as the result is built, as
+    `filter_package_data` would drop them afterwards.
+    """
+    sisyphus_packages = [
+        {
+            "name": "pkg1",
+            "epoch": 1,
+            "version": "2",
+            "release": "alt1",
+            "arch": "x86_64",
+        },
+        {"name": "pkg2", "epoch": "2", "version": "1", "release": "alt1", "extra": "x"},
+    ]
+    p10_packages = [
+        {
+            "name": "pkg1",
+            "epoch": 1,
+            "version": "1",
+            "release": "alt1",
+            "arch": "x86_64",
+        },
+        {"name": "pkg3", "version": "1", "release": "alt1", "buildtime": 123},
+    ]
+    full = compare_packages(sisyphus_packages, p10_packages)
+
+    result = compare_packages(
+        sisyphus_packages, p10_packages, exclude=REPORT_EXCLUDED_FIELDS
+    )
+
+    assert result == {
+        category: filter_package_data(packages) for category, packages in full.items()
+    }
+    assert result["only_in_sisyphus"] == [
+        {"name": "pkg2", "version": "1", "release": "alt1", "extra": "x"}
+    ]
+
+
+def test_iter_merge_join() -> None:
+    """
+    Test that the merge-join over sorted streams finds the same packages as compare_packages.
+    """
+    sisyphus_packages = [
+        {"name": "pkg1", "version": "1.0", "release": "1"},
+        {"name": "pkg2", "version": "2.0", "release": "1"},
+        {"name": "pkg4", "version": "2.0", "release": "1"},
+        {"name": "pkg4", "version": "2.0", "release": "2"},
+        {"name": "pkg6", "version": "1.0", "release": "1"},
+    ]
+    p10_packages = [
+        {"name": "pkg0", "version": "1.0", "release": "1"},
+        {"name": "pkg1", "version": "1.0", "release": "1"},
+        {"name": "pkg3", "version": "3.0", "release": "1"},
+        {"name": "pkg4", "version": "2.0", "release": "1"},
+    ]
+
+    result = list(iter_merge_join(iter(sisyphus_packages), iter(p10_packages)))
+
+    assert result == [
+        ("only_in_p10", p10_packages[0]),
+        ("only_in_sisyphus", sisyphus_packages[1]),
+        ("only_in_p10", p10_packages[2]),
+        ("higher_in_sisyphus", sisyphus_packages[3]),
+        ("only_in_sisyphus", sisyphus_packages[4]),
+    ]
+    expected = compare_packages(sisyphus_packages, p10_packages)
+    for category, packages in expected.items():
+        assert [pkg for cat, pkg in result if cat == category] == packages
+
+
+def test_iter_merge_join_is_lazy() -> None:
+    """
+    Test that results are produced before the inputs are fully read.
+    """
+
+    def packages(names):
+        for name in names:
+            yield {"name": name, "version": "1", "release": "1"}
+        raise AssertionError("Read past the end")
+
+    result = iter_merge_join(packages(["a", "c"]), packages(["b", "c"]))
+    assert next(result) == (
+        "only_in_sisyphus",
+        {"name": "a", "version": "1", "release": "1"},
+    )
+
+
+def test_iter_merge_join_unsorted() -> None:
+    """
+    Test that unsorted input is rejected.
+    """
+    with pytest.raises(ValueError, match="not sorted"):
+        list(iter_merge_join([{"name": "b"}, {"name": "a"}], []))
@@ -0,0 +1,82 @@
+import random
+import pytest
+from version_utils import rpm
+from src.synthetic import generate_branches
+from src.package_table import PackageTable
+
+np = pytest.importorskip("numpy")
+from src import evr_arrays  # noqa: E402
+
+
+def _reference(a: tuple, b: tuple) -> int:
+    if int(a[0] or 0) != int(b[0] or 0):
+        return 1 if int(a[0] or 0) > int(b[0] or 0) else -1
+    return rpm.compare_versions(a[1], b[1]) or rpm.compare_versions(a[2], b[2])
+
+
+def _higher(evrs_a: list, evrs_b: list) -> list:
+    tables = []
+    for evrs in (evrs_a, evrs_b):
+        tables.append(
+            PackageTable.from_packages(
+                {"name": f"pkg{i}", "epoch": e, "version": v, "release": r}
+                for i, (e, v, r) in enumerate(evrs)
+            )
+        )
+    rows = np.arange(len(evrs_a))
+    return evr_arrays.higher_rows(tables[0], rows, tables[1], rows).tolist()
+
+
+def test_encode_segments() -> None:
+    """
+    Test that segment codes order like the segments and reject what does not fit.
+    """
+    encode = evr_arrays.encode_segments
+    assert encode("1.0~rc1") < encode("1.0") < encode("1.0a") < encode("1.0.1")
+    assert encode("1.Z") < encode("1.a") < encode("1.ab") < encode("1.b")
+    assert encode("1.010") == encode("1.10")
+    assert encode("1." + "9" * 19) is None
+    assert encode("1.abcdefghijk") is None
+    assert encode("1.0.") is None
+
+
+def test_higher_rows_matches_rpm_on_synthetic_branches() -> None:
+    """
+    Test that the bulk comparison matches rpm.compare_versions on synthetic branches.
+    """
+    sisyphus, p10 = generate_branches(3000, overlap=1.0, churn=0.5, seed=1)
+    p10_by_name = {package["name"]: package for package in p10}
+    evrs_a = [(p["epoch"], p["version"], p["release"]) for p in sisyphus]
+    evrs_b = [
+        (p["epoch"], p["version"], p["release"])
+        for p in (p10_by_name[package["name"]] for package in sisyphus)
+    ]
+
+    expected = [_reference(a, b) > 0 for a, b in zip(evrs_a, evrs_b)]
+    assert any(expected)
+    assert _higher(evrs_a, evrs_b) == expected
+
+
+def test_higher_rows_matches_rpm_on_edge_cases() -> None:
+    """
+    Test exact fallbacks: long segments, irregular separators, non-int epochs.
+    """
+    rng = random.Random(0)
+    values = [
+        "1.0", "1.0~rc1", "1.0.", "1._~rc", "1.0ä", "1." + "9" * 25,
+        "1." + "8" * 25, "1.averyverylongword", "1.averyverylongwore", "01.1",
+        "1.1", "2", "a", "",
+    ]  # fmt: skip
+    epochs = [0, 1, "2", None]
+    evrs_a, evrs_b, expected = [], [], []
+    for _ in range(2000):
+        a = (rng.choice(epochs), rng.choice(values), rng.choice(values))
+        b = (rng.choice(epochs), rng.choice(values), rng.choice(values))
+        try:
+            expected.append(_reference(a, b) > 0)
+        except IndexError:
+            continue  # version_utils fails on some separator-only tails
+        evrs_a.append(a)
+        evrs_b.append(b)
+
+    assert _higher(evrs_a, evrs_b) == expected
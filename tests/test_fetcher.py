@@ -0,0 +1,66 @@
+import threading
+import pytest
+from pytest_mock import MockerFixture
+from src.altlinux_api import AltLinuxAPI
+from src.fetcher import fetch_all, iter_fetch
+
+
+def test_fetch_all_concurrent(mocker: MockerFixture) -> None:
+    """
+    Test that every (branch, arch) pair is fetched once and downloads overlap.
+    """
+    barrier = threading.Barrier(4, timeout=5)
+
+    def fake_fetch(branch, arch, stream=False):
+        barrier.wait()
+        return iter([{"name": f"{branch}-{arch}"}])
+
+    api = AltLinuxAPI()
+    mocker.patch.object(api, "fetch_packages", side_effect=fake_fetch)
+
+    result = fetch_all(api, ["sisyphus", "p10"], ["x86_64", "i586"], max_workers=4)
+
+    assert list(result) == [
+        ("sisyphus", "x86_64"),
+        ("p10", "x86_64"),
+        ("sisyphus", "i586"),
+        ("p10", "i586"),
+    ]
+    assert list(result[("p10", "i586")]) == [{"name": "p10-i586"}]
+
+
+def test_fetch_all_error(mocker: MockerFixture) -> None:
+    """
+    Test that a failed fetch is re-raised to the caller.
+    """
+    api = AltLinuxAPI()
+    mocker.patch.object(api, "fetch_packages", side_effect=Exception("Fetch error"))
+
+    with pytest.raises(Exception, match="Fetch error"):
+        fetch_all(api, ["sisyphus", "p10"], ["x86_64"], max_workers=2)
+
+
+def test_iter_fetch_yields_each_arch_when_fetched(mocker: MockerFixture) -> None:
+    """
+    Test that an architecture is yielded before later architectures finish downloading.
+    """
+    release = threading.Event()
+
+    def fake_fetch(branch, arch, stream=False):
+        if arch == "i586":
+            assert release.wait(5)
+        return iter([{"name": f"{branch}-{arch}"}])
+
+    api = AltLinuxAPI()
+    mocker.patch.object(api, "fetch_packages", side_effect=fake_fetch)
+
+    fetched = iter_fetch(api, ["sisyphus", "p10"], ["x86_64", "i586"], max_workers=4)
+
+    arch, tables = next(fetched)
+    assert arch == "x86_64"
+    assert list(tables) == [("sisyphus", "x86_64"), ("p10", "x86_64")]
+    release.set()
+    arch, tables = next(fetched)
+    assert arch == "i586"
+    assert list(tables[("p10", "i586")]) == [{"name": "p10-i586"}]
+    assert next(fetched, None) is None
@@ -0,0 +1,72 @@
+import pytest
+from src.filters import PackageFilter, read_names
+from src.package_table import PackageTable
+
+PACKAGES = [
+    {"name": "python3-module-foo", "version": "1", "release": "alt1", "arch": "noarch"},
+    {"name": "python3-module-bar", "version": "2", "release": "alt1", "arch": "noarch"},
+    {"name": "perl-foo", "version": "1", "release": "alt1", "arch": "noarch"},
+    {"name": "libfoo", "version": "1", "release": "alt1", "arch": "x86_64"},
+]
+
+
+def test_package_filter_criteria() -> None:
+    """
+    Test that a package is kept only if its name matches every criterion given.
+    """
+    assert len(list(PackageFilter().apply(PACKAGES))) == 4
+    assert [p["name"] for p in PackageFilter(["perl-", "lib"]).apply(PACKAGES)] == [
+        "perl-foo",
+        "libfoo",
+    ]
+    assert [p["name"] for p in PackageFilter(pattern="foo$").apply(PACKAGES)] == [
+        "python3-module-foo",
+        "perl-foo",
+        "libfoo",
+    ]
+    package_filter = PackageFilter(
+        ["python3-"], pattern="foo", names=["python3-module-foo", "perl-foo"]
+    )
+    assert [p["name"] for p in package_filter.apply(PACKAGES)] == ["python3-module-foo"]
+
+
+def test_package_filter_projection() -> None:
+    """
+    Test that projection keeps the requested fields and those the comparison needs.
+    """
+    package_filter = PackageFilter(fields=["arch"])
+
+    assert next(package_filter.apply(PACKAGES)) == {
+        "name": "python3-module-foo",
+        "version": "1",
+        "release": "alt1",
+        "arch": "noarch",
+    }
+    assert PackageFilter().project(PACKAGES[0]) is PACKAGES[0]
+
+
+def test_package_filter_table() -> None:
+    """
+    Test filtering a loaded table, e.g. one read from a snapshot.
+    """
+    table = PackageTable.from_packages(PACKAGES)
+
+    kept = PackageFilter(["python3-"], fields=[]).filter_table(table)
+
+    assert list(kept) == [
+        {"name": "python3-module-foo", "version": "1", "release": "alt1"},
+        {"name": "python3-module-bar", "version": "2", "release": "alt1"},
+    ]
+    assert len(table) == 4
+
+
+def test_read_names(tmp_path) -> None:
+    """
+    Test reading a names file, skipping blank lines and comments.
+    """
+    path = tmp_path / "names.txt"
+    path.write_text("# wanted\nlibfoo\n\n  perl-foo \n")
+
+    assert read_names(str(path)) == ["libfoo", "perl-foo"]
+    with pytest.raises(OSError):
+        read_names(str(tmp_path / "missing.txt"))
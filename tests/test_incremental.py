@@ -0,0 +1,85 @@
+from pytest_mock import MockerFixture
+import src.incremental
+from src.comparison import compare_packages
+from src.incremental import RunState, compare_incremental
+
+SISYPHUS = [
+    {"name": "pkg1", "epoch": 0, "version": "1.0", "release": "alt1"},
+    {"name": "pkg2", "epoch": 0, "version": "2.0", "release": "alt2"},
+    {"name": "pkg3", "epoch": 0, "version": "3.0", "release": "alt1"},
+]
+P10 = [
+    {"name": "pkg1", "epoch": 0, "version": "1.0", "release": "alt1"},
+    {"name": "pkg2", "epoch": 0, "version": "2.0", "release": "alt1"},
+    {"name": "pkg4", "epoch": 0, "version": "4.0", "release": "alt1"},
+]
+
+
+def test_compare_incremental_first_run() -> None:
+    """
+    Test that a run without previous state is a full comparison.
+    """
+    result, state = compare_incremental(SISYPHUS, P10, None)
+
+    assert result.pop("changes_since_last_run") is None
+    assert result == compare_packages(SISYPHUS, P10)
+    assert state.categories == {
+        "pkg2": "higher_in_sisyphus",
+        "pkg3": "only_in_sisyphus",
+        "pkg4": "only_in_p10",
+    }
+
+
+def test_compare_incremental_patches_changes(mocker: MockerFixture) -> None:
+    """
+    Test that only changed names are reclassified and the result matches a full comparison.
+    """
+    _, state = compare_incremental(SISYPHUS, P10, None)
+    sisyphus = SISYPHUS[:2] + [
+        {"name": "pkg1", "epoch": 0, "version": "1.1", "release": "alt1"},
+        {"name": "pkg5", "epoch": 0, "version": "5.0", "release": "alt1"},
+    ]
+    p10 = [P10[0], {"name": "pkg2", "epoch": 0, "version": "2.0", "release": "alt3"}]
+    spy = mocker.spy(src.incremental, "_category")
+
+    result, new_state = compare_incremental(sisyphus, p10, state)
+
+    changes = result.pop("changes_since_last_run")
+    assert result == compare_packages(sisyphus, p10)
+    assert spy.call_count == 5
+    assert changes["branches"]["sisyphus"] == {
+        "added": ["pkg5"],
+        "removed": ["pkg3"],
+        "updated": ["pkg1"],
+    }
+    assert changes["branches"]["p10"] == {
+        "added": [],
+        "removed": ["pkg4"],
+        "updated": ["pkg2"],
+    }
+    assert changes["categories"] == {
+        "only_in_p10": {"added": [], "removed": ["pkg4"]},
+        "only_in_sisyphus": {"added": ["pkg5"], "removed": ["pkg3"]},
+        "higher_in_sisyphus": {"added": ["pkg1"], "removed": ["pkg2"]},
+    }
+    assert new_state.categories == {
+        "pkg1": "higher_in_sisyphus",
+        "pkg5": "only_in_sisyphus",
+    }
+
+
+def test_run_state_round_trip(tmp_path) -> None:
+    """
+    Test that run states survive saving and loading.
+    """
+    _, state = compare_incremental(SISYPHUS, P10, None)
+    path = RunState.path(str(tmp_path / "state"), "x86_64")
+
+    assert RunState.load(path) is None
+    state.save(path)
+    loaded = RunState.load(path)
+
+    assert loaded.evrs == state.evrs
+    assert loaded.categories == state.categories
+    result, _ = compare_incremental(SISYPHUS, P10, loaded)
+    assert result["changes_since_last_run"]["branches"]["sisyphus"]["updated"] == []
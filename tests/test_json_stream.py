@@ -0,0 +1,58 @@
+import json
+import pytest
+from src.json_stream import iter_json_array
+
+
+def _chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def test_iter_json_array_small_chunks() -> None:
+    """
+    Test that array elements are decoded correctly when split across tiny chunks.
+    """
+    document = {
+        "request_args": {"arch": "x86_64", "packages": "not this one"},
+        "length": 3,
+        "packages": [
+            {"name": "pkg1", "epoch": 12345, "version": "1.0", "release": "alt1"},
+            {"name": "пакет", "epoch": 0, "version": "2.0", "release": "alt2"},
+            {"name": "pkg3", "epoch": 1, "version": "3.0", "release": "alt3"},
+        ],
+    }
+    data = json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")
+
+    for size in (1, 2, 7, len(data)):
+        result = list(iter_json_array(_chunks(data, size), "packages"))
+        assert result == document["packages"]
+
+
+def test_iter_json_array_empty_and_missing() -> None:
+    """
+    Test that empty arrays and missing keys yield nothing.
+    """
+    assert list(iter_json_array([b'{"packages": []}'], "packages")) == []
+    assert list(iter_json_array([b'{"length": 0}'], "packages")) == []
+    assert list(iter_json_array([b"{}"], "packages")) == []
+
+
+def test_iter_json_array_is_lazy() -> None:
+    """
+    Test that elements are yielded before the rest of the input is read.
+    """
+
+    def chunks():
+        yield b'{"packages": [{"name": "pkg1"},'
+        raise AssertionError("Read past the first element")
+
+    assert next(iter_json_array(chunks(), "packages")) == {"name": "pkg1"}
+
+
+def test_iter_json_array_malformed() -> None:
+    """
+    Test that malformed or truncated documents raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'{"packages": [{"name": "pkg1"}'], "packages"))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'["pkg1"]'], "packages"))
@@ -0,0 +1,26 @@
+from pytest_mock import MockerFixture
+from src import logging_config
+from src.logging_config import level_enabled, setup_logger
+
+
+def test_setup_logger_level(mocker: MockerFixture) -> None:
+    """
+    Test that DEBUG records and debug.log are only enabled at DEBUG level.
+    """
+    mock_add = mocker.patch.object(logging_config.logger, "add")
+    mocker.patch.object(logging_config.logger, "remove")
+    mocker.patch.object(logging_config, "_min_level_no", 0)
+
+    setup_logger("INFO")
+
+    assert not level_enabled("DEBUG")
+    assert level_enabled("INFO")
+    sinks = [call.args[0] for call in mock_add.call_args_list]
+    assert "../logs/debug.log" not in sinks
+    assert "../logs/info.log" in sinks
+    assert all(call.kwargs["enqueue"] for call in mock_add.call_args_list)
+
+    setup_logger("DEBUG")
+
+    assert level_enabled("DEBUG")
+    assert "../logs/debug.log" in [call.args[0] for call in mock_add.call_args_list]
@@ -0,0 +1,60 @@
+import json
+import pytest
+from src.metrics import Metrics
+
+
+def test_stage_accumulates_and_calls_hooks() -> None:
+    """
+    Test that a stage entered several times accumulates and reports to hooks.
+    """
+    calls = []
+    metrics = Metrics(hooks=[lambda name, stage: calls.append((name, stage))])
+
+    for _ in range(2):
+        with metrics.stage("compare"):
+            sum(range(10000))
+    metrics.count("compare", "packages", 5)
+
+    stage = metrics.to_dict()["stages"]["compare"]
+    assert stage["calls"] == 2
+    assert stage["errors"] == 0
+    assert stage["packages"] == 5
+    assert stage["wall_seconds"] > 0
+    assert stage["peak_rss_bytes"] > 0
+    assert [name for name, _ in calls] == ["compare", "compare"]
+    assert calls[-1][1]["calls"] == 2
+
+
+def test_stage_counts_errors() -> None:
+    """
+    Test that a failing stage is recorded as an error and the exception propagates.
+    """
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.stage("fetch"):
+            raise ValueError("boom")
+
+    assert metrics.stages["fetch"]["errors"] == 1
+
+
+def test_write_json_and_prometheus(tmp_path) -> None:
+    """
+    Test writing metrics as JSON and in the Prometheus text format.
+    """
+    metrics = Metrics()
+    with metrics.stage("fetch"):
+        pass
+    metrics.count("fetch", "bytes", 1024)
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    assert data["stages"]["fetch"]["bytes"] == 1024
+    assert data["total"]["wall_seconds"] > 0
+
+    metrics.write(str(tmp_path / "metrics.prom"), "prometheus")
+    text = (tmp_path / "metrics.prom").read_text()
+    assert "# TYPE package_comparison_stage_bytes gauge" in text
+    assert 'package_comparison_stage_bytes{stage="fetch"} 1024' in text
+
+    with pytest.raises(ValueError):
+        metrics.write(str(tmp_path / "metrics.txt"), "xml")
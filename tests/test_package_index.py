@@ -0,0 +1,44 @@
+import pytest
+from src.package_index import PackageIndex, write_package_index
+from src.package_table import PackageTable
+
+PACKAGES = [
+    {"name": "zlib", "epoch": 0, "version": "1.3", "release": "alt1", "buildtime": 1},
+    {"name": "python3", "version": "3.12.1", "release": "alt1", "source": "пакет"},
+    {"name": "python3-module-six", "version": "1.16", "release": "alt2", "x": [1]},
+    {"name": "bash", "epoch": "1", "version": "5.2", "release": "alt1", "arch": None},
+]
+
+
+def test_package_index_lookup(tmp_path) -> None:
+    """
+    Test name and prefix lookups on a memory-mapped index.
+    """
+    path = str(tmp_path / "sisyphus_x86_64.pkgi")
+    write_package_index(PackageTable.from_packages(PACKAGES), path)
+
+    with PackageIndex(path) as index:
+        assert len(index) == 4
+        for package in PACKAGES:
+            assert list(index.get(package["name"]).items()) == list(package.items())
+        assert index.get("python") is None
+        assert index.get("zzz") is None
+        assert [package["name"] for package in index.prefix("python3")] == [
+            "python3",
+            "python3-module-six",
+        ]
+        assert list(index.prefix("perl")) == []
+        assert [package["name"] for package in index] == sorted(
+            package["name"] for package in PACKAGES
+        )
+
+
+def test_package_index_invalid_file(tmp_path) -> None:
+    """
+    Test that files that are not package indexes are rejected.
+    """
+    path = tmp_path / "invalid.pkgi"
+    path.write_bytes(b"not an index at all")
+
+    with pytest.raises(ValueError):
+        PackageIndex(str(path))
@@ -0,0 +1,100 @@
+from src.package_table import PackageTable
+from src.versions import VersionKey
+
+PACKAGE = {
+    "name": "pkg1",
+    "epoch": 1,
+    "version": "1.0",
+    "release": "alt1",
+    "arch": "x86_64",
+    "disttag": "sisyphus+1.1",
+    "buildtime": 1700000000,
+    "source": "pkg",
+}
+
+
+def test_package_table_round_trip() -> None:
+    """
+    Test that rows are materialized back into the original package dictionaries.
+    """
+    packages = [
+        PACKAGE,
+        {"name": "pkg2", "version": "2.0", "release": "1", "extra": "data"},
+        {"name": "pkg3", "epoch": "0", "version": "3.0", "release": "1"},
+    ]
+    table = PackageTable.from_packages(iter(packages))
+
+    assert len(table) == 3
+    assert list(table) == packages
+    assert list(table.record(0)) == list(PACKAGE)
+    assert table.get("pkg2") == packages[1]
+    assert table.get("missing") is None
+    assert "pkg3" in table
+
+
+def test_package_table_duplicates_replace_in_place() -> None:
+    """
+    Test that a later package with the same name replaces the earlier row.
+    """
+    table = PackageTable.from_packages(
+        [
+            {"name": "pkg1", "version": "1.0", "release": "1", "extra": "old"},
+            {"name": "pkg2", "version": "1.0", "release": "1"},
+            {"name": "pkg1", "version": "2.0", "release": "1"},
+        ]
+    )
+
+    assert table.names == ["pkg1", "pkg2"]
+    assert table.get("pkg1") == {"name": "pkg1", "version": "2.0", "release": "1"}
+
+
+def test_package_table_record_exclude_and_key() -> None:
+    """
+    Test field exclusion and version keys of rows.
+    """
+    table = PackageTable.from_packages([PACKAGE])
+
+    assert table.record(0, exclude={"epoch", "disttag", "arch", "buildtime"}) == {
+        "name": "pkg1",
+        "version": "1.0",
+        "release": "alt1",
+        "source": "pkg",
+    }
+    assert table.key(0) == VersionKey(1, "1.0", "alt1")
+    assert [pkg["name"] for pkg in table.iter_sorted()] == ["pkg1"]
+    assert PackageTable.from_packages(table) is table
+
+
+def test_package_table_interns_strings() -> None:
+    """
+    Test that repeated strings are stored once.
+    """
+    arch_a = "".join(["x86", "_64"])
+    arch_b = "".join(["x86_", "64"])
+    table = PackageTable.from_packages(
+        [
+            {"name": "pkg1", "version": "1", "release": "1", "arch": arch_a},
+            {"name": "pkg2", "version": "1", "release": "1", "arch": arch_b},
+        ]
+    )
+
+    assert table.columns["arch"][0] is table.columns["arch"][1]
+
+
+def test_package_table_take() -> None:
+    """
+    Test that taking rows copies their packages, extras included, into a new table.
+    """
+    packages = [
+        PACKAGE,
+        {"name": "pkg2", "version": "2.0", "release": "1", "extra": "data"},
+        {"name": "pkg3", "epoch": "0", "version": "3.0", "release": "1"},
+    ]
+    table = PackageTable.from_packages(packages)
+
+    taken = table.take([2, 1])
+
+    assert list(taken) == [packages[2], packages[1]]
+    assert taken.index == {"pkg3": 0, "pkg2": 1}
+    assert taken.key(0) == table.key(2)
+    assert len(table) == 3
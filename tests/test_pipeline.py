@@ -0,0 +1,87 @@
+import itertools
+import threading
+import pytest
+from src.pipeline import PipelineError, run_pipeline
+
+
+def test_run_pipeline_applies_stages_in_order() -> None:
+    """
+    Test that every item goes through every stage and results keep the source order.
+    """
+    results = run_pipeline(
+        range(5), [("double", lambda x: x * 2), ("label", lambda x: f"item-{x}")]
+    )
+
+    assert list(results) == ["item-0", "item-2", "item-4", "item-6", "item-8"]
+
+
+def test_run_pipeline_overlaps_stages() -> None:
+    """
+    Test that a stage works on the next item while a later stage handles the previous one.
+    """
+    barrier = threading.Barrier(2, timeout=5)
+
+    def first(item: int) -> int:
+        if item == 2:
+            barrier.wait()
+        return item
+
+    def second(item: int) -> int:
+        if item == 1:
+            barrier.wait()
+        return item
+
+    assert list(run_pipeline([1, 2], [("first", first), ("second", second)])) == [1, 2]
+
+
+def test_run_pipeline_reports_failed_stage() -> None:
+    """
+    Test that an error is re-raised with the name of the stage that raised it.
+    """
+
+    def fail(item: int) -> int:
+        raise ValueError(f"bad item {item}")
+
+    results = run_pipeline([1, 2], [("ok", lambda x: x), ("check", fail)])
+
+    with pytest.raises(PipelineError, match="check: bad item 1") as error:
+        list(results)
+    assert error.value.stage == "check"
+    assert isinstance(error.value.error, ValueError)
+
+
+def test_run_pipeline_reports_failed_source() -> None:
+    """
+    Test that an error raised by the source iterable is reported under the source name.
+    """
+
+    def items():
+        yield 1
+        raise OSError("download failed")
+
+    results = run_pipeline(items(), [("ok", lambda x: x)], source="fetch")
+
+    assert next(results) == 1
+    with pytest.raises(PipelineError) as error:
+        next(results)
+    assert error.value.stage == "fetch"
+
+
+def test_run_pipeline_close_stops_source() -> None:
+    """
+    Test that closing the results early stops the stages and closes the source.
+    """
+    closed = threading.Event()
+
+    def items():
+        try:
+            yield from itertools.count()
+        finally:
+            closed.set()
+
+    results = run_pipeline(items(), [("ok", lambda x: x)], maxsize=2)
+
+    assert next(results) == 0
+    results.close()
+    assert closed.is_set()
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
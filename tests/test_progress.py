@@ -0,0 +1,103 @@
+import io
+from pytest_mock import MockerFixture
+from src.altlinux_api import AltLinuxAPI
+from src.progress import ProgressReporter
+
+
+def test_progress_off_passes_through() -> None:
+    """
+    Test that disabled progress returns the tracked iterables without wrapping them.
+    """
+    chunks = [b"abc"]
+    progress = ProgressReporter("off").start("test")
+
+    assert list(progress.track_bytes(chunks)) == chunks
+    assert progress.bytes_received == 0
+
+
+def test_progress_auto_is_log_without_terminal() -> None:
+    """
+    Test that automatic mode falls back to log lines when the output is not a terminal.
+    """
+    assert ProgressReporter("auto", file=io.StringIO()).mode == "log"
+
+
+def test_progress_bar_counts_bytes_and_items() -> None:
+    """
+    Test that a progress bar counts received bytes and parsed items.
+    """
+    output = io.StringIO()
+    progress = ProgressReporter("bar", file=output).start("Fetching", total=6)
+
+    assert list(progress.track_bytes([b"abc", b"def"])) == [b"abc", b"def"]
+    assert list(progress.track_items(["pkg1", "pkg2"])) == ["pkg1", "pkg2"]
+    progress.close()
+
+    assert progress.bytes_received == 6
+    assert progress.items == 2
+    assert "packages=2" in output.getvalue()
+
+
+def test_fetch_reports_actual_progress(upstream, mocker: MockerFixture) -> None:
+    """
+    Test that fetching reports the real payload size and package count without sleeping.
+    """
+    upstream.packages["sisyphus"] = [{"name": "pkg1"}, {"name": "pkg2"}]
+    mock_sleep = mocker.patch("time.sleep")
+    mock_log = mocker.patch("src.progress.log")
+    api = AltLinuxAPI(progress=ProgressReporter("log"))
+
+    assert len(list(api.fetch_packages("sisyphus", "x86_64", stream=True))) == 2
+
+    mock_sleep.assert_not_called()
+    payload_size = len(upstream.payload("sisyphus", "x86_64"))
+    message = mock_log.info.call_args[0][0]
+    assert f"{payload_size} bytes, 2 packages" in message
+
+
+def test_progress_off_counts_for_on_close() -> None:
+    """
+    Test that disabled progress still counts bytes and items when a listener needs them.
+    """
+    finished = []
+    progress = ProgressReporter("off", on_close=finished.append).start("test")
+
+    assert list(progress.track_bytes([b"abc", b"de"])) == [b"abc", b"de"]
+    assert list(progress.track_items(["pkg1"])) == ["pkg1"]
+    progress.close()
+
+    assert finished == [progress]
+    assert (progress.bytes_received, progress.items) == (5, 1)
+
+
+def test_progress_bars_get_separate_positions(mocker: MockerFixture) -> None:
+    """
+    Test that concurrent bars are drawn on separate lines and free them when closed.
+    """
+    mock_tqdm = mocker.patch("tqdm.tqdm")
+    reporter = ProgressReporter("bar", file=io.StringIO())
+    first = reporter.start("sisyphus")
+    second = reporter.start("p10")
+    first.close()
+    first.close()
+    reporter.start("p9")
+
+    positions = [call.kwargs["position"] for call in mock_tqdm.call_args_list]
+    assert positions == [0, 1, 0]
+    assert mock_tqdm.return_value.close.call_count == 1
+    second.close()
+
+
+def test_abandoned_download_closes_progress(upstream) -> None:
+    """
+    Test that a download stopped by its consumer still finishes its progress display.
+    """
+    upstream.packages["sisyphus"] = [{"name": "pkg1"}, {"name": "pkg2"}]
+    finished = []
+    api = AltLinuxAPI(progress=ProgressReporter("off", on_close=finished.append))
+
+    packages = api.fetch_packages("sisyphus", "x86_64", stream=True)
+    assert next(packages) == {"name": "pkg1"}
+    packages.close()
+
+    assert [progress.items for progress in finished] == [1]
@@ -0,0 +1,136 @@
+import threading
+import pytest
+import requests
+from src.altlinux_api import AltLinuxAPI
+from src.server import BranchStore, ComparisonServer
+
+SISYPHUS = [
+    {"name": "bash", "version": "5.2", "release": "alt2", "arch": "x86_64"},
+    {"name": "python3", "version": "3.12", "release": "alt1", "arch": "x86_64"},
+    {"name": "python3-module-six", "version": "1.16", "release": "alt1"},
+]
+P10 = [
+    {"name": "bash", "version": "5.2", "release": "alt1", "arch": "x86_64"},
+    {"name": "zsh", "version": "5.9", "release": "alt1", "arch": "x86_64"},
+]
+
+
+@pytest.fixture
+def server(upstream):
+    upstream.packages["sisyphus"] = SISYPHUS
+    upstream.packages["p10"] = P10
+    store = BranchStore(AltLinuxAPI(retries=0), ["x86_64"], jobs=2)
+    store.refresh()
+    server = ComparisonServer(("127.0.0.1", 0), store)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", store, upstream
+    server.shutdown()
+    server.server_close()
+
+
+def test_server_compare(server) -> None:
+    """
+    Test that comparison results are served from the warm store.
+    """
+    url, _, upstream = server
+    requests_before = len(upstream.requests)
+
+    result = requests.get(f"{url}/compare", params={"arch": "x86_64"}).json()
+
+    assert result["only_in_p10"] == [
+        {"name": "zsh", "version": "5.9", "release": "alt1"}
+    ]
+    assert [pkg["name"] for pkg in result["only_in_sisyphus"]] == [
+        "python3",
+        "python3-module-six",
+    ]
+    assert result["higher_in_sisyphus"] == [
+        {"name": "bash", "version": "5.2", "release": "alt2"}
+    ]
+    response = requests.get(
+        f"{url}/compare", params={"arch": "x86_64", "category": "only_in_p10"}
+    )
+    assert response.json() == result["only_in_p10"]
+    assert len(upstream.requests) == requests_before
+
+
+def test_server_lookup(server) -> None:
+    """
+    Test name and prefix lookups.
+    """
+    url, _, _ = server
+
+    result = requests.get(
+        f"{url}/lookup", params={"arch": "x86_64", "name": ["bash", "missing"]}
+    ).json()
+    assert result["bash"]["p10"]["release"] == "alt1"
+    assert result["bash"]["sisyphus"]["release"] == "alt2"
+    assert result["missing"] == {"p10": None, "sisyphus": None}
+
+    result = requests.get(
+        f"{url}/lookup", params={"arch": "x86_64", "name": "python3", "prefix": 1}
+    ).json()
+    assert list(result) == ["python3", "python3-module-six"]
+    assert result["python3"]["p10"] is None
+
+
+def test_server_errors(server) -> None:
+    """
+    Test responses to invalid queries.
+    """
+    url, _, _ = server
+
+    assert requests.get(f"{url}/compare", params={"arch": "i586"}).status_code == 400
+    assert requests.get(f"{url}/lookup", params={"arch": "x86_64"}).status_code == 400
+    assert requests.get(f"{url}/unknown").status_code == 404
+    assert requests.get(f"{url}/health").json()["packages"] == {
+        "p10/x86_64": 2,
+        "sisyphus/x86_64": 3,
+    }
+
+
+def test_server_refresh(server) -> None:
+    """
+    Test that a refresh swaps in new data and a failed one keeps the old data.
+    """
+    url, store, upstream = server
+    upstream.packages["p10"] = P10 + [
+        {"name": "python3", "version": "3.13", "release": "alt1", "arch": "x86_64"}
+    ]
+
+    store.refresh()
+    result = requests.get(f"{url}/compare", params={"arch": "x86_64"}).json()
+    assert [pkg["name"] for pkg in result["only_in_sisyphus"]] == ["python3-module-six"]
+
+    upstream.failures = 100
+    store.api.max_failures = 100
+    store.start(0.01)
+    threading.Event().wait(0.2)
+    store.stop()
+    result = requests.get(f"{url}/compare", params={"arch": "x86_64"}).json()
+    assert [pkg["name"] for pkg in result["only_in_sisyphus"]] == ["python3-module-six"]
+
+
+def test_server_health_reports_failed_refresh(server) -> None:
+    """
+    Test that a failed refresh marks the data stale until a refresh succeeds again.
+    """
+    url, store, upstream = server
+    store.api.max_failures = 1
+    store.api.cooldown = 0.0
+    upstream.failures = 100
+
+    with pytest.raises(Exception):
+        store.refresh()
+    health = requests.get(f"{url}/health").json()
+    assert health["status"] == "stale"
+    assert health["last_error"]
+    assert health["age_seconds"] >= 0
+    assert requests.get(f"{url}/compare", params={"arch": "x86_64"}).ok
+
+    upstream.failures = 0
+    store.refresh()
+    health = requests.get(f"{url}/health").json()
+    assert health["status"] == "ok"
+    assert "last_error" not in health
@@ -0,0 +1,66 @@
+import pytest
+from src.package_table import PackageTable
+from src.snapshot import (
+    dump_snapshot,
+    load_snapshot,
+    load_branch_snapshots,
+    save_branch_snapshots,
+)
+
+PACKAGES = [
+    {
+        "name": "pkg1",
+        "epoch": 1,
+        "version": "1.0",
+        "release": "alt1",
+        "arch": "x86_64",
+        "disttag": "sisyphus+1.1",
+        "buildtime": 1700000000,
+        "source": "pkg",
+    },
+    {"name": "pkg2", "version": "2.0", "release": "1", "disttag": None, "extra": [1]},
+    {"name": "pkg3", "epoch": "0", "version": "3.0", "release": "1", "source": "пакет"},
+]
+
+
+def test_snapshot_round_trip() -> None:
+    """
+    Test that a snapshot restores every package, field order and the name index.
+    """
+    table = PackageTable.from_packages(PACKAGES)
+
+    restored = load_snapshot(dump_snapshot(table))
+
+    assert [list(package.items()) for package in restored] == [
+        list(package.items()) for package in PACKAGES
+    ]
+    assert restored.index == table.index
+    assert restored.key(0) == table.key(0)
+
+
+def test_snapshot_invalid_data() -> None:
+    """
+    Test that data that is not a snapshot is rejected.
+    """
+    with pytest.raises(ValueError):
+        load_snapshot(b"not a snapshot")
+
+
+def test_save_and_load_snapshots(tmp_path) -> None:
+    """
+    Test saving fetched branches and loading them back in fetch order.
+    """
+    packages = {
+        ("sisyphus", "x86_64"): PackageTable.from_packages(PACKAGES),
+        ("p10", "x86_64"): PackageTable.from_packages(PACKAGES[:1]),
+    }
+    save_branch_snapshots(packages, str(tmp_path))
+
+    loaded = load_branch_snapshots(str(tmp_path), ["sisyphus", "p10"], ["x86_64"])
+
+    assert list(loaded) == list(packages)
+    assert [list(table) for table in loaded.values()] == [
+        list(table) for table in packages.values()
+    ]
+    with pytest.raises(OSError):
+        load_branch_snapshots(str(tmp_path), ["sisyphus"], ["i586"])
@@ -1,23 +1,21 @@
+import json
 from pytest_mock import MockerFixture
-from src.utils import get_dump_json, log_packages
+from src.utils import get_dump_json, iter_logged_packages, log_packages
 
 
-def test_get_dump_json_success(mocker: MockerFixture) -> None:
+def test_get_dump_json_success(mocker: MockerFixture, tmp_path) -> None:
     """
     Test for successful dumping of data to a JSON file.
     """
-    data = {"key": "value"}
-    mock_open = mocker.patch("builtins.open", mocker.mock_open())
-    mock_json_dump = mocker.patch("json.dump")
+    data = {"key": "value", "packages": [{"name": "пакет"}]}
+    path = str(tmp_path / "dummy_path")
     mock_log = mocker.patch("src.utils.log")
 
-    get_dump_json(data, "dummy_path")
+    get_dump_json(data, path)
 
-    mock_open.assert_called_once_with("dummy_path", "w", encoding="utf-8")
-    mock_json_dump.assert_called_once_with(
-        data, mock_open(), indent=2, ensure_ascii=False
-    )
-    mock_log.success.assert_called_once_with("Data saved to dummy_path")
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == json.dumps(data, indent=2, ensure_ascii=False)
+    mock_log.success.assert_called_once_with(f"Data saved to {path}")
 
 
 def test_get_dump_json_no_data(mocker: MockerFixture) -> None:
@@ -35,16 +33,34 @@ def test_log_packages(mocker: MockerFixture) -> None:
     """
     Test for successful logging of packages.
     """
+    mocker.patch("src.utils.level_enabled", return_value=True)
     mock_log = mocker.patch("src.utils.log")
     packages = {
         "sisyphus": [{"name": "pkg1", "version": "1.0", "release": "1"}],
-        "p10": [{"name": "pkg2", "version": "2.0", "release": "1"}],
+        ("p10", "x86_64"): [{"name": "pkg2", "version": "2.0", "release": "1"}],
     }
 
     log_packages(packages)
 
-    mock_log.info.assert_any_call("sisyphus: name: pkg1, release: 1, version: 1.0")
-    mock_log.info.assert_any_call("p10: name: pkg2, release: 1, version: 2.0")
+    mock_log.debug.assert_any_call("sisyphus: name: pkg1, release: 1, version: 1.0")
+    mock_log.debug.assert_any_call("p10/x86_64: name: pkg2, release: 1, version: 2.0")
+    mock_log.info.assert_any_call("sisyphus: 1 packages")
+    mock_log.info.assert_any_call("p10/x86_64: 1 packages")
+
+
+def test_log_packages_summary_only(mocker: MockerFixture) -> None:
+    """
+    Test that packages are neither formatted nor logged individually without DEBUG.
+    """
+    mocker.patch("src.utils.level_enabled", return_value=False)
+    mock_format = mocker.patch("src.utils.format_package")
+    mock_log = mocker.patch("src.utils.log")
+
+    log_packages({"sisyphus": [{"name": "pkg1"}, {"name": "pkg2"}]})
+
+    mock_format.assert_not_called()
+    mock_log.debug.assert_not_called()
+    mock_log.info.assert_called_once_with("sisyphus: 2 packages")
 
 
 def test_log_packages_exception(mocker: MockerFixture) -> None:
@@ -58,3 +74,21 @@ def test_log_packages_exception(mocker: MockerFixture) -> None:
 
     mock_log.error.assert_called_once()
     assert "Error logging packages:" in mock_log.error.call_args[0][0]
+
+
+def test_iter_logged_packages(mocker: MockerFixture) -> None:
+    """
+    Test that packages are logged lazily and passed through unchanged.
+    """
+    mocker.patch("src.utils.level_enabled", return_value=True)
+    mock_log = mocker.patch("src.utils.log")
+    packages = [{"name": "pkg1", "version": "1.0", "release": "1"}]
+
+    logged = iter_logged_packages("sisyphus", iter(packages))
+    mock_log.debug.assert_not_called()
+
+    assert list(logged) == packages
+    mock_log.debug.assert_called_once_with(
+        "sisyphus: name: pkg1, release: 1, version: 1.0"
+    )
+    mock_log.info.assert_called_once_with("sisyphus: 1 packages")
@@ -0,0 +1,59 @@
+import random
+from version_utils import rpm
+from src.versions import VersionKey, parse_segments, version_key
+
+
+def _reference(a: tuple, b: tuple) -> int:
+    if int(a[0]) != int(b[0]):
+        return 1 if int(a[0]) > int(b[0]) else -1
+    return rpm.compare_versions(a[1], b[1]) or rpm.compare_versions(a[2], b[2])
+
+
+def test_version_key_ordering() -> None:
+    """
+    Test that version keys order like RPM, including epoch and tilde versions.
+    """
+    assert VersionKey(0, "1.0", "alt1") < VersionKey(0, "1.0", "alt2")
+    assert VersionKey(0, "1.10", "alt1") > VersionKey(0, "1.9", "alt1")
+    assert VersionKey(1, "1.0", "alt1") > VersionKey(0, "2.0", "alt1")
+    assert VersionKey("10", "1.0", "alt1") > VersionKey("9", "1.0", "alt1")
+    assert VersionKey(None, "1.0~rc1", "alt1") < VersionKey(0, "1.0", "alt1")
+    assert VersionKey(0, "1.0a", "alt1") > VersionKey(0, "1.0", "alt1")
+    assert VersionKey(0, "1.01", "alt1") == VersionKey(0, "1.1", "alt1")
+    assert VersionKey(0, "1.0", "2") < VersionKey(0, "1.0.1", "1")
+
+
+def test_version_key_matches_rpm() -> None:
+    """
+    Test that version keys agree with version_utils on random version strings.
+    """
+    rng = random.Random(0)
+    alphabet = "0129ab.~_+"
+    values = ["".join(rng.choices(alphabet, k=rng.randint(0, 6))) for _ in range(400)]
+
+    for _ in range(5000):
+        a = (rng.randint(0, 1), rng.choice(values), rng.choice(values))
+        b = (rng.randint(0, 1), rng.choice(values), rng.choice(values))
+        try:
+            expected = _reference(a, b)
+        except IndexError:
+            continue  # version_utils fails on some separator-only tails
+        assert VersionKey(*a).compare(VersionKey(*b)) == expected, (a, b)
+        assert (VersionKey(*a) > VersionKey(*b)) == (expected > 0), (a, b)
+
+
+def test_parse_segments_fallback() -> None:
+    """
+    Test that strings the tuple key cannot express fall back to version_utils.
+    """
+    assert parse_segments("1.0.") is None
+    assert parse_segments("1._~rc") is None
+    assert parse_segments("1.0ä") is None
+    assert VersionKey(0, "1.0.", "alt1") > VersionKey(0, "1.0", "alt1")
+
+
+def test_version_key_is_memoized() -> None:
+    """
+    Test that repeated EVRs share one parsed key.
+    """
+    assert version_key(0, "1.0", "alt1") is version_key(0, "1.0", "alt1")
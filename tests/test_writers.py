@@ -0,0 +1,193 @@
+import csv
+import json
+import pytest
+from src.package_table import PackageTable
+from src.writers import ItemStream, iter_report_rows, write_json, write_table
+
+PACKAGES = [
+    {"name": "pkg1", "epoch": 0, "version": "1.0", "release": "alt1"},
+    {"name": "пакет", "version": "2.0", "release": 'alt"1\\n', "size": 1.5},
+    {"name": "pkg3", "nested": {"list": [1, {"x": []}], "empty": {}}, "flag": True},
+]
+DATA = {
+    "all_packages": {
+        "x86_64": {
+            "only_in_p10": PACKAGES,
+            "only_in_sisyphus": [],
+            "higher_in_sisyphus": PACKAGES[:1],
+            "changes_since_last_run": None,
+        },
+        None: {},
+    }
+}
+
+
+def _with_generators() -> dict:
+    return {
+        "all_packages": {
+            "x86_64": {
+                "only_in_p10": (pkg for pkg in PACKAGES),
+                "only_in_sisyphus": iter([]),
+                "higher_in_sisyphus": PackageTable.from_packages(PACKAGES[:1]),
+                "changes_since_last_run": None,
+            },
+            None: {},
+        }
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_write_json_matches_json_dump(tmp_path, backend: str) -> None:
+    """
+    Test that indented output is identical to json.dump(indent=2) for lists and generators.
+    """
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    path = tmp_path / "out.json"
+
+    write_json(_with_generators(), str(path), backend=backend)
+
+    expected = json.dumps(DATA, indent=2, ensure_ascii=False)
+    assert path.read_text(encoding="utf-8") == expected
+
+
+def test_write_json_compact(tmp_path) -> None:
+    """
+    Test that compact output contains no whitespace and parses back to the same data.
+    """
+    path = tmp_path / "out.json"
+
+    write_json(_with_generators(), str(path), fmt="compact", backend="json")
+
+    assert path.read_text(encoding="utf-8") == json.dumps(
+        DATA, separators=(",", ":"), ensure_ascii=False
+    )
+
+
+def test_write_json_ndjson(tmp_path) -> None:
+    """
+    Test that NDJSON output has one line per array element, tagged with its key path.
+    """
+    path = tmp_path / "out.ndjson"
+
+    write_json(_with_generators(), str(path), fmt="ndjson", backend="json")
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines[0] == {
+        "path": ["all_packages", "x86_64", "only_in_p10"],
+        "item": PACKAGES[0],
+    }
+    assert len(lines) == len(PACKAGES) + 2
+    assert lines[-1] == {
+        "path": ["all_packages", "x86_64", "changes_since_last_run"],
+        "value": None,
+    }
+
+
+def test_write_json_item_stream(tmp_path) -> None:
+    """
+    Test that an ItemStream is written like the dict of its items, even when empty.
+    """
+    path = tmp_path / "out.json"
+    data = _with_generators()
+    data["all_packages"] = ItemStream(iter(data["all_packages"].items()))
+    data["empty"] = ItemStream(iter([]))
+
+    write_json(data, str(path), backend="json")
+
+    expected = {**DATA, "empty": {}}
+    assert path.read_text(encoding="utf-8") == json.dumps(
+        expected, indent=2, ensure_ascii=False
+    )
+
+
+def test_write_json_keeps_previous_file_on_error(tmp_path) -> None:
+    """
+    Test that a report failing while it is streamed leaves the previous file intact.
+    """
+    path = tmp_path / "out.json"
+    path.write_text("previous", encoding="utf-8")
+
+    def results():
+        yield "x86_64", {}
+        raise RuntimeError("comparison failed")
+
+    with pytest.raises(RuntimeError):
+        write_json({"all_packages": ItemStream(results())}, str(path))
+
+    assert path.read_text(encoding="utf-8") == "previous"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_write_json_invalid_format(tmp_path) -> None:
+    """
+    Test that unknown formats are rejected.
+    """
+    with pytest.raises(ValueError):
+        write_json({}, str(tmp_path / "out"), fmt="xml")
+
+
+def test_iter_report_rows() -> None:
+    """
+    Test that results are flattened to one row per package with arch and category.
+    """
+    rows = list(iter_report_rows(DATA["all_packages"]))
+
+    assert rows[0] == {"arch": "x86_64", "category": "only_in_p10", **PACKAGES[0]}
+    assert [row["category"] for row in rows] == ["only_in_p10"] * 3 + [
+        "higher_in_sisyphus"
+    ]
+    assert list(iter_report_rows(DATA["all_packages"], ["higher_in_sisyphus"])) == [
+        {"arch": "x86_64", "category": "higher_in_sisyphus", **PACKAGES[0]}
+    ]
+
+    matrix = {"x86_64": {"p9_vs_p10": {"only_in_p9": PACKAGES[:1], "only_in_p10": []}}}
+    assert list(iter_report_rows(matrix)) == [
+        {"arch": "x86_64", "pair": "p9_vs_p10", "category": "only_in_p9", **PACKAGES[0]}
+    ]
+
+
+def test_write_table_csv(tmp_path) -> None:
+    """
+    Test that CSV output has the union of the fields, with nested values as JSON.
+    """
+    path = tmp_path / "out.csv"
+
+    write_table(iter_report_rows(DATA["all_packages"]), str(path), "csv")
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0])[:4] == ["arch", "category", "name", "epoch"]
+    assert rows[1]["name"] == "пакет"
+    assert rows[1]["release"] == 'alt"1\\n'
+    assert rows[1]["epoch"] == ""
+    assert json.loads(rows[2]["nested"]) == PACKAGES[2]["nested"]
+    assert len(rows) == 4
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_write_table_pyarrow(tmp_path, fmt: str) -> None:
+    """
+    Test that Arrow IPC and Parquet output load back as a table with one row per package.
+    """
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / f"out.{fmt}"
+
+    write_table(iter_report_rows(DATA["all_packages"]), str(path), fmt)
+
+    if fmt == "arrow":
+        table = pa.ipc.open_file(str(path)).read_all()
+    else:
+        table = pytest.importorskip("pyarrow.parquet").read_table(str(path))
+    assert table.num_rows == 4
+    assert table.column("category").to_pylist()[-1] == "higher_in_sisyphus"
+    assert table.column("name").to_pylist()[1] == "пакет"
+    assert table.column("epoch").to_pylist()[:2] == [0, None]
+
+
+def test_write_table_invalid_format(tmp_path) -> None:
+    """
+    Test that unknown table formats are rejected.
+    """
+    with pytest.raises(ValueError):
+        write_table([], str(tmp_path / "out"), "xlsx")